@@ -0,0 +1,50 @@
+import threading
+import time
+
+from rate_limit import upbit_request
+
+
+# 체결 완료로 간주하는 주문 상태 (시장가 매수는 잔량 취소로 cancel이 될 수 있음)
+FINAL_ORDER_STATES = ("done", "cancel")
+
+
+class AccountState:
+    """잔고 스냅샷 캐시 (get_balances 1회로 모든 잔고/평단가 계산)
+
+    자체 주문이 체결된 뒤에만 무효화하며 (ExecutionEngine이 체결 대기/잔량 취소 후 invalidate 호출),
+    입출금 등 외부 변화를 위해 max_age가 지나면 다시 조회한다.
+    """
+
+    def __init__(self, upbit, max_age=300):
+        self.upbit = upbit
+        self.max_age = max_age
+        self._balances = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self.fetches = 0
+
+    def snapshot(self, force=False):
+        """{통화: 잔고 항목} (동시 호출 시 조회는 1회만)"""
+        with self._lock:
+            if force or self._balances is None or time.time() - self._fetched_at > self.max_age:
+                with upbit_request("exchange", "get_balances"):
+                    balances = self.upbit.get_balances()
+                if not isinstance(balances, list):
+                    raise ValueError(f"Unexpected get_balances response: {balances}")
+                self._balances = {item['currency']: item for item in balances}
+                self._fetched_at = time.time()
+                self.fetches += 1
+            return self._balances
+
+    def balance(self, currency):
+        """보유 수량 (티커를 넘기면 코인 단위로 변환, 예: KRW-BTC -> BTC)"""
+        item = self.snapshot().get(currency.split('-')[-1], {})
+        return float(item.get('balance', 0))
+
+    def avg_buy_price(self, currency):
+        item = self.snapshot().get(currency.split('-')[-1], {})
+        return float(item.get('avg_buy_price', 0))
+
+    def invalidate(self):
+        with self._lock:
+            self._balances = None
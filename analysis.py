@@ -0,0 +1,259 @@
+import asyncio
+import math
+import os
+import time
+
+from decision_cache import get_decision_cache, market_features
+from llm import TokenRateLimiter, get_llm_client, run
+from prompt_encoder import PromptEncoder, estimate_tokens
+
+
+DECISIONS = ("buy", "sell", "hold")
+RISK_LEVELS = ("low", "medium", "high")
+
+ANALYSIS_PROMPT = """Analyze the cryptocurrency market based on the following data and generate trading signals:
+1. Technical Indicators (RSI, MACD, Bollinger Bands, etc.)
+2. Order Book Data (Buy/Sell Volume)
+3. Fear & Greed Index
+4. Recent News Sentiment
+5. Chart Analysis Results (trend, support/resistance, candlestick and breakout patterns)
+
+
+
+
+Please consider all available data including the chart analysis to provide a comprehensive market assessment.
+Candle data is given as tables in the form {"columns": [...], "rows": [[...], ...]}.
+News is given as {"sentiment": {"score": -1 to 1, time-decayed over all recent articles, "label", "weight", "new"}, "headlines": [...]}, where headlines are only the articles not shown in previous analyses.
+
+
+
+
+Please respond in the following JSON format:
+{
+    "decision": "buy/sell/hold",
+    "reason": "detailed analysis explanation",
+    "risk_level": "low/medium/high",
+    "confidence_score": 0-100,
+    "market_sentiment": "current market sentiment analysis",
+    "news_impact": "analysis of news sentiment impact",
+    "chart_analysis": "interpretation of chart patterns and signals"
+}"""
+
+BATCH_PROMPT = """Analyze each cryptocurrency market below independently and generate a trading signal for every market:
+1. Technical Indicators (RSI, MACD, Bollinger Bands, etc.)
+2. Order Book Data (Buy/Sell Volume)
+3. Fear & Greed Index and Recent News Sentiment (in "shared", common to all markets)
+4. Chart Analysis Results (trend, support/resistance, candlestick and breakout patterns)
+
+Market data is given as {"shared": {...}, "markets": {"<ticker>": {...}, ...}}.
+Candle data is given as tables in the form {"columns": [...], "rows": [[...], ...]}.
+News is given as {"sentiment": {"score": -1 to 1, time-decayed over all recent articles, "label", "weight", "new"}, "headlines": [...]}, where headlines are only the articles not shown in previous analyses.
+
+Please respond in the following JSON format with exactly one entry per market:
+{
+    "decisions": [
+        {
+            "ticker": "<ticker>",
+            "decision": "buy/sell/hold",
+            "reason": "brief analysis explanation",
+            "risk_level": "low/medium/high",
+            "confidence_score": 0-100,
+            "market_sentiment": "current market sentiment analysis",
+            "news_impact": "analysis of news sentiment impact",
+            "chart_analysis": "interpretation of chart patterns and signals"
+        }
+    ]
+}"""
+
+# 응답 토큰 예상치 (레이트 리미터용)
+COMPLETION_TOKENS = 400
+
+
+def prompt_data(analysis_data):
+    """get_ai_analysis에 보낼 입력 (호가는 상위 3호가만)"""
+    orderbook = analysis_data["orderbook"]
+    return {
+        "current_status": analysis_data["current_status"],
+        "orderbook": {
+            "timestamp": orderbook["timestamp"],
+            "total_ask_size": orderbook["total_ask_size"],
+            "total_bid_size": orderbook["total_bid_size"],
+            "ask_prices": orderbook["ask_prices"][:3],
+            "bid_prices": orderbook["bid_prices"][:3],
+            "depth": orderbook.get("depth"),
+            "imbalance_trend": orderbook.get("imbalance_trend"),
+        },
+        "ohlcv": analysis_data["ohlcv"],
+        "fear_greed": analysis_data["fear_greed"],
+        "news": analysis_data["news"],
+        "chart_analysis": analysis_data.get("chart_analysis"),
+    }
+
+
+def validate_decision(item):
+    """decision/confidence_score/risk_level 스키마 검증 후 정규화된 결정 반환 (유효하지 않으면 None)"""
+    if not isinstance(item, dict):
+        return None
+
+    decision = str(item.get("decision", "")).strip().lower()
+    risk_level = str(item.get("risk_level", "")).strip().lower()
+    try:
+        confidence = float(item.get("confidence_score"))
+    except (TypeError, ValueError):
+        return None
+
+    if decision not in DECISIONS or risk_level not in RISK_LEVELS:
+        return None
+    if not math.isfinite(confidence) or not 0 <= confidence <= 100:
+        return None
+
+    return {
+        **item,
+        "decision": decision,
+        "risk_level": risk_level,
+        "confidence_score": int(confidence) if confidence.is_integer() else confidence,
+    }
+
+
+class BatchAnalyzer:
+    """여러 티커를 한 번에 분석 (결정 캐시 -> LLM 호출 -> 스키마 검증)
+
+    - packed: batch_size개 티커를 하나의 요청으로 (시스템 프롬프트/공통 데이터 1회)
+    - concurrent: 티커별 요청을 동시에 전송
+    두 방식 모두 분당 토큰 한도(TokenRateLimiter) 안에서 실행하며,
+    배치 응답에서 누락/검증 실패한 티커는 개별 요청으로 다시 분석한다.
+    """
+
+    def __init__(self, llm=None, encoder=None, decision_cache=None, mode="packed",
+                 batch_size=8, tokens_per_minute=None):
+        if tokens_per_minute is None:
+            tokens_per_minute = int(os.getenv("LLM_TOKENS_PER_MINUTE", "30000"))
+        self.llm = llm or get_llm_client("analysis")
+        self.encoder = encoder or PromptEncoder()
+        self.decision_cache = decision_cache or get_decision_cache()
+        self.mode = mode
+        self.batch_size = batch_size
+        self.limiter = TokenRateLimiter(tokens_per_minute)
+        self.last_report = None
+        self.last_latencies = {}
+
+    async def _request(self, system_prompt, payload, tokens):
+        await self.limiter.acquire(tokens + COMPLETION_TOKENS)
+        return await self.llm.acomplete_json([
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Market data for analysis: {payload}"}
+        ])
+
+    async def _analyze_one(self, ticker, data):
+        payload, report = self.encoder.encode(prompt_data(data))
+        try:
+            response = await self._request(ANALYSIS_PROMPT, payload,
+                                           report["tokens"] + estimate_tokens(ANALYSIS_PROMPT))
+        except Exception as e:
+            print(f"Error in batch analysis ({ticker}): {e}")
+            return {}, 0, 0.0
+
+        result = validate_decision(response.data)
+        if result is None:
+            print(f"Invalid decision for {ticker}: {response.data}")
+            return {}, 1, response.latency
+        return {ticker: result}, 1, response.latency
+
+    async def _analyze_packed(self, data_by_ticker):
+        payload, report = self.encoder.encode_batch(
+            {ticker: prompt_data(data) for ticker, data in data_by_ticker.items()}
+        )
+        try:
+            response = await self._request(BATCH_PROMPT, payload,
+                                           report["tokens"] + estimate_tokens(BATCH_PROMPT))
+        except Exception as e:
+            print(f"Error in batch analysis ({', '.join(data_by_ticker)}): {e}")
+            return {}, 0, 0.0
+
+        items = response.data.get("decisions") if isinstance(response.data, dict) else None
+        results = {}
+        for item in items if isinstance(items, list) else []:
+            ticker = item.get("ticker") if isinstance(item, dict) else None
+            result = validate_decision(item)
+            if ticker in data_by_ticker and ticker not in results and result is not None:
+                result.pop("ticker", None)
+                results[ticker] = result
+
+        # 응답 시간은 배치 내 티커 수로 나누어 캐시 절감 효과 추정에 사용
+        return results, 1, response.latency / max(len(results), 1)
+
+    async def aanalyze(self, data_by_ticker):
+        tickers = list(data_by_ticker)
+        if self.mode == "packed" and len(tickers) > 1:
+            tasks = [
+                self._analyze_packed({ticker: data_by_ticker[ticker] for ticker in tickers[i:i + self.batch_size]})
+                for i in range(0, len(tickers), self.batch_size)
+            ]
+        else:
+            tasks = [self._analyze_one(ticker, data_by_ticker[ticker]) for ticker in tickers]
+
+        results = {}
+        calls = 0
+        for batch_results, batch_calls, latency in await asyncio.gather(*tasks):
+            results.update({ticker: (result, latency) for ticker, result in batch_results.items()})
+            calls += batch_calls
+
+        # 배치 응답에서 빠진 티커는 개별 요청으로 재시도
+        missing = [ticker for ticker in tickers if ticker not in results]
+        if missing and self.mode == "packed" and len(tickers) > 1:
+            print(f"Retrying individually: {', '.join(missing)}")
+            for batch_results, batch_calls, latency in await asyncio.gather(
+                    *(self._analyze_one(ticker, data_by_ticker[ticker]) for ticker in missing)):
+                results.update({ticker: (result, latency) for ticker, result in batch_results.items()})
+                calls += batch_calls
+
+        return results, calls
+
+    def analyze(self, data_by_ticker):
+        """{티커: analysis_data} -> {티커: 결정 또는 None}"""
+        started = time.perf_counter()
+        waited = self.limiter.waited
+
+        decisions = {}
+        fingerprints = {}
+        pending = {}
+        for ticker, data in data_by_ticker.items():
+            # 시장 상태가 거의 변하지 않았다면 이전 결정 재사용
+            fingerprints[ticker] = (ticker,) + self.decision_cache.fingerprint(market_features(data))
+            cached = self.decision_cache.get(fingerprints[ticker])
+            if cached is not None:
+                result, age = cached
+                decisions[ticker] = {**result, "cached": True, "cache_age": age}
+            else:
+                pending[ticker] = data
+
+        calls = 0
+        self.last_latencies = {}
+        if pending:
+            results, calls = run(self.aanalyze(pending))
+            for ticker in pending:
+                if ticker in results:
+                    result, latency = results[ticker]
+                    self.last_latencies[ticker] = latency
+                    self.decision_cache.put(fingerprints[ticker], result, latency)
+                    decisions[ticker] = result
+                else:
+                    decisions[ticker] = None
+
+        elapsed = time.perf_counter() - started
+        self.last_report = {
+            "mode": self.mode,
+            "tickers": len(data_by_ticker),
+            "cached": len(data_by_ticker) - len(pending),
+            "calls": calls,
+            "failed": sum(1 for result in decisions.values() if result is None),
+            "rate_limit_wait": self.limiter.waited - waited,
+            "elapsed": elapsed,
+            "tickers_per_sec": len(data_by_ticker) / elapsed if elapsed > 0 else 0.0,
+        }
+        print(f"\n=== Batch Analysis ({self.mode}) ===")
+        print(f"{self.last_report['tickers']} tickers, {calls} LLM call(s), "
+              f"{self.last_report['cached']} cached, {self.last_report['failed']} failed "
+              f"in {elapsed:.2f}s ({self.last_report['tickers_per_sec']:.2f} tickers/s, "
+              f"rate limit wait {self.last_report['rate_limit_wait']:.2f}s)")
+        return decisions
@@ -3,21 +3,32 @@ from dotenv import load_dotenv
 import json
 import pyupbit
 import pandas as pd
-import ta
 from datetime import datetime, timedelta
-from openai import OpenAI
-from cerebras.cloud.sdk import Cerebras
+from candle_store import CandleStore
+from indicators import IndicatorEngine, get_engine
+from records import frame_to_records, json_safe
+from cache import get_cache
+from scheduler import TradingScheduler
+from market_feed import get_market_feed, start_market_feed
+from policy import TradePolicy
+from decision_cache import get_decision_cache, market_features
+from prompt_encoder import PromptEncoder
+from llm import get_llm_client
+from account import AccountState
+from rate_limit import upbit_request
+from metrics import get_metrics, instrument_methods, start_exporters
+from execution import ExecutionEngine, rest_orderbook
+from orderbook import get_orderbook_history
+from analysis import ANALYSIS_PROMPT, prompt_data, validate_decision
+from journal import get_journal, journal_entry
+from http_client import DEFAULT_TIMEOUT, get_session
+from news_feed import get_news_feed, start_news_feed
 import time
-import requests
 import base64
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-from PIL import Image
-import io
+from concurrent.futures import ThreadPoolExecutor, wait
+from chart_capture import get_capture_service
+from chart_features import chart_features
+from chart_render import get_renderer
 
 
 
@@ -25,75 +36,70 @@ import io
 load_dotenv()
 
 
-def capture_full_page(url, output_path):
-    """웹 페이지 캡처 함수"""
-    chrome_options = Options()
-    chrome_options.add_argument('--headless')  # 헤드리스 모드
-    chrome_options.add_argument('--start-maximized')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-
-    driver = webdriver.Chrome(options=chrome_options)
-    wait = WebDriverWait(driver, 20)
-
-    try:
-        driver.get(url)
-        time.sleep(5)  # 초기 로딩 대기
-
-        # 시간 설정 버튼 클릭
-        time_button = wait.until(EC.element_to_be_clickable((By.XPATH,
-            "/html/body/div[1]/div[2]/div[3]/div/section[1]/article[1]/div/span[2]/div/div/div[1]/div[1]/div/cq-menu[1]/span/cq-clickable")))
-        time_button.click()
-        time.sleep(1)
-
-        # 1시간 옵션 클릭
-        hour_option = wait.until(EC.element_to_be_clickable((By.XPATH,
-            "/html/body/div[1]/div[2]/div[3]/div/section[1]/article[1]/div/span[2]/div/div/div[1]/div[1]/div/cq-menu[1]/cq-menu-dropdown/cq-item[8]")))
-        hour_option.click()
-        time.sleep(3)
-
-        # 전체 페이지 높이 구하기
-        total_height = driver.execute_script("return document.body.scrollHeight")
-        driver.set_window_size(1920, total_height)
-
-        # 스크린샷 캡처
-        png = driver.get_screenshot_as_png()
-
-        # PIL Image로 변환
-        img = Image.open(io.BytesIO(png))
-
-        # 이미지 리사이즈 (OpenAI API 제한에 맞춤)
-        img.thumbnail((2000, 2000))
-
-        # 최적화된 이미지 저장
-        img.save(output_path, optimize=True, quality=85)
-        print(f"Optimized screenshot saved as: {output_path}")
-        return True
-
-    except Exception as e:
-        print(f"Error in capture_full_page: {e}")
-        return False
-
-    finally:
-        driver.quit()
-
-
+# 차트 특징 계산에 쓰는 봉 단위별 캔들 수
+CHART_CANDLES = {"day": 120, "minute60": 200}
 
 
 class EnhancedCryptoTrader:
-    def __init__(self, ticker="KRW-BTC"):
+    # 데이터 소스별 타임아웃 (초)
+    SOURCE_TIMEOUTS = {
+        "current_status": 5,
+        "orderbook": 5,
+        "ohlcv": 10,
+        "fear_greed": 10,
+        "news": 15,
+        "chart_analysis": 90,
+    }
+
+    # 차트 분석 방식: features (캔들 기반 수치 특징), render (인메모리 차트 이미지 + 비전 모델)
+    # 또는 vision (업비트 페이지 스크린샷 + 비전 모델)
+    CHART_ANALYSIS = os.getenv("CHART_ANALYSIS", "features")
+
+    # 느리게 변하는 입력의 캐시 TTL (초): (fresh, stale-while-revalidate)
+    CACHE_TTLS = {
+        "fear_greed": (3600, 6 * 3600),
+        "chart_analysis": (900, 1800),
+    }
+
+    def __init__(self, ticker="KRW-BTC", upbit=None, llm=None, vision_llm=None, candle_store=None, cache=None,
+                 market_feed=None, policy=None, decision_cache=None, prompt_encoder=None, account=None,
+                 executor=None, journal=None, http=None, news_feed=None):
         self.ticker = ticker
         self.access = os.getenv('UPBIT_ACCESS_KEY')
         self.secret = os.getenv('UPBIT_SECRET_KEY')
         self.serpapi_key = os.getenv('SERPAPI_KEY')
-        self.upbit = pyupbit.Upbit(self.access, self.secret)
-        self.client = client = Cerebras(
-        api_key=os.environ.get(
-            "CEREBRAS_API_KEY"
-        ),  # This is the default and can be omitted
-    )
+        # 여러 티커를 운용할 때는 업비트/LLM 클라이언트와 캔들 저장소를 공유
+        self.upbit = upbit or pyupbit.Upbit(self.access, self.secret)
+        # 잔고는 get_balances 1회 스냅샷에서 계산하고, 자체 주문 체결 후에만 무효화
+        self.account = account or AccountState(self.upbit)
+        self.candle_store = candle_store or CandleStore()
+        self.cache = cache or get_cache()
+        # 실시간 시세 피드가 실행 중이면 현재가/호가는 REST 대신 피드에서 조회
+        self.market_feed = market_feed or get_market_feed()
+        self.policy = policy or TradePolicy()
+        # 호가 기반 충격 추정 후 시장가 또는 지정가 분할 주문으로 실행
+        self.executor = executor or ExecutionEngine(
+            self.upbit, orderbook_source=lambda ticker: self.get_raw_orderbook(), account=self.account
+        )
+        self.decision_cache = decision_cache or get_decision_cache()
+        self.prompt_encoder = prompt_encoder or PromptEncoder()
+        # 사이클별 입력/결정/체결/소요시간 기록 (추가 전용 바이너리 파일)
+        self.journal = journal or get_journal()
+        # 제한시간/재시도/모델 대체를 처리하는 LLM 클라이언트 (분석용, 차트 이미지용)
+        self.llm = llm or get_llm_client("analysis")
+        self.vision_llm = vision_llm or get_llm_client("vision")
+        # 공포탐욕지수는 keep-alive 세션을 공유
+        self.http = http or get_session()
         self.fear_greed_api = "https://api.alternative.me/fng/"
+        # 뉴스는 별도 주기로 수집/중복 제거/감성 점수화하고, 프롬프트에는 집계 점수와 새 기사만 전달
+        self.news_feed = news_feed or get_news_feed()
+        self.news_seen = 0
+        self.last_timings = {}
+        # 이번 사이클에 get_ohlcv_data가 갱신/조회한 캔들 (차트 특징 계산에 재사용)
+        self.last_candles = None
+        self.last_llm_seconds = None
+        # False이면 새 주문을 내지 않음 (서비스 종료 중)
+        self.trading_enabled = True
 
 
 
@@ -102,7 +108,8 @@ class EnhancedCryptoTrader:
     def get_fear_greed_index(self, limit=7):
         """공포탐욕지수 데이터 조회"""
         try:
-            response = requests.get(f"{self.fear_greed_api}?limit={limit}")
+            with get_metrics().timer("http_request", service="fear_greed"):
+                response = self.http.get(f"{self.fear_greed_api}?limit={limit}", timeout=DEFAULT_TIMEOUT)
             if response.status_code == 200:
                 data = response.json()
 
@@ -140,47 +147,32 @@ class EnhancedCryptoTrader:
 
 
 
-    def add_technical_indicators(self, df):
-        """기술적 분석 지표 추가"""
-        # 볼린저 밴드
-        indicator_bb = ta.volatility.BollingerBands(close=df['close'])
-        df['bb_high'] = indicator_bb.bollinger_hband()
-        df['bb_mid'] = indicator_bb.bollinger_mavg()
-        df['bb_low'] = indicator_bb.bollinger_lband()
-        df['bb_pband'] = indicator_bb.bollinger_pband()
-
-        # RSI
-        df['rsi'] = ta.momentum.RSIIndicator(close=df['close']).rsi()
-
-        # MACD
-        macd = ta.trend.MACD(close=df['close'])
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_diff'] = macd.macd_diff()
+    def add_technical_indicators(self, df, interval=None):
+        """기술적 분석 지표 추가 (봉 단위별 스트리밍 엔진으로 새 캔들만 계산)"""
+        if interval is None:
+            engine = IndicatorEngine()
+        else:
+            engine = get_engine((self.ticker, interval))
 
-        # 이동평균선
-        df['ma5'] = ta.trend.SMAIndicator(close=df['close'], window=5).sma_indicator()
-        df['ma20'] = ta.trend.SMAIndicator(close=df['close'], window=20).sma_indicator()
-        df['ma60'] = ta.trend.SMAIndicator(close=df['close'], window=60).sma_indicator()
-        df['ma120'] = ta.trend.SMAIndicator(close=df['close'], window=120).sma_indicator()
+        # 볼린저 밴드, RSI, MACD, 이동평균선(5/20/60/120), ATR
+        return engine.frame(df)
 
-        # ATR
-        df['atr'] = ta.volatility.AverageTrueRange(
-            high=df['high'], low=df['low'], close=df['close']
-        ).average_true_range()
 
-        return df
 
 
-
-
-    def get_current_status(self):
-        """현재 투자 상태 조회"""
+    def get_current_status(self, balances=None, current_price=None):
+        """현재 투자 상태 조회 (잔고 스냅샷/현재가가 주어지면 재사용)"""
         try:
-            krw_balance = float(self.upbit.get_balance("KRW"))
-            crypto_balance = float(self.upbit.get_balance(self.ticker))
-            avg_buy_price = float(self.upbit.get_avg_buy_price(self.ticker))
-            current_price = float(pyupbit.get_current_price(self.ticker))
+            if balances is None:
+                balances = self.account.snapshot()
+            fiat, currency = self.ticker.split('-')
+            krw_balance = float(balances.get(fiat, {}).get('balance', 0))
+            crypto_balance = float(balances.get(currency, {}).get('balance', 0))
+            avg_buy_price = float(balances.get(currency, {}).get('avg_buy_price', 0))
+
+            if current_price is None:
+                current_price = self.get_current_price()
+            current_price = float(current_price)
 
             print("\n=== Current Investment Status ===")
             print(f"보유 현금: {krw_balance:,.0f} KRW")
@@ -210,10 +202,34 @@ class EnhancedCryptoTrader:
 
 
 
-    def get_orderbook_data(self):
-        """호가 데이터 조회"""
+    def get_current_price(self):
+        """현재가 조회 (실시간 피드 우선, 없으면 REST)"""
+        if self.market_feed is not None:
+            price = self.market_feed.get_current_price(self.ticker)
+            if price is not None:
+                return price
+        with upbit_request("quotation", "ticker"):
+            return pyupbit.get_current_price(self.ticker)
+
+
+
+
+    def get_raw_orderbook(self):
+        """원본 호가 조회 (실시간 피드 우선, 없으면 REST)"""
+        if self.market_feed is not None:
+            orderbook = self.market_feed.get_orderbook(self.ticker)
+            if orderbook is not None:
+                return orderbook
+        return rest_orderbook(self.ticker)
+
+
+
+
+    def get_orderbook_data(self, orderbook=None):
+        """호가 데이터 조회 (일괄 조회된 호가가 주어지면 재사용)"""
         try:
-            orderbook = pyupbit.get_orderbook(ticker=self.ticker)
+            if orderbook is None:
+                orderbook = self.get_raw_orderbook()
             if not orderbook or len(orderbook) == 0:
                 return None
 
@@ -228,6 +244,10 @@ class EnhancedCryptoTrader:
                 bid_prices.append(unit['bid_price'])
                 bid_sizes.append(unit['bid_size'])
 
+            # 15호가 전체 기준 스프레드/마이크로프라이스/불균형/누적 잔량 및 최근 불균형 추이
+            history = get_orderbook_history(self.ticker)
+            history.push(orderbook)
+
             return {
                 "timestamp": datetime.fromtimestamp(orderbook['timestamp'] / 1000).strftime('%Y-%m-%d %H:%M:%S'),
                 "total_ask_size": float(orderbook['total_ask_size']),
@@ -235,7 +255,9 @@ class EnhancedCryptoTrader:
                 "ask_prices": ask_prices,
                 "ask_sizes": ask_sizes,
                 "bid_prices": bid_prices,
-                "bid_sizes": bid_sizes
+                "bid_sizes": bid_sizes,
+                "depth": history.latest_features(),
+                "imbalance_trend": history.imbalance_trend(),
             }
         except Exception as e:
             print(f"Error in get_orderbook_data: {e}")
@@ -247,23 +269,19 @@ class EnhancedCryptoTrader:
     def get_ohlcv_data(self):
         """차트 데이터 수집 및 기술적 분석"""
         try:
-            daily_data = pyupbit.get_ohlcv(self.ticker, interval="day", count=30)
-            daily_data = self.add_technical_indicators(daily_data)
-
-            hourly_data = pyupbit.get_ohlcv(self.ticker, interval="minute60", count=24)
-            hourly_data = self.add_technical_indicators(hourly_data)
+            # 캔들 저장소 갱신은 사이클당 1회: 차트 특징 계산에 필요한 길이까지 받아 두고 재사용
+            daily_candles = self.candle_store.get_ohlcv(self.ticker, interval="day", count=CHART_CANDLES["day"])
+            hourly_candles = self.candle_store.get_ohlcv(self.ticker, interval="minute60",
+                                                         count=CHART_CANDLES["minute60"])
+            self.last_candles = {"day": daily_candles, "minute60": hourly_candles}
 
-            daily_data_dict = []
-            for index, row in daily_data.iterrows():
-                day_data = row.to_dict()
-                day_data['date'] = index.strftime('%Y-%m-%d')
-                daily_data_dict.append(day_data)
+            # 지표는 받아 둔 전체 캔들로 계산 (장기 이동평균/EMA가 프로세스 실행 시간과 무관하게 안정)
+            daily_data = self.add_technical_indicators(daily_candles.copy(), "day").iloc[-30:]
+            hourly_data = self.add_technical_indicators(hourly_candles.copy(), "minute60").iloc[-24:]
 
-            hourly_data_dict = []
-            for index, row in hourly_data.iterrows():
-                hour_data = row.to_dict()
-                hour_data['date'] = index.strftime('%Y-%m-%d %H:%M:%S')
-                hourly_data_dict.append(hour_data)
+            # 필요한 구간만 잘라서 컬럼 단위로 변환 (NaN -> null)
+            daily_data_dict = frame_to_records(daily_data, '%Y-%m-%d', last=7)
+            hourly_data_dict = frame_to_records(hourly_data, '%Y-%m-%d %H:%M:%S', last=6)
 
             print("\n=== Latest Technical Indicators ===")
             print(f"RSI: {daily_data['rsi'].iloc[-1]:.2f}")
@@ -271,38 +289,61 @@ class EnhancedCryptoTrader:
             print(f"BB Position: {daily_data['bb_pband'].iloc[-1]:.2f}")
 
             return {
-                "daily_data": daily_data_dict[-7:],
-                "hourly_data": hourly_data_dict[-6:],
+                "daily_data": daily_data_dict,
+                "hourly_data": hourly_data_dict,
                 "latest_indicators": {
-                    "rsi": daily_data['rsi'].iloc[-1],
-                    "macd": daily_data['macd'].iloc[-1],
-                    "macd_signal": daily_data['macd_signal'].iloc[-1],
-                    "bb_position": daily_data['bb_pband'].iloc[-1]
+                    "rsi": json_safe(daily_data['rsi'].iloc[-1]),
+                    "macd": json_safe(daily_data['macd'].iloc[-1]),
+                    "macd_signal": json_safe(daily_data['macd_signal'].iloc[-1]),
+                    "bb_position": json_safe(daily_data['bb_pband'].iloc[-1]),
+                    "hourly_atr": json_safe(hourly_data['atr'].iloc[-1])
                 }
             }
         except Exception as e:
             print(f"Error in get_ohlcv_data: {e}")
             return None
-    def capture_and_analyze_chart(self):
-        """차트 캡처 및 분석"""
+
+    def get_chart_features(self, candles=None):
+        """보유 중인 캔들에서 차트 특징 직접 계산 (브라우저/비전 모델 불필요)
+
+        candles가 없으면 저장소를 갱신하지 않고 저장된 캔들만 사용 (갱신은 get_ohlcv_data에서)
+        """
         try:
-            current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_path = f"chart_{current_time}.png"
+            if candles is None:
+                candles = {
+                    interval: self.candle_store.get(self.ticker, interval, count)
+                    for interval, count in CHART_CANDLES.items()
+                }
+            return {
+                "daily": chart_features(candles["day"]),
+                "hourly": chart_features(candles["minute60"]),
+            }
+        except Exception as e:
+            print(f"Error in get_chart_features: {e}")
+            return None
 
-            url = f"https://upbit.com/exchange?code=CRIX.UPBIT.{self.ticker}"
-            capture_success = capture_full_page(url, screenshot_path)
+    def analyze_chart(self):
+        """차트 분석 (CHART_ANALYSIS=vision/render이면 차트 이미지 + 비전 모델 분석)"""
+        if self.CHART_ANALYSIS in ("vision", "render"):
+            return self.cached("chart_analysis", self.capture_and_analyze_chart)
+        return self.get_chart_features()
 
-            if not capture_success:
-                return None
+    def capture_and_analyze_chart(self):
+        """차트 이미지 분석 (CHART_ANALYSIS=render이면 캔들로 직접 그린 이미지, vision이면 업비트 페이지 캡처)"""
+        try:
+            # 임시 파일 없이 메모리에서 PNG bytes를 바로 인코딩
+            if self.CHART_ANALYSIS == "render":
+                png = get_renderer().render_ticker(self.candle_store, self.ticker)
+            else:
+                url = f"https://upbit.com/exchange?code=CRIX.UPBIT.{self.ticker}"
+                png = get_capture_service().capture(url)
 
             # 이미지를 base64로 인코딩
-            with open(screenshot_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode("utf-8")
+            base64_image = base64.b64encode(png).decode("utf-8")
 
             # OpenAI Vision API 호출
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
+            response = self.vision_llm.complete(
+                [
                     {
                         "role": "user",
                         "content": [
@@ -323,64 +364,46 @@ class EnhancedCryptoTrader:
             )
 
             # 분석 결과 처리
-            analysis_result = response.choices[0].message.content
-
-            # 임시 파일 삭제
-            os.remove(screenshot_path)
-
-            return analysis_result
+            return response.text
 
         except Exception as e:
             print(f"Error in capture_and_analyze_chart: {e}")
-            if os.path.exists(screenshot_path):
-                os.remove(screenshot_path)
             return None
 
 
 
 
     def get_crypto_news(self):
-        """비트코인 관련 최신 뉴스 조회"""
-        try:
-            base_url = "https://serpapi.com/search.json"
-            params = {
-                "engine": "google_news",
-                "q": "bitcoin crypto trading",
-                "api_key": self.serpapi_key,
-                "gl": "us",
-                "hl": "en"
-            }
+        """뉴스 감성 집계 점수와 이전 분석 이후 새 기사 (조회 성공 이력이 없으면 None)
 
-            response = requests.get(base_url, params=params)
-            if response.status_code == 200:
-                news_data = response.json()
-
-                if 'news_results' not in news_data:
-                    return None
-
-                processed_news = []
-                for news in news_data['news_results'][:5]:
-                    processed_news.append({
-                        'title': news.get('title', ''),
-                        'link': news.get('link', ''),
-                        'source': news.get('source', {}).get('name', ''),
-                        'date': news.get('date', ''),
-                        'snippet': news.get('snippet', '')
-                    })
+        sequence는 포함된 기사까지의 순번으로, LLM이 실제로 이 뉴스를 보고 결정한 뒤 commit_news로 반영
+        """
+        try:
+            # 백그라운드 폴링이 없으면 폴링 주기가 지났을 때만 조회
+            if not self.news_feed.running:
+                self.news_feed.poll_if_due()
 
-                print("\n=== Latest Crypto News ===")
-                for news in processed_news:
-                    print(f"\nTitle: {news['title']}")
-                    print(f"Source: {news['source']}")
-                    print(f"Date: {news['date']}")
+            sequence, news = self.news_feed.context(self.news_seen)
+            if news is None:
+                return None
+            news["sequence"] = sequence
 
-                return processed_news
+            sentiment = news["sentiment"]
+            print("\n=== News Sentiment ===")
+            print(f"Score: {sentiment['score']:+.2f} ({sentiment['label']}), new articles: {sentiment['new']}")
+            for headline in news["headlines"]:
+                print(f"[{headline['sentiment']:+.2f}] {headline['title']} ({headline['source']})")
 
-            return None
+            return news
         except Exception as e:
             print(f"Error in get_crypto_news: {e}")
             return None
 
+    def commit_news(self, news):
+        """LLM에 전달된 뉴스까지 본 것으로 처리 (다음 사이클에는 그 이후 기사만)"""
+        if isinstance(news, dict) and news.get("sequence"):
+            self.news_seen = max(self.news_seen, news["sequence"])
+
 
 
 
@@ -391,81 +414,147 @@ class EnhancedCryptoTrader:
 
 
 
-    def get_ai_analysis(self, analysis_data):
-        """AI 분석 및 매매 신호 생성"""
-        try:
-            # 차트 이미지 분석 수행
-            chart_analysis = self.capture_and_analyze_chart()
-
-            optimized_data = {
-                "current_status": analysis_data["current_status"],
-                "orderbook": {
-                    "timestamp": analysis_data["orderbook"]["timestamp"],
-                    "total_ask_size": analysis_data["orderbook"]["total_ask_size"],
-                    "total_bid_size": analysis_data["orderbook"]["total_bid_size"],
-                    "ask_prices": analysis_data["orderbook"]["ask_prices"][:3],
-                    "bid_prices": analysis_data["orderbook"]["bid_prices"][:3],
-                },
-                "ohlcv": analysis_data["ohlcv"],
-                "fear_greed": analysis_data["fear_greed"],
-                "news": analysis_data["news"],
-                "chart_analysis": chart_analysis
-            }
-
-
+    def cached(self, name, loader):
+        """느리게 변하는 입력은 TTL 캐시를 거쳐 조회 (실패 시 마지막 정상값)"""
+        ttl, stale_ttl = self.CACHE_TTLS[name]
+        key = f"{name}:{self.ticker}" if name == "chart_analysis" else name
+        return self.cache.get(key, loader, ttl=ttl, stale_ttl=stale_ttl)
 
 
-            prompt = """Analyze the cryptocurrency market based on the following data and generate trading signals:
-1. Technical Indicators (RSI, MACD, Bollinger Bands, etc.)
-2. Order Book Data (Buy/Sell Volume)
-3. Fear & Greed Index
-4. Recent News Sentiment
-5. Visual Chart Analysis Results
 
 
+    def gather_analysis_data(self, timeouts=None, preset=None):
+        """분석 데이터 병렬 수집 (소스별 타임아웃 및 소요시간 측정)
 
+        preset에 이미 조회된 값이 있는 소스는 다시 조회하지 않음
+        """
+        timeouts = {**self.SOURCE_TIMEOUTS, **(timeouts or {})}
+        preset = preset or {}
+        sources = {
+            "current_status": self.get_current_status,
+            "orderbook": self.get_orderbook_data,
+            "ohlcv": self.get_ohlcv_data,
+            "fear_greed": lambda: self.cached("fear_greed", self.get_fear_greed_index),
+            "news": self.get_crypto_news,
+            "chart_analysis": self.analyze_chart,
+        }
+        sources = {name: func for name, func in sources.items() if name not in preset}
+        # 캔들 기반 차트 특징은 get_ohlcv_data가 갱신한 캔들로 수집 후 계산 (저장소 갱신 1회)
+        chart_features_after = self.CHART_ANALYSIS not in ("vision", "render") and \
+            sources.pop("chart_analysis", None) is not None
+        self.last_candles = None
+        timings = {}
 
-Please consider all available data including the visual chart analysis to provide a comprehensive market assessment.
-
-
-
-
-Please respond in the following JSON format:
-{
-    "decision": "buy/sell/hold",
-    "reason": "detailed analysis explanation",
-    "risk_level": "low/medium/high",
-    "confidence_score": 0-100,
-    "market_sentiment": "current market sentiment analysis",
-    "news_impact": "analysis of news sentiment impact",
-    "chart_analysis": "interpretation of visual patterns and signals"
-}"""
-
-
+        def timed(name, func):
+            started = time.perf_counter()
+            try:
+                return func()
+            finally:
+                timings[name] = time.perf_counter() - started
+
+        def after(future, timeout, func):
+            def run():
+                wait([future], timeout=timeout)
+                return func()
+            return run
+
+        started = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=max(len(sources), 1))
+        try:
+            futures = {}
+            for name, func in sources.items():
+                if name == "chart_analysis" and self.CHART_ANALYSIS == "render" and "ohlcv" in futures:
+                    # 렌더링 차트는 get_ohlcv_data가 저장소를 갱신한 뒤 읽기만 함 (저장소 갱신 1회)
+                    func = after(futures["ohlcv"], timeouts["ohlcv"], func)
+                futures[name] = executor.submit(timed, name, func)
+
+            analysis_data = dict(preset)
+            for name, future in futures.items():
+                remaining = timeouts[name] - (time.perf_counter() - started)
+                try:
+                    analysis_data[name] = future.result(timeout=max(remaining, 0))
+                except TimeoutError:
+                    print(f"Timeout in gather_analysis_data: {name} ({timeouts[name]}s)")
+                    timings.setdefault(name, time.perf_counter() - started)
+                    analysis_data[name] = None
+                except Exception as e:
+                    print(f"Error in gather_analysis_data ({name}): {e}")
+                    analysis_data[name] = None
+        finally:
+            # 타임아웃된 작업은 기다리지 않음
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if chart_features_after:
+            candles = self.last_candles if analysis_data.get("ohlcv") else None
+            analysis_data["chart_analysis"] = timed("chart_analysis", lambda: self.get_chart_features(candles))
+
+        timings["total"] = time.perf_counter() - started
+        self.last_timings = dict(timings)
+
+        print("\n=== Data Gathering Timings ===")
+        for name, elapsed in self.last_timings.items():
+            print(f"{name}: {elapsed:.2f}s")
+
+        return analysis_data
+
+
+
+
+    def build_messages(self, analysis_data):
+        """분석 데이터 -> LLM 메시지 (프롬프트용으로 줄인 뒤 토큰 예산에 맞춰 인코딩)"""
+        # 차트 분석 수행 (수집 단계에서 이미 수행된 경우 재사용)
+        if "chart_analysis" in analysis_data:
+            chart_analysis = analysis_data["chart_analysis"]
+        else:
+            chart_analysis = self.analyze_chart()
+
+        optimized_data = {**prompt_data(analysis_data), "chart_analysis": chart_analysis}
+
+        # 반올림/표 형식/뉴스 중복 제거로 입력 토큰 축소
+        payload, report = self.prompt_encoder.encode(optimized_data)
+        print("\n=== Prompt Size ===")
+        print(f"Tokens: ~{report['tokens']} / {report['budget']} "
+              f"(baseline ~{report['baseline_tokens']}, -{report['reduction']:.0%})")
+        print(", ".join(f"{name}: {tokens}" for name, tokens in report["sections"].items()))
+
+        return [
+            {"role": "system", "content": ANALYSIS_PROMPT},
+            {"role": "user", "content": f"Market data for analysis: {payload}"}
+        ]
+
+    def fingerprint(self, analysis_data):
+        """결정 캐시/기록용 시장 상태 키"""
+        return (self.ticker,) + self.decision_cache.fingerprint(market_features(analysis_data))
 
+    def get_ai_analysis(self, analysis_data):
+        """AI 분석 및 매매 신호 생성"""
+        self.last_llm_seconds = None
+        try:
+            # 시장 상태가 거의 변하지 않았다면 이전 결정 재사용
+            fingerprint = self.fingerprint(analysis_data)
+            cached = self.decision_cache.get(fingerprint)
+            if cached is not None:
+                result, age = cached
+                stats = self.decision_cache.stats()
+                print(f"\n=== Cached AI Decision (age {age:.0f}s, hit rate {stats['hit_rate']:.0%}) ===")
+                return {**result, "cached": True, "cache_age": age}
 
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": f"Market data for analysis: {json.dumps(optimized_data)}"}
-                ]
-            )
+            # JSON 모드로 호출 (일시적 오류는 재시도, 요청 거부/파싱 실패는 곧바로 대체 모델 사용)
+            response = self.llm.complete_json(self.build_messages(analysis_data))
+            print(f"LLM: {response.provider}/{response.model} in {response.latency:.2f}s "
+                  f"({response.attempts} attempt(s))")
+            self.last_llm_seconds = response.latency
 
 
 
 
-            result_text = response.choices[0].message.content
+            result = validate_decision(response.data)
+            if result is None:
+                print(f"Invalid AI decision: {response.data}")
+                return None
 
-            try:
-                result = json.loads(result_text)
-            except json.JSONDecodeError:
-                import re
-                json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-                if json_match:
-                    result = json.loads(json_match.group())
-                else:
-                    raise Exception("Failed to parse AI response")
+            self.decision_cache.put(fingerprint, result, response.latency)
+            self.commit_news(analysis_data.get("news"))
 
 
 
@@ -483,82 +572,110 @@ Please respond in the following JSON format:
 
 
     def execute_trade(self, decision, confidence_score, fear_greed_value):
-        """매매 실행 (공포탐욕지수 고려)"""
+        """매매 실행 (공포탐욕지수 고려), 주문한 경우 ExecutionReport 반환"""
+        report = None
+        if not self.trading_enabled:
+            print(f"Trading disabled, skipping {decision} for {self.ticker}")
+            return None
         try:
+            trade_ratio = self.policy.trade_ratio(decision, fear_greed_value)
+
             if decision == "buy":
-                if fear_greed_value <= 25:
-                    trade_ratio = 0.9995
-                elif fear_greed_value <= 40:
-                    trade_ratio = 0.7
-                else:
-                    trade_ratio = 0.5
-
-                if confidence_score > 70:
-                    krw = self.upbit.get_balance("KRW")
-                    if krw > 5000:
-                        order = self.upbit.buy_market_order(self.ticker, krw * trade_ratio)
+                if self.policy.should_trade(confidence_score):
+                    krw = self.account.balance("KRW")
+                    if krw > self.policy.min_order:
+                        report = self.executor.execute(self.ticker, "buy", krw * trade_ratio)
                         print("\n=== Buy Order Executed ===")
                         print(f"Trade Ratio: {trade_ratio * 100}%")
-                        print(json.dumps(order, indent=2))
+                        print(json.dumps(report.summary(), indent=2))
 
             elif decision == "sell":
-                if fear_greed_value >= 75:
-                    trade_ratio = 1.0
-                elif fear_greed_value >= 60:
-                    trade_ratio = 0.7
-                else:
-                    trade_ratio = 0.5
-
-                if confidence_score > 70:
-                    btc = self.upbit.get_balance(self.ticker)
-                    current_price = pyupbit.get_current_price(self.ticker)
-
-                    if btc * current_price > 5000:
+                if self.policy.should_trade(confidence_score):
+                    btc = self.account.balance(self.ticker)
+                    current_price = self.get_current_price()
+
+                    if btc * current_price > self.policy.min_order:
                         sell_amount = btc * trade_ratio
-                        order = self.upbit.sell_market_order(self.ticker, sell_amount)
+                        report = self.executor.execute(self.ticker, "sell", sell_amount)
                         print("\n=== Sell Order Executed ===")
                         print(f"Trade Ratio: {trade_ratio * 100}%")
-                        print(json.dumps(order, indent=2))
+                        print(json.dumps(report.summary(), indent=2))
 
         except Exception as e:
             print(f"Error in execute_trade: {e}")
+        return report
+
+    def record_cycle(self, analysis_data, ai_result, report=None, llm_seconds=None):
+        """사이클 1회 기록 (입력 fingerprint/지표/결정/체결/단계별 소요시간)"""
+        try:
+            features = None
+            fingerprint = None
+            if all(analysis_data.get(name) for name in ("current_status", "orderbook", "ohlcv", "fear_greed")):
+                features = market_features(analysis_data)
+                fingerprint = self.fingerprint(analysis_data)
+
+            timings = {name: seconds for name, seconds in self.last_timings.items() if name != "total"}
+            timings["gather"] = self.last_timings.get("total")
+            timings["llm"] = self.last_llm_seconds if llm_seconds is None else llm_seconds
+            if report is not None:
+                timings["execution"] = report.summary()["seconds"]
+
+            self.journal.append(journal_entry(
+                self.ticker, analysis_data, ai_result, report,
+                features=features, fingerprint=fingerprint, timings=timings,
+            ))
+        except Exception as e:
+            print(f"Error in record_cycle: {e}")
 
 
 
 
-def ai_trading():
+# 단계별 지연시간/호출 결과 계측 (status=none은 오류를 내부에서 처리하고 None 반환)
+instrument_methods(EnhancedCryptoTrader, [
+    "get_fear_greed_index", "get_current_status", "get_current_price", "get_raw_orderbook",
+    "get_orderbook_data", "get_ohlcv_data", "get_chart_features", "capture_and_analyze_chart",
+    "get_crypto_news", "gather_analysis_data", "get_ai_analysis", "execute_trade",
+], "trader_method")
+
+
+def ai_trading(trader=None):
+    """1회 분석/매매 후 스케줄러용 시장 상태 반환 (필수 데이터 수집 실패 시 None)"""
     try:
-        trader = EnhancedCryptoTrader("KRW-BTC")
-
-        current_status = trader.get_current_status()
-        orderbook_data = trader.get_orderbook_data()
-        ohlcv_data = trader.get_ohlcv_data()
-        fear_greed_data = trader.get_fear_greed_index()
-        news_data = trader.get_crypto_news()
-
-        if all([current_status, orderbook_data, ohlcv_data, fear_greed_data, news_data]):
-            analysis_data = {
-                "current_status": current_status,
-                "orderbook": orderbook_data,
-                "ohlcv": ohlcv_data,
-                "fear_greed": fear_greed_data,
-                "news": news_data
-            }
+        trader = trader or EnhancedCryptoTrader("KRW-BTC")
 
+        # 차트 캡처를 포함한 모든 데이터 소스를 병렬로 수집
+        analysis_data = trader.gather_analysis_data()
+        fear_greed_data = analysis_data["fear_greed"]
+
+        required = ["current_status", "orderbook", "ohlcv", "fear_greed", "news"]
+        if not all(analysis_data[name] for name in required):
+            # 데이터 수집 실패도 소요시간 분석을 위해 기록
+            trader.record_cycle(analysis_data, None)
+        else:
             ai_result = trader.get_ai_analysis(analysis_data)
+            report = None
 
             if ai_result:
                 print("\n=== AI Analysis Result ===")
                 print(json.dumps(ai_result, indent=2))
 
-                trader.execute_trade(
+                report = trader.execute_trade(
                     ai_result['decision'],
                     ai_result['confidence_score'],
                     fear_greed_data['current']['value']
                 )
 
+            trader.record_cycle(analysis_data, ai_result, report)
+
+            return {
+                "price": analysis_data["current_status"]["current_price"],
+                "atr": analysis_data["ohlcv"]["latest_indicators"]["hourly_atr"],
+                "llm_called": trader.last_llm_seconds is not None,
+            }
+
     except Exception as e:
         print(f"Error in ai_trading: {e}")
+    return None
 
 
 
@@ -567,13 +684,22 @@ if __name__ == "__main__":
     print("Starting Enhanced Bitcoin Trading Bot with Chart Analysis...")
     print("Press Ctrl+C to stop")
 
-    while True:
-        try:
-            ai_trading()
-            time.sleep(600)  # 10분 대기
-        except KeyboardInterrupt:
-            print("\nTrading bot stopped by user")
-            break
-        except Exception as e:
-            print(f"Error in main loop: {e}")
-            time.sleep(60)  # 에러 발생 시 60초 대기
+    # METRICS_PORT / METRICS_JSONL 설정 시 메트릭 내보내기
+    start_exporters()
+
+    # 현재가/호가는 WebSocket으로 수신하여 메모리에서 조회
+    market_feed = start_market_feed(["KRW-BTC"])
+    market_feed.wait_ready()
+    # 뉴스는 NEWS_POLL_INTERVAL(기본 15분)마다 백그라운드에서 수집
+    start_news_feed()
+
+    # 10분봉 마감에 맞춰 실행하고, 그 사이에는 ATR 대비 급변동 시 추가 실행
+    scheduler = TradingScheduler(
+        ai_trading,
+        interval=600,
+        price_source=lambda: market_feed.get_current_price("KRW-BTC") or pyupbit.get_current_price("KRW-BTC"),
+    )
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        print("\nTrading bot stopped by user")
@@ -0,0 +1,178 @@
+import math
+
+import numpy as np
+import pandas as pd
+import requests
+
+from candle_store import CandleStore, INTERVAL_SECONDS
+from indicators import IndicatorEngine
+from policy import TradePolicy
+
+
+UPBIT_FEE = 0.0005  # 업비트 KRW 마켓 수수료 (0.05%)
+
+
+def load_fear_greed_history(url="https://api.alternative.me/fng/"):
+    """전체 공포탐욕지수 이력 (KST 기준 날짜 인덱스)"""
+    response = requests.get(url, params={"limit": 0}, timeout=30)
+    response.raise_for_status()
+    data = response.json()['data']
+
+    timestamps = pd.to_datetime([int(item['timestamp']) for item in data], unit='s') + pd.Timedelta(hours=9)
+    values = [int(item['value']) for item in data]
+    return pd.Series(values, index=timestamps).sort_index()
+
+
+def align_fear_greed(index, fear_greed, default=50):
+    """캔들 시각별로 그 시점에 공개된 최신 공포탐욕지수 (as-of)"""
+    times = np.asarray(index, dtype="datetime64[ns]")
+    fear_greed_times = np.asarray(fear_greed.index, dtype="datetime64[ns]")
+    positions = np.searchsorted(fear_greed_times, times, side="right") - 1
+
+    values = np.asarray(fear_greed.to_numpy(), dtype=float)[np.maximum(positions, 0)]
+    values[positions < 0] = default
+    return values
+
+
+def indicator_signals(df, rsi_low=30, rsi_high=70, engine=None):
+    """RSI/볼린저 밴드 기반 신호 (1=buy, -1=sell, 0=hold)와 신뢰도 (벡터화)
+
+    신뢰도는 매수 시 100 - RSI, 매도 시 RSI 이므로
+    RSI 30 미만/70 초과일 때 기본 신뢰도 기준(70)을 넘는다.
+    """
+    if 'rsi' not in df or 'bb_pband' not in df:
+        df = (engine or IndicatorEngine()).frame(df.copy())
+
+    rsi = df['rsi'].to_numpy(dtype=float)
+    pband = df['bb_pband'].to_numpy(dtype=float)
+
+    with np.errstate(invalid="ignore"):
+        buy = (rsi < rsi_low) | (pband < 0)
+        sell = (rsi > rsi_high) | (pband > 1)
+
+    decisions = np.where(buy & ~sell, 1, np.where(sell & ~buy, -1, 0))
+    confidences = np.where(decisions > 0, 100 - rsi, np.where(decisions < 0, rsi, 0.0))
+    return decisions, np.nan_to_num(confidences)
+
+
+class BacktestResult:
+    """백테스트 결과 (자산 곡선, 거래 내역, 성과 지표)"""
+
+    def __init__(self, index, equity, trades, periods_per_year):
+        self.index = index
+        self.equity = equity
+        self.trades = trades
+        self.periods_per_year = periods_per_year
+
+    def equity_curve(self):
+        return pd.Series(self.equity, index=self.index, name="equity")
+
+    def trade_log(self):
+        return pd.DataFrame(self.trades, columns=["time", "side", "price", "volume", "krw", "fee"])
+
+    def stats(self):
+        equity = self.equity
+        returns = np.diff(equity) / equity[:-1] if len(equity) > 1 else np.zeros(0)
+        peak = np.maximum.accumulate(equity)
+        std = returns.std() if len(returns) else 0.0
+
+        return {
+            "total_return": float(equity[-1] / equity[0] - 1) if len(equity) else 0.0,
+            "max_drawdown": float(np.max(1 - equity / peak)) if len(equity) else 0.0,
+            "sharpe": float(returns.mean() / std * math.sqrt(self.periods_per_year)) if std > 0 else 0.0,
+            "trades": len(self.trades),
+        }
+
+
+class Backtester:
+    """execute_trade와 같은 TradePolicy로 과거 캔들을 재생하는 백테스터"""
+
+    def __init__(self, policy=None, fee=UPBIT_FEE, slippage=0.0, initial_krw=1_000_000):
+        self.policy = policy or TradePolicy()
+        self.fee = fee
+        self.slippage = slippage
+        self.initial_krw = initial_krw
+
+    def run(self, index, close, decisions, confidences, fear_greed, periods_per_year=365):
+        """종가 체결 가정으로 신호를 재생
+
+        decisions: 1=buy, -1=sell, 0=hold (LLM 기록 또는 indicator_signals)
+        """
+        close = np.asarray(close, dtype=float)
+        decisions = np.asarray(decisions)
+        confidences = np.asarray(confidences, dtype=float)
+
+        # 매매 비율/신뢰도 조건은 벡터화 계산 후, 실제 주문이 가능한 시점만 순회
+        ratios = self.policy.trade_ratios(decisions, fear_greed)
+        active = np.flatnonzero((ratios > 0) & (confidences > self.policy.min_confidence))
+
+        krw = float(self.initial_krw)
+        volume = 0.0
+        event_index = [0]
+        event_krw = [krw]
+        event_volume = [volume]
+        trades = []
+        min_order = self.policy.min_order
+
+        for i in active:
+            if decisions[i] > 0:
+                # 매수: 잔고 > 최소 주문 금액일 때 잔고 * 비율 만큼 시장가 매수 (수수료 별도)
+                if krw <= min_order:
+                    continue
+                amount = krw * ratios[i]
+                if amount < min_order:
+                    continue
+                fee = amount * self.fee
+                if amount + fee > krw:
+                    amount = krw / (1 + self.fee)
+                    fee = krw - amount
+                price = close[i] * (1 + self.slippage)
+                krw -= amount + fee
+                volume += amount / price
+                trades.append((index[i], "buy", price, amount / price, amount, fee))
+            else:
+                # 매도: 평가액 > 최소 주문 금액일 때 보유 수량 * 비율 만큼 시장가 매도
+                price = close[i] * (1 - self.slippage)
+                if volume * price <= min_order:
+                    continue
+                sell_volume = volume * ratios[i]
+                amount = sell_volume * price
+                if amount < min_order:
+                    continue
+                fee = amount * self.fee
+                krw += amount - fee
+                volume -= sell_volume
+                trades.append((index[i], "sell", price, sell_volume, amount, fee))
+
+            event_index.append(i)
+            event_krw.append(krw)
+            event_volume.append(volume)
+
+        # 각 캔들 시점의 잔고/보유량을 마지막 거래 기준으로 채워 자산 곡선 계산
+        positions = np.searchsorted(np.asarray(event_index), np.arange(len(close)), side="right") - 1
+        equity = np.asarray(event_krw)[positions] + np.asarray(event_volume)[positions] * close
+
+        return BacktestResult(index, equity, trades, periods_per_year)
+
+
+def run_backtest(ticker="KRW-BTC", interval="day", count=1000, policy=None, fear_greed=None):
+    """로컬 캔들 저장소 + 공포탐욕지수 이력으로 지표 신호 백테스트"""
+    df = CandleStore().get_ohlcv(ticker, interval=interval, count=count)
+    if fear_greed is None:
+        fear_greed = load_fear_greed_history()
+
+    decisions, confidences = indicator_signals(df)
+    fear_greed_values = align_fear_greed(df.index, fear_greed)
+    periods_per_year = 365 * 86400 / INTERVAL_SECONDS[interval]
+
+    return Backtester(policy).run(
+        df.index, df['close'].to_numpy(), decisions, confidences, fear_greed_values, periods_per_year
+    )
+
+
+if __name__ == "__main__":
+    result = run_backtest()
+    print("\n=== Backtest Result ===")
+    for name, value in result.stats().items():
+        print(f"{name}: {value:.4f}" if isinstance(value, float) else f"{name}: {value}")
+    print(result.trade_log().tail(10))
@@ -0,0 +1,525 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+
+# 기록된 응답 파일 위치와 회귀 기준 (저장소에 포함)
+FIXTURE_DIR = "bench_fixtures"
+THRESHOLDS_PATH = "benchmark_thresholds.json"
+INTERVALS = {"day": 86400, "minute60": 3600}
+CANDLE_COLUMNS = ["open", "high", "low", "close", "volume", "value"]
+# 기준 결과 대비 비교 시 이 값(초) 미만의 차이는 측정 잡음으로 간주
+MIN_REGRESSION = 0.0005
+
+SAMPLE_DECISION = {
+    "decision": "buy",
+    "reason": "RSI recovering from oversold with bid-side orderbook imbalance and improving sentiment.",
+    "risk_level": "medium",
+    "confidence_score": 78,
+}
+
+
+# 고정 입력 (기록 파일이 없으면 시드 기반 합성 데이터)
+
+def synthetic_candles(interval, count=400, seed=0, price=100_000_000):
+    """로그 정규 랜덤워크 캔들 (pyupbit.get_ohlcv와 같은 컬럼)"""
+    rng = np.random.default_rng(seed + count + len(interval))
+    volatility = 0.03 if interval == "day" else 0.006
+    close = price * np.exp(np.cumsum(rng.normal(0, volatility, count)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, volatility / 2, (2, count))) * close
+    volume = rng.lognormal(3, 0.5, count)
+    step = pd.Timedelta(seconds=INTERVALS[interval])
+    index = pd.Timestamp("2024-01-01 09:00:00") + step * np.arange(count)
+    return pd.DataFrame({
+        "open": open_,
+        "high": np.maximum(open_, close) + spread[0],
+        "low": np.minimum(open_, close) - spread[1],
+        "close": close,
+        "volume": volume,
+        "value": volume * close,
+    }, index=index)
+
+
+def synthetic_orderbook(ticker, price, levels=15, seed=0):
+    rng = np.random.default_rng(seed)
+    tick = 1000
+    best_ask = round(price / tick) * tick + tick
+    return {
+        "market": ticker,
+        "timestamp": 0,
+        "total_ask_size": 0,
+        "total_bid_size": 0,
+        "orderbook_units": [
+            {
+                "ask_price": best_ask + tick * i,
+                "bid_price": best_ask - tick * (i + 1),
+                "ask_size": float(rng.uniform(0.5, 3)),
+                "bid_size": float(rng.uniform(0.5, 3)),
+            }
+            for i in range(levels)
+        ],
+    }
+
+
+def synthetic_fixtures(ticker="KRW-BTC", seed=0):
+    candles = {interval: synthetic_candles(interval, seed=seed) for interval in INTERVALS}
+    price = float(candles["minute60"]["close"].iloc[-1])
+    now = int(time.time())
+    return {
+        "ticker": ticker,
+        "source": "synthetic",
+        "candles": candles,
+        "orderbook": synthetic_orderbook(ticker, price, seed=seed),
+        "balances": {"KRW": 1_000_000},
+        "fear_greed": {"data": [
+            {"value": str(30 + i * 3), "value_classification": "Fear", "timestamp": str(now - i * 86400)}
+            for i in range(7)
+        ]},
+        "news": {"news_results": [
+            {
+                "title": title,
+                "link": f"https://example.com/news/{i}",
+                "source": {"name": "Example"},
+                "date": "1 hour ago",
+                "snippet": "Bitcoin traded in a narrow range as traders awaited macro data. " * 2,
+            }
+            for i, title in enumerate([
+                "Bitcoin rallies as ETF inflows surge",
+                "Bitcoin market update",
+                "Crypto lender hacked, losses mount",
+                "Bitcoin holds support despite selloff fears",
+                "Analysts turn bullish on Bitcoin recovery",
+                "Regulators probe exchange over fraud claims",
+                "Bitcoin price does not recover after weekend drop",
+                "Bitcoin market update",  # 중복 제목
+            ])
+        ]},
+        "llm": {
+            "content": json.dumps(SAMPLE_DECISION),
+            "usage": {"prompt_tokens": 1800, "completion_tokens": 90, "total_tokens": 1890},
+        },
+    }
+
+
+def _candles_to_json(df):
+    return {
+        "columns": CANDLE_COLUMNS,
+        "index": [int(ts.value // 1_000_000) for ts in df.index],
+        "data": df[CANDLE_COLUMNS].values.tolist(),
+    }
+
+
+def _candles_from_json(data):
+    index = pd.to_datetime(data["index"], unit="ms")
+    return pd.DataFrame(data["data"], columns=data["columns"], index=index)
+
+
+def load_fixtures(path=FIXTURE_DIR, ticker="KRW-BTC"):
+    """기록 파일로 합성 데이터를 덮어씀 (일부만 기록되어 있어도 동작)"""
+    fixtures = synthetic_fixtures(ticker)
+    if not path or not os.path.isdir(path):
+        return fixtures
+
+    recorded = []
+    for name in ("orderbook", "balances", "fear_greed", "news", "llm"):
+        file_path = os.path.join(path, f"{name}.json")
+        if os.path.exists(file_path):
+            with open(file_path, "r", encoding="utf-8") as f:
+                fixtures[name] = json.load(f)
+            recorded.append(name)
+    for interval in INTERVALS:
+        file_path = os.path.join(path, f"candles_{interval}.json")
+        if os.path.exists(file_path):
+            with open(file_path, "r", encoding="utf-8") as f:
+                fixtures["candles"][interval] = _candles_from_json(json.load(f))
+            recorded.append(f"candles_{interval}")
+
+    if recorded:
+        fixtures["source"] = f"{path} ({', '.join(recorded)})"
+        fixtures["ticker"] = fixtures["orderbook"].get("market", ticker)
+    return fixtures
+
+
+def record_fixtures(path=FIXTURE_DIR, ticker="KRW-BTC", llm=False):
+    """실제 업비트/공포탐욕지수/SerpAPI(/LLM) 응답을 기록 (잔고는 기록하지 않음)"""
+    import pyupbit
+    import requests
+
+    os.makedirs(path, exist_ok=True)
+
+    def save(name, data):
+        with open(os.path.join(path, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        print(f"Recorded {name}")
+
+    for interval in INTERVALS:
+        save(f"candles_{interval}", _candles_to_json(pyupbit.get_ohlcv(ticker, interval=interval, count=400)))
+    save("orderbook", pyupbit.get_orderbook(ticker))
+    save("fear_greed", requests.get("https://api.alternative.me/fng/?limit=7").json())
+
+    serpapi_key = os.getenv("SERPAPI_KEY")
+    if serpapi_key:
+        save("news", requests.get("https://serpapi.com/search.json", params={
+            "engine": "google_news", "q": "bitcoin crypto trading", "api_key": serpapi_key, "gl": "us", "hl": "en",
+        }).json())
+
+    if llm:
+        from llm import get_llm_client
+
+        # 기록된 입력으로 만든 실제 프롬프트에 대한 응답
+        fixtures = load_fixtures(path, ticker)
+        with FixtureServer(fixtures) as server, contextlib.closing(FixtureStore(fixtures)) as candles:
+            trader = server.trader(candles.store)
+            response = get_llm_client("analysis").complete_json(
+                trader.build_messages(trader.gather_analysis_data())
+            )
+        save("llm", {"content": response.text, "usage": response.usage})
+
+
+# 네트워크 대체 (로컬 HTTP 서버, 캔들 조회 함수, 시세 피드)
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    fixtures = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/fng"):
+            self._send_json(self.fixtures["fear_greed"])
+        elif self.path.startswith("/search.json"):
+            self._send_json(self.fixtures["news"])
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        llm = self.fixtures["llm"]
+        self._send_json({
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fixture"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": llm["content"]},
+                "finish_reason": "stop",
+            }],
+            "usage": llm.get("usage") or {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+
+class FixtureServer:
+    """공포탐욕지수/SerpAPI/OpenAI 호환 chat completions를 기록된 응답으로 대신하는 로컬 서버"""
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        handler = type("FixtureHandler", (_FixtureHandler,), {"fixtures": fixtures})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._llm = None
+        self.journal_root = tempfile.mkdtemp(prefix="bench_journal_")
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.journal_root, ignore_errors=True)
+
+    def llm_client(self):
+        """실제 SDK/LLMClient 경로를 거쳐 로컬 서버를 호출하는 클라이언트"""
+        if self._llm is None:
+            from llm import LLMClient, Route, openai_provider
+
+            provider = openai_provider(api_key="bench", base_url=f"{self.url}/v1")
+            self._llm = LLMClient([Route(provider, "fixture")])
+        return self._llm
+
+    def trader(self, candle_store):
+        """기록된 응답만 사용하는 트레이더 (매 호출마다 새 모의 거래소/캐시)"""
+        from account import AccountState
+        from autotrade import EnhancedCryptoTrader
+        from cache import TTLCache
+        from decision_cache import DecisionCache
+        from exchange_sim import SimulatedExchange
+        from execution import ExecutionEngine
+        from journal import DecisionJournal
+        from news_feed import NewsFeed
+
+        ticker = self.fixtures["ticker"]
+        exchange = SimulatedExchange([self.fixtures["orderbook"]], balances=self.fixtures["balances"])
+        feed = FixtureFeed(self.fixtures, exchange)
+        account = AccountState(exchange)
+        trader = EnhancedCryptoTrader(
+            ticker, upbit=exchange, llm=self.llm_client(), vision_llm=self.llm_client(),
+            candle_store=candle_store, cache=TTLCache(), market_feed=feed,
+            decision_cache=DecisionCache(ttl=0),  # 항상 모델 호출 경로 측정
+            account=account,
+            executor=ExecutionEngine(exchange, orderbook_source=feed.get_orderbook, account=account,
+                                     sleep=exchange.sleep),
+            journal=DecisionJournal(self.journal_root),
+            news_feed=NewsFeed(url=f"{self.url}/search.json", api_key="bench"),
+        )
+        trader.CHART_ANALYSIS = "features"
+        trader.fear_greed_api = f"{self.url}/fng/"
+        return trader
+
+
+class FixtureFeed:
+    """MarketFeed 대체: 기록된 호가와 최근 종가"""
+
+    def __init__(self, fixtures, exchange):
+        self.fixtures = fixtures
+        self.exchange = exchange
+
+    def get_current_price(self, ticker):
+        return float(self.fixtures["candles"]["minute60"]["close"].iloc[-1])
+
+    def get_orderbook(self, ticker):
+        orderbook = self.exchange.get_orderbook(ticker)
+        orderbook["timestamp"] = int(time.time() * 1000)
+        return orderbook
+
+    def get_trades(self, ticker, count=None):
+        return []
+
+
+class FixtureStore:
+    """기록된 캔들을 현재 시각에 맞춰 옮긴 뒤 pyupbit.get_ohlcv 대신 제공하는 캔들 저장소"""
+
+    def __init__(self, fixtures):
+        from candle_store import CandleStore, KST
+
+        self.kst = KST
+        self.candles = {}
+        now = pd.Timestamp(datetime.now(timezone.utc).replace(tzinfo=None) + KST)
+        for interval, df in fixtures["candles"].items():
+            # 마지막 캔들이 현재 진행 중인 캔들이 되도록 봉 단위로 이동 (증분 갱신 경로 측정)
+            step = pd.Timedelta(seconds=INTERVALS[interval])
+            shift = ((now - df.index[-1]) // step) * step
+            self.candles[interval] = df.set_axis(df.index + shift)
+        self.root = tempfile.mkdtemp(prefix="bench_candles_")
+        self.store = CandleStore(root=self.root, fetch=self.fetch)
+
+    def close(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def fetch(self, ticker, interval="day", count=200, to=None):
+        df = self.candles[interval]
+        if to is not None:
+            df = df[df.index < pd.Timestamp(to) + self.kst]
+        return df.iloc[-count:].copy()
+
+
+# 측정
+
+def measure(func, iterations=50, warmup=2, budget=10.0, setup=None):
+    """warmup 후 iterations회(또는 budget초까지) 실행한 소요시간 통계 (setup은 측정에서 제외)"""
+    for _ in range(warmup):
+        func(*(setup() if setup else ()))
+
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < iterations and (not timings or time.perf_counter() - started < budget):
+        args = setup() if setup else ()
+        call_started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - call_started)
+
+    timings = np.array(timings)
+    return {
+        "iterations": len(timings),
+        "mean": float(timings.mean()),
+        "p50": float(np.median(timings)),
+        "p95": float(np.percentile(timings, 95)),
+        "min": float(timings.min()),
+        "max": float(timings.max()),
+    }
+
+
+def _disable_rate_limits():
+    """업비트 레이트 리미터 대기는 측정에서 제외"""
+    from rate_limit import UPBIT_RATE_LIMITS, get_rate_limiter
+
+    for group in UPBIT_RATE_LIMITS:
+        limiter = get_rate_limiter(group)
+        limiter.rate = limiter.capacity = limiter.tokens = 1e9
+
+
+def run_benchmarks(fixtures, iterations=50, names=None):
+    """각 핫패스의 소요시간 측정 {이름: 통계}"""
+    from analysis import validate_decision
+    from autotrade import ai_trading
+    from chart_features import chart_features
+    from chart_render import ChartRenderer
+    from execution import estimate_impact
+    from news_feed import NewsFeed
+    from records import frame_to_records
+
+    _disable_rate_limits()
+    candles = FixtureStore(fixtures)
+    store = candles.store
+    ticker = fixtures["ticker"]
+    results = {}
+
+    with FixtureServer(fixtures) as server, contextlib.closing(candles):
+        trader = server.trader(store)
+        daily = store.get_ohlcv(ticker, interval="day", count=200)
+        hourly = store.get_ohlcv(ticker, interval="minute60", count=200)
+        daily_indicators = trader.add_technical_indicators(daily.iloc[-30:], "day")
+        hourly_indicators = trader.add_technical_indicators(hourly.iloc[-24:], "minute60")
+        analysis_data = trader.gather_analysis_data()
+        messages = trader.build_messages(analysis_data)
+        renderer = ChartRenderer()
+
+        cases = {
+            # 지표 전체 계산 (스트리밍 엔진 캐시 없이)
+            "add_technical_indicators": (lambda: trader.add_technical_indicators(daily), iterations),
+            "ohlcv_serialization": (lambda: (
+                frame_to_records(daily_indicators, '%Y-%m-%d', last=7),
+                frame_to_records(hourly_indicators, '%Y-%m-%d %H:%M:%S', last=6),
+            ), iterations),
+            # 캔들 증분 갱신 + 지표 + 직렬화
+            "get_ohlcv_data": (trader.get_ohlcv_data, iterations),
+            "get_orderbook_data": (trader.get_orderbook_data, iterations),
+            "chart_features": (lambda: (chart_features(daily.iloc[-120:]), chart_features(hourly)), iterations),
+            "chart_render": (lambda: renderer.render(hourly, title=f"{ticker} minute60"), max(iterations // 5, 5)),
+            "estimate_impact": (lambda: estimate_impact(fixtures["orderbook"], "buy", 50_000_000), iterations * 10),
+            "prompt_construction": (lambda: trader.build_messages(analysis_data), iterations),
+            # 기사 중복 제거 + 감성 점수 (새 피드에 1회 조회분)
+            "news_ingest": (lambda: NewsFeed(url="", api_key="", http=object()).ingest(
+                fixtures["news"]["news_results"]), iterations * 10),
+            "response_parsing": (lambda: validate_decision(json.loads(fixtures["llm"]["content"])), iterations * 10),
+            # SDK + 로컬 서버 왕복 (LLMClient 오버헤드)
+            "llm_roundtrip": (lambda: trader.llm.complete_json(messages), iterations),
+        }
+        # 매 반복마다 새 모의 거래소/캐시 (트레이더 생성은 측정에서 제외)
+        fresh_trader = lambda: (server.trader(store),)
+        slow_cases = {
+            "gather_analysis_data": lambda fresh: fresh.gather_analysis_data(),
+            # 전체 사이클: 데이터 수집 -> 프롬프트 -> LLM -> 주문
+            "ai_trading_cycle": ai_trading,
+        }
+
+        for name, (func, count) in cases.items():
+            if not names or name in names:
+                results[name] = measure(func, iterations=count)
+                print(f"{name}: p50 {results[name]['p50'] * 1000:.2f}ms", file=sys.stderr)
+        for name, func in slow_cases.items():
+            if not names or name in names:
+                results[name] = measure(func, iterations=max(iterations // 5, 5), setup=fresh_trader)
+                print(f"{name}: p50 {results[name]['p50'] * 1000:.2f}ms", file=sys.stderr)
+
+    return results
+
+
+def find_regressions(results, thresholds=None, baseline=None, tolerance=0.25):
+    """절대 기준 {이름: {통계: 초}} 초과 또는 기준 결과 대비 p50이 tolerance 이상 느려진 항목"""
+    regressions = []
+    for name, stats in results.items():
+        for stat, limit in (thresholds or {}).get(name, {}).items():
+            if stats[stat] > limit:
+                regressions.append({"name": name, "stat": stat, "value": stats[stat], "limit": limit})
+
+        base = (baseline or {}).get(name)
+        if base is not None:
+            limit = base["p50"] * (1 + tolerance)
+            if stats["p50"] > limit and stats["p50"] - base["p50"] > MIN_REGRESSION:
+                regressions.append({"name": name, "stat": "p50", "value": stats["p50"], "limit": limit,
+                                    "baseline": base["p50"]})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기록된 응답으로 오프라인 성능 측정")
+    subparsers = parser.add_subparsers(dest="command")
+
+    run = subparsers.add_parser("run", help="벤치마크 실행 (기본)")
+    record = subparsers.add_parser("record", help="실제 API 응답을 fixture로 기록")
+    for sub in (run, record):
+        sub.add_argument("--fixtures", default=FIXTURE_DIR)
+        sub.add_argument("--ticker", default="KRW-BTC")
+    run.add_argument("--iterations", type=int, default=50)
+    run.add_argument("--only", nargs="*", help="측정할 항목 이름")
+    run.add_argument("--output", help="결과 JSON 파일 (기본: 표준출력)")
+    run.add_argument("--thresholds", default=THRESHOLDS_PATH)
+    run.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    run.add_argument("--tolerance", type=float, default=0.25)
+    record.add_argument("--llm", action="store_true", help="LLM 응답도 기록 (API 호출 1회)")
+
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in ("run", "record", "-h", "--help"):
+        argv.insert(0, "run")
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        record_fixtures(args.fixtures, args.ticker, llm=args.llm)
+        return 0
+
+    fixtures = load_fixtures(args.fixtures, args.ticker)
+    # 측정 대상의 진행 로그는 버림 (출력 포맷팅 비용은 측정에 포함)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        results = run_benchmarks(fixtures, args.iterations, args.only)
+
+    thresholds = None
+    if args.thresholds and os.path.exists(args.thresholds):
+        with open(args.thresholds, "r", encoding="utf-8") as f:
+            thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    regressions = find_regressions(results, thresholds, baseline, args.tolerance)
+    report = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "fixtures": fixtures["source"],
+        "results": results,
+        "regressions": regressions,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    for item in regressions:
+        print(f"REGRESSION {item['name']} {item['stat']}: {item['value'] * 1000:.2f}ms > {item['limit'] * 1000:.2f}ms",
+              file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from metrics import get_metrics
+
+
+class TTLCache:
+    """소스별 TTL 캐시 (stale-while-revalidate, 실패 시 마지막 정상값 반환)
+
+    loader가 None을 반환하거나 예외를 던지면 갱신 실패로 간주
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._entries = {}  # key -> (value, fetched_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.stats = defaultdict(lambda: {"hits": 0, "stale_hits": 0, "misses": 0, "errors": 0})
+        self._load()
+
+    def _load(self):
+        """디스크에 저장된 캐시 복원"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._entries = {key: (item["value"], item["fetched_at"]) for key, item in data.items()}
+        except Exception as e:
+            print(f"Error in TTLCache._load: {e}")
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            with self._lock:
+                data = {
+                    key: {"value": value, "fetched_at": fetched_at}
+                    for key, (value, fetched_at) in self._entries.items()
+                }
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error in TTLCache._save: {e}")
+
+    def _refresh(self, key, loader):
+        """loader 호출 후 성공 시 저장 (실패 시 기존 값 유지)"""
+        try:
+            value = loader()
+        except Exception as e:
+            print(f"Error in TTLCache refresh ({key}): {e}")
+            value = None
+
+        with self._lock:
+            self._refreshing.discard(key)
+            if value is None:
+                self.stats[key]["errors"] += 1
+                entry = self._entries.get(key)
+                return entry[0] if entry else None
+            self._entries[key] = (value, time.time())
+
+        self._save()
+        return value
+
+    def get(self, key, loader, ttl, stale_ttl=0):
+        """캐시 조회
+
+        - ttl 이내: 캐시 값 반환
+        - ttl ~ ttl + stale_ttl: 캐시 값 반환 후 백그라운드 갱신
+        - 그 이후 또는 없음: 동기 갱신 (실패 시 마지막 정상값)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            age = time.time() - entry[1] if entry else None
+
+            if entry and age < ttl:
+                self.stats[key]["hits"] += 1
+                return entry[0]
+
+            if entry and age < ttl + stale_ttl:
+                self.stats[key]["stale_hits"] += 1
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+                return entry[0]
+
+            self.stats[key]["misses"] += 1
+            self._refreshing.add(key)
+
+        return self._refresh(key, loader)
+
+    def invalidate(self, key=None):
+        """캐시 항목 삭제 (key가 없으면 전체)"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        self._save()
+
+    def summary(self):
+        """키별 적중/미스/오류 횟수 및 적중률"""
+        with self._lock:
+            result = {}
+            for key, counts in list(self.stats.items()):
+                total = counts["hits"] + counts["stale_hits"] + counts["misses"]
+                hit_rate = (counts["hits"] + counts["stale_hits"]) / total if total else 0.0
+                result[key] = {**counts, "hit_rate": hit_rate}
+            return result
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """프로세스 전역 캐시 (TTL_CACHE_PATH 설정 시 디스크에 저장)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TTLCache(os.getenv("TTL_CACHE_PATH"))
+            get_metrics().add_collector(_collect_cache)
+        return _cache
+
+
+def _collect_cache():
+    samples = []
+    for key, counts in _cache.summary().items():
+        for result in ("hits", "stale_hits", "misses", "errors"):
+            samples.append(("ttl_cache_lookups_total", "counter", {"key": key, "result": result}, counts[result]))
+    return samples
@@ -0,0 +1,248 @@
+import json
+import math
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pyupbit
+
+from rate_limit import upbit_request
+
+
+# 디스크에 저장되는 캔들 레코드 (시각은 pyupbit 인덱스와 같은 KST 기준 ns)
+CANDLE_DTYPE = np.dtype([
+    ("timestamp", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+    ("value", "<f8"),
+])
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume", "value"]
+
+INTERVAL_SECONDS = {
+    "minute1": 60,
+    "minute3": 180,
+    "minute5": 300,
+    "minute10": 600,
+    "minute15": 900,
+    "minute30": 1800,
+    "minute60": 3600,
+    "minute240": 14400,
+    "day": 86400,
+    "week": 604800,
+}
+
+KST = timedelta(hours=9)
+
+
+def _to_records(df):
+    """pyupbit DataFrame -> 캔들 레코드 배열"""
+    records = np.empty(len(df), dtype=CANDLE_DTYPE)
+    records["timestamp"] = df.index.values.astype("datetime64[ns]").astype("<i8")
+    for column in OHLCV_COLUMNS:
+        records[column] = df[column].to_numpy(dtype="<f8")
+    return records
+
+
+def _to_frame(records):
+    """캔들 레코드 배열 -> pyupbit 형식 DataFrame"""
+    index = pd.DatetimeIndex(np.asarray(records["timestamp"]).astype("datetime64[ns]"))
+    return pd.DataFrame(
+        {column: np.array(records[column]) for column in OHLCV_COLUMNS},
+        index=index,
+    )
+
+
+class CandleStore:
+    """티커/봉 단위별 로컬 캔들 저장소 (메모리 맵 기반, 증분 추가)"""
+
+    def __init__(self, root="candles", history=200, fetch=pyupbit.get_ohlcv):
+        self.root = root
+        self.history = history
+        self.fetch = fetch
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._empty = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    def _fetch(self, ticker, interval, count, **kwargs):
+        """업비트 캔들 조회 (200개당 1회 요청, 시세 API 레이트 리미터 적용)"""
+        with upbit_request("quotation", "candles", math.ceil(count / 200)):
+            return self.fetch(ticker, interval=interval, count=count, **kwargs)
+
+    def _path(self, ticker, interval):
+        return os.path.join(self.root, f"{ticker}_{interval}.bin")
+
+    def _key_lock(self, ticker, interval):
+        with self._lock:
+            return self._locks.setdefault((ticker, interval), threading.Lock())
+
+    def load(self, ticker, interval):
+        """저장된 캔들 전체 (읽기 전용 memmap, 네트워크 I/O 없음)"""
+        path = self._path(ticker, interval)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.memmap(path, dtype=CANDLE_DTYPE, mode="r")
+
+    def get(self, ticker, interval, count=None):
+        """최근 count개 캔들을 DataFrame으로 반환"""
+        records = self.load(ticker, interval)
+        if count is not None:
+            records = records[-count:]
+        return _to_frame(records)
+
+    def _write(self, ticker, interval, records, keep):
+        """앞쪽 keep개 레코드만 남기고 뒤에 records 추가"""
+        path = self._path(ticker, interval)
+        mode = "r+b" if os.path.exists(path) else "wb"
+        with open(path, mode) as f:
+            # 읽는 쪽 memmap이 깨지지 않도록 제자리 덮어쓰기 후 남는 부분만 잘라냄
+            f.seek(keep * CANDLE_DTYPE.itemsize)
+            f.write(records.tobytes())
+            end = f.tell()
+            f.seek(0, os.SEEK_END)
+            if f.tell() > end:
+                f.truncate(end)
+
+    def _merge(self, ticker, interval, fetched):
+        """새로 받은 캔들을 저장본과 병합 (겹치는 구간은 새 값으로 교체)"""
+        if fetched is None or len(fetched) == 0:
+            return 0
+
+        new = _to_records(fetched)
+        stored = self.load(ticker, interval)
+        if len(stored) == 0:
+            self._write(ticker, interval, new, 0)
+            return len(new)
+
+        keep = int(np.searchsorted(stored["timestamp"], new["timestamp"][0]))
+        added = len(new) - (len(stored) - keep)
+        if keep < len(stored) and new["timestamp"][-1] < stored["timestamp"][-1]:
+            # 중간 구간 보강: 전체 재작성
+            merged = np.concatenate([stored, new])
+            _, unique = np.unique(merged["timestamp"][::-1], return_index=True)
+            merged = merged[::-1][unique]
+            added = len(merged) - len(stored)
+            del stored
+            self._write(ticker, interval, merged, 0)
+            return added
+
+        del stored
+        self._write(ticker, interval, new, keep)
+        return max(added, 0)
+
+    def update(self, ticker, interval):
+        """마지막 저장 시각 이후의 캔들만 조회하여 추가"""
+        with self._key_lock(ticker, interval):
+            stored = self.load(ticker, interval)
+            if len(stored) == 0:
+                count = self.history
+            else:
+                last = pd.Timestamp(int(stored["timestamp"][-1]))
+                now = datetime.now(timezone.utc).replace(tzinfo=None) + KST
+                step = INTERVAL_SECONDS[interval]
+                # 마지막 캔들은 미완성일 수 있으므로 다시 받아서 교체
+                count = int((now - last).total_seconds() // step) + 1
+            del stored
+
+            added = self._merge(ticker, interval, self._fetch(ticker, interval=interval, count=max(count, 1)))
+            self.backfill(ticker, interval)
+            return added
+
+    def _empty_path(self, ticker, interval):
+        return os.path.join(self.root, f"{ticker}_{interval}.empty.json")
+
+    def empty_spans(self, ticker, interval):
+        """거래가 없어 캔들이 없다고 확인된 구간 [(이전 캔들 시각, 다음 캔들 시각), ...]"""
+        key = (ticker, interval)
+        with self._lock:
+            if key not in self._empty:
+                path = self._empty_path(ticker, interval)
+                spans = []
+                if os.path.exists(path):
+                    try:
+                        with open(path, encoding="utf-8") as f:
+                            spans = [tuple(span) for span in json.load(f)]
+                    except Exception as e:
+                        print(f"Error in CandleStore.empty_spans: {e}")
+                self._empty[key] = spans
+            return list(self._empty[key])
+
+    def _mark_empty(self, ticker, interval, start, end):
+        spans = self.empty_spans(ticker, interval) + [(start, end)]
+        path = self._empty_path(ticker, interval)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(spans, f)
+        os.replace(path + ".tmp", path)
+        with self._lock:
+            self._empty[(ticker, interval)] = spans
+
+    def gaps(self, ticker, interval, include_empty=False):
+        """누락된 구간 목록 [(이전 캔들 시각, 다음 캔들 시각), ...]
+
+        include_empty=False이면 거래가 없어 채울 수 없다고 확인된 구간 안의 누락은 제외
+        """
+        timestamps = np.asarray(self.load(ticker, interval)["timestamp"])
+        step = INTERVAL_SECONDS[interval] * 1_000_000_000
+        missing = np.flatnonzero(np.diff(timestamps) > step)
+        gaps = [(int(timestamps[i]), int(timestamps[i + 1])) for i in missing]
+        if include_empty or not gaps:
+            return gaps
+
+        empty = self.empty_spans(ticker, interval)
+        return [
+            (start, end) for start, end in gaps
+            if not any(span_start <= start and end <= span_end for span_start, span_end in empty)
+        ]
+
+    def backfill(self, ticker, interval):
+        """누락된 구간 보강
+
+        조회가 성공했는데도 구간 안의 캔들이 비어 있으면 (업비트는 거래 없는 구간의 캔들을 만들지 않음)
+        해당 구간을 확인된 빈 구간으로 기록하여 이후 갱신에서 다시 요청하지 않는다.
+        """
+        step = INTERVAL_SECONDS[interval] * 1_000_000_000
+        added = 0
+        for start, end in self.gaps(ticker, interval):
+            count = (end - start) // step - 1
+            # to는 UTC 기준이며 해당 시각은 제외됨
+            to = pd.Timestamp(end).to_pydatetime() - KST
+            fetched = self._fetch(ticker, interval=interval, count=count, to=to)
+            added += self._merge(ticker, interval, fetched)
+            # 누락 개수만큼 end 이전 캔들을 받았으므로 구간 전체가 조회됨 (남은 누락은 거래 없음)
+            if fetched is not None and len(fetched):
+                self._mark_empty(ticker, interval, start, end)
+        return added
+
+    def extend_history(self, ticker, interval, count):
+        """가장 오래된 캔들 이전의 과거 데이터 추가 조회"""
+        with self._key_lock(ticker, interval):
+            stored = self.load(ticker, interval)
+            if len(stored) == 0:
+                del stored
+                return self._merge(ticker, interval, self._fetch(ticker, interval=interval, count=count))
+
+            to = pd.Timestamp(int(stored["timestamp"][0])).to_pydatetime() - KST
+            del stored
+            return self._merge(ticker, interval, self._fetch(ticker, interval=interval, count=count, to=to))
+
+    def get_ohlcv(self, ticker, interval="day", count=200):
+        """pyupbit.get_ohlcv 대체: 증분 갱신 후 로컬 데이터 반환"""
+        try:
+            self.update(ticker, interval)
+        except Exception as e:
+            print(f"Error in CandleStore.update: {e}")
+
+        stored = self.load(ticker, interval)
+        if len(stored) < count:
+            try:
+                self.extend_history(ticker, interval, count - len(stored))
+            except Exception as e:
+                print(f"Error in CandleStore.extend_history: {e}")
+
+        df = self.get(ticker, interval, count)
+        return df if len(df) else None
@@ -0,0 +1,229 @@
+import atexit
+import io
+import os
+import threading
+import time
+from collections import deque
+
+from PIL import Image
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from metrics import get_metrics
+
+
+# 업비트 차트 시간 설정 메뉴
+TIME_MENU_XPATH = "/html/body/div[1]/div[2]/div[3]/div/section[1]/article[1]/div/span[2]/div/div/div[1]/div[1]/div/cq-menu[1]/span/cq-clickable"
+HOUR_OPTION_XPATH = "/html/body/div[1]/div[2]/div[3]/div/section[1]/article[1]/div/span[2]/div/div/div[1]/div[1]/div/cq-menu[1]/cq-menu-dropdown/cq-item[8]"
+CHART_CANVAS_SELECTOR = "cq-context canvas"
+
+
+class _BrowserSession:
+    """차트 페이지가 로드된 상태로 유지되는 브라우저 세션"""
+
+    def __init__(self, wait_timeout):
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')  # 헤드리스 모드
+        chrome_options.add_argument('--start-maximized')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+
+        self.driver = webdriver.Chrome(options=chrome_options)
+        self.wait = WebDriverWait(self.driver, wait_timeout)
+        self.url = None
+        self.captures = 0
+        self.baseline_heap = None
+
+    def load(self, url):
+        """차트 페이지 로드 및 1시간봉 설정"""
+        self.driver.get(url)
+        self.wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+
+        # 시간 설정 버튼 클릭
+        time_button = self.wait.until(EC.element_to_be_clickable((By.XPATH, TIME_MENU_XPATH)))
+        time_button.click()
+
+        # 1시간 옵션 클릭 후 메뉴가 닫히고 차트가 다시 그려질 때까지 대기
+        hour_option = self.wait.until(EC.element_to_be_clickable((By.XPATH, HOUR_OPTION_XPATH)))
+        hour_option.click()
+        self.wait.until(EC.invisibility_of_element_located((By.XPATH, HOUR_OPTION_XPATH)))
+        self.wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, CHART_CANVAS_SELECTOR)))
+
+        self.url = url
+        self.baseline_heap = self.heap_size()
+
+    def heap_size(self):
+        """JS 힙 사용량 (bytes)"""
+        try:
+            return self.driver.execute_script("return performance.memory.usedJSHeapSize")
+        except WebDriverException:
+            return None
+
+    def screenshot(self):
+        """전체 페이지 스크린샷 (PNG bytes)"""
+        total_height = self.driver.execute_script("return document.body.scrollHeight")
+        self.driver.set_window_size(1920, total_height)
+        self.captures += 1
+        return self.driver.get_screenshot_as_png()
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"Error in _BrowserSession.quit: {e}")
+
+
+class ChartCaptureService:
+    """미리 띄워둔 브라우저를 재사용하는 차트 캡처 서비스
+
+    유휴 페이지 중 같은 URL이 로드된 페이지를 우선 사용하고, 없으면 풀 크기 내에서 새 페이지를 연다.
+    풀이 가득 찼을 때만 가장 오래 쉰 페이지를 다른 URL로 이동시킨다.
+    """
+
+    def __init__(self, pool_size=1, wait_timeout=20, max_captures=200,
+                 max_heap_growth_mb=300, history=100, acquire_timeout=120):
+        self.pool_size = pool_size
+        self.wait_timeout = wait_timeout
+        self.max_captures = max_captures
+        self.max_heap_growth = max_heap_growth_mb * 1024 * 1024
+        self.acquire_timeout = acquire_timeout
+        self.latencies = deque(maxlen=history)
+        self.last_latency = None
+
+        self._idle = []  # 유휴 세션 (오래 쉰 것부터)
+        self._created = 0
+        # 세션 반납/폐기 시 대기 중인 캡처를 깨움 (폐기된 자리에는 새 세션 생성)
+        self._available = threading.Condition()
+        self._closed = False
+
+    def _acquire(self, url):
+        """같은 URL의 유휴 세션 -> 풀 크기 내 새 세션 -> 가장 오래 쉰 유휴 세션 순으로 가져옴"""
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("ChartCaptureService is closed")
+                for index, session in enumerate(self._idle):
+                    if session.url == url:
+                        return self._idle.pop(index)
+                if self._created < self.pool_size:
+                    self._created += 1
+                    break
+                if self._idle:
+                    return self._idle.pop(0)
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"no browser session available within {self.acquire_timeout}s")
+                self._available.wait(remaining)
+
+        # 브라우저 실행은 락 밖에서 (다른 캡처가 유휴 세션을 가져갈 수 있도록)
+        try:
+            return _BrowserSession(self.wait_timeout)
+        except Exception:
+            self._discard()
+            raise
+
+    def _release(self, session):
+        with self._available:
+            if not self._closed:
+                self._idle.append(session)
+                self._available.notify()
+                return
+        session.quit()
+        self._discard()
+
+    def _discard(self):
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    def _needs_recycle(self, session):
+        """캡처 횟수 또는 메모리 증가량 초과 여부"""
+        if session.captures >= self.max_captures:
+            return True
+
+        heap = session.heap_size()
+        if heap is not None and session.baseline_heap is not None:
+            return heap - session.baseline_heap > self.max_heap_growth
+        return False
+
+    def capture(self, url, max_size=(2000, 2000)):
+        """차트 캡처 후 최적화된 PNG bytes 반환"""
+        started = time.perf_counter()
+        session = self._acquire(url)
+
+        try:
+            if session.url != url:
+                session.load(url)
+            png = session.screenshot()
+        except Exception:
+            # 크래시 등 오류 발생 시 세션 폐기 (다음 호출에서 새로 생성)
+            session.quit()
+            self._discard()
+            get_metrics().inc("chart_capture_calls_total", status="error")
+            raise
+
+        if self._needs_recycle(session):
+            session.quit()
+            self._discard()
+        else:
+            self._release(session)
+
+        # 이미지 리사이즈 (OpenAI API 제한에 맞춤)
+        img = Image.open(io.BytesIO(png))
+        img.thumbnail(max_size)
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG", optimize=True)
+
+        self.last_latency = time.perf_counter() - started
+        self.latencies.append(self.last_latency)
+        get_metrics().observe("chart_capture_seconds", self.last_latency)
+        get_metrics().inc("chart_capture_calls_total", status="ok")
+        print(f"Chart capture latency: {self.last_latency:.2f}s")
+
+        return buffer.getvalue()
+
+    def stats(self):
+        """캡처 소요시간 통계"""
+        if not self.latencies:
+            return {"count": 0}
+
+        latencies = sorted(self.latencies)
+        return {
+            "count": len(latencies),
+            "last": self.last_latency,
+            "avg": sum(latencies) / len(latencies),
+            "max": latencies[-1],
+            "p50": latencies[len(latencies) // 2],
+        }
+
+    def close(self):
+        """모든 브라우저 종료 (사용 중인 세션은 반납 시 종료)"""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+        for session in idle:
+            session.quit()
+            self._discard()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_capture_service():
+    """프로세스 전역 캡처 서비스"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            # 여러 티커를 캡처하면 티커(URL)별로 로드된 페이지를 유지하도록 풀 크기를 늘림
+            _service = ChartCaptureService(pool_size=int(os.getenv("CHART_CAPTURE_POOL_SIZE", "1")))
+            atexit.register(_service.close)
+        return _service
@@ -0,0 +1,192 @@
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _float(value):
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def find_pivots(high, low, order=3):
+    """좌우 order개 캔들보다 높은 고점/낮은 저점의 인덱스 (양쪽이 모두 확정된 pivot만)"""
+    window = 2 * order + 1
+    if len(high) < window:
+        empty = np.zeros(0, dtype=int)
+        return empty, empty
+
+    # 동일 값이 이어질 때는 가장 왼쪽 캔들만 pivot으로 인정
+    highs = np.flatnonzero(sliding_window_view(high, window).argmax(axis=1) == order) + order
+    lows = np.flatnonzero(sliding_window_view(low, window).argmin(axis=1) == order) + order
+    return highs, lows
+
+
+def average_true_range(high, low, close, window=14):
+    """최근 window개 캔들의 평균 True Range (단순 평균)"""
+    prev_close = np.concatenate(([close[0]], close[:-1]))
+    true_range = np.maximum(high, prev_close) - np.minimum(low, prev_close)
+    return float(true_range[-window:].mean())
+
+
+def cluster_levels(prices, tolerance):
+    """가까운 가격(tolerance 이내)끼리 묶은 (평균 가격, 터치 횟수)"""
+    if len(prices) == 0:
+        return np.zeros(0), np.zeros(0, dtype=int)
+
+    prices = np.sort(prices)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(prices) > tolerance) + 1))
+    counts = np.diff(np.concatenate((starts, [len(prices)])))
+    return np.add.reduceat(prices, starts) / counts, counts
+
+
+def support_resistance(high, low, close, order=3, levels=3):
+    """pivot 고점/저점을 묶어 현재가 아래 지지선, 위 저항선 (가까운 순)"""
+    highs, lows = find_pivots(high, low, order)
+    price = close[-1]
+    tolerance = max(0.25 * average_true_range(high, low, close), price * 0.001)
+    means, counts = cluster_levels(np.concatenate((high[highs], low[lows])), tolerance)
+
+    def describe(mask, ascending):
+        order_ = np.argsort(means[mask])
+        if not ascending:
+            order_ = order_[::-1]
+        return [
+            {
+                "price": _float(level),
+                "touches": int(touches),
+                "distance_pct": _float((level / price - 1) * 100),
+            }
+            for level, touches in zip(means[mask][order_][:levels], counts[mask][order_][:levels])
+        ]
+
+    return {
+        "support": describe(means < price, ascending=False),
+        "resistance": describe(means >= price, ascending=True),
+    }
+
+
+def trend(close, window=20):
+    """로그 종가 선형회귀 기울기 기반 추세 (up/down/sideways)"""
+    window = min(window, len(close))
+    if window < 3:
+        return None
+
+    y = np.log(close[-window:])
+    x = np.arange(window, dtype=float)
+    slope, intercept = np.polyfit(x, y, 1)
+    residual = y - (slope * x + intercept)
+    total = ((y - y.mean()) ** 2).sum()
+    r2 = 1 - (residual ** 2).sum() / total if total > 0 else 0.0
+
+    change_pct = (np.exp(slope * (window - 1)) - 1) * 100
+    if r2 < 0.3 or abs(change_pct) < 1:
+        direction = "sideways"
+    else:
+        direction = "up" if slope > 0 else "down"
+
+    return {
+        "direction": direction,
+        "window": window,
+        "slope_pct_per_bar": _float((np.exp(slope) - 1) * 100),
+        "change_pct": _float(change_pct),
+        "r2": _float(r2),
+    }
+
+
+def candle_patterns(open_, high, low, close):
+    """캔들 패턴별 bool 배열 (모든 캔들에 대해 벡터화 계산)"""
+    body = close - open_
+    size = np.abs(body)
+    span = np.maximum(high - low, 1e-12)
+    upper = high - np.maximum(open_, close)
+    lower = np.minimum(open_, close) - low
+
+    prev_body = np.concatenate(([0.0], body[:-1]))
+    prev_open = np.concatenate(([open_[0]], open_[:-1]))
+    prev_close = np.concatenate(([close[0]], close[:-1]))
+
+    rising = (body > 0) & (close > prev_close)
+    falling = (body < 0) & (close < prev_close)
+
+    def three(mask):
+        result = mask.copy()
+        result[:2] = False
+        result[2:] &= mask[1:-1] & mask[:-2]
+        return result
+
+    return {
+        "doji": size <= 0.1 * span,
+        "hammer": (lower >= 2 * size) & (upper <= 0.25 * span) & (size > 0.05 * span),
+        "shooting_star": (upper >= 2 * size) & (lower <= 0.25 * span) & (size > 0.05 * span),
+        "bullish_engulfing": (prev_body < 0) & (body > 0) & (open_ <= prev_close) & (close >= prev_open),
+        "bearish_engulfing": (prev_body > 0) & (body < 0) & (open_ >= prev_close) & (close <= prev_open),
+        "three_white_soldiers": three(rising),
+        "three_black_crows": three(falling),
+    }
+
+
+def recent_patterns(open_, high, low, close, lookback=3):
+    """최근 lookback개 캔들에서 나타난 패턴 (bars_ago: 0 = 마지막 캔들)"""
+    found = []
+    for name, mask in candle_patterns(open_, high, low, close).items():
+        for index in np.flatnonzero(mask[-lookback:]):
+            found.append({"pattern": name, "bars_ago": int(min(lookback, len(close)) - 1 - index)})
+    return sorted(found, key=lambda item: item["bars_ago"])
+
+
+def breakout(high, low, close, volume, window=20, lookback=3):
+    """직전 window개 캔들 고가/저가 돌파 여부 (가장 최근 돌파, 거래량 배수 포함)"""
+    if len(close) <= window:
+        return None
+
+    prior_high = sliding_window_view(high[:-1], window).max(axis=1)
+    prior_low = sliding_window_view(low[:-1], window).min(axis=1)
+    prior_volume = sliding_window_view(volume[:-1], window).mean(axis=1)
+    recent = close[window:]
+
+    up = recent > prior_high
+    down = recent < prior_low
+    for bars_ago in range(min(lookback, len(recent))):
+        i = len(recent) - 1 - bars_ago
+        if up[i] or down[i]:
+            return {
+                "type": "breakout" if up[i] else "breakdown",
+                "level": _float(prior_high[i] if up[i] else prior_low[i]),
+                "bars_ago": bars_ago,
+                "volume_ratio": _float(volume[window + i] / prior_volume[i]) if prior_volume[i] > 0 else None,
+            }
+    return None
+
+
+def chart_features(df, order=3, short_window=20, long_window=60):
+    """OHLCV DataFrame -> 차트 분석 특징 (추세, 지지/저항, 캔들 패턴, 돌파)"""
+    open_ = df["open"].to_numpy(dtype=float)
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    close = df["close"].to_numpy(dtype=float)
+    volume = df["volume"].to_numpy(dtype=float)
+
+    return {
+        "last_close": _float(close[-1]),
+        "trend": {
+            "short": trend(close, short_window),
+            "long": trend(close, long_window),
+        },
+        **support_resistance(high, low, close, order),
+        "patterns": recent_patterns(open_, high, low, close),
+        "breakout": breakout(high, low, close, volume, short_window),
+    }
+
+
+if __name__ == "__main__":
+    from candle_store import CandleStore
+
+    store = CandleStore()
+    for interval, count in (("day", 120), ("minute60", 200)):
+        df = store.get_ohlcv("KRW-BTC", interval=interval, count=count)
+        started = time.perf_counter()
+        features = chart_features(df)
+        elapsed = time.perf_counter() - started
+        print(f"\n=== {interval} ({len(df)} candles, {elapsed * 1000:.2f}ms) ===")
+        print(features)
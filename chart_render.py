@@ -0,0 +1,218 @@
+import io
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from indicators import IndicatorEngine
+
+
+BACKGROUND = (255, 255, 255)
+GRID = (230, 230, 230)
+TEXT = (60, 60, 60)
+UP = (200, 40, 40)        # 업비트 기준 상승 = 빨강
+DOWN = (30, 90, 200)      # 하락 = 파랑
+BB = (150, 150, 150)
+MA_COLORS = {20: (230, 140, 0), 60: (40, 160, 70), 120: (140, 60, 170)}
+RSI_COLOR = (120, 60, 180)
+MACD_COLOR = (30, 90, 200)
+SIGNAL_COLOR = (230, 140, 0)
+
+# 지표 계산용 선행 캔들 수 (MA120, MACD 안정화)
+WARMUP = 120
+
+
+class ChartRenderer:
+    """저장된 OHLCV로 캔들 + BB/MA/RSI/MACD 차트를 메모리에서 바로 그리는 렌더러
+
+    같은 입력이면 항상 같은 PNG bytes를 반환하며, 마감된 캔들 기준으로 캐시한다.
+    """
+
+    def __init__(self, size=(1024, 768), candles=120, ma_windows=(20, 60, 120), cache_size=32):
+        self.size = size
+        self.candles = candles
+        self.ma_windows = tuple(ma_windows)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # (ticker, interval, 마지막 마감 캔들 시각, 크기) -> PNG bytes
+        self._lock = threading.Lock()
+        self.font = ImageFont.load_default()
+
+    def _indicators(self, df):
+        engine = IndicatorEngine(ma_windows=self.ma_windows, history=len(df))
+        df = df.copy()
+        # 마감된 캔들만 넘어오므로 마지막 캔들까지 확정값으로 계산 (frame은 마지막 캔들을 미완성으로 취급)
+        for timestamp, row in zip(df.index, df[["high", "low", "close"]].to_numpy(dtype=float)):
+            engine.update(timestamp, *row)
+        values = np.array([engine.history[timestamp] for timestamp in df.index], dtype=float)
+        for j, column in enumerate(engine.columns):
+            df[column] = values[:, j]
+        return df.tail(self.candles)
+
+    def _line(self, draw, xs, values, scale, color, width=1):
+        """NaN 구간은 끊어서 선 그리기"""
+        points = []
+        for x, value in zip(xs, values):
+            if math.isnan(value):
+                if len(points) > 1:
+                    draw.line(points, fill=color, width=width)
+                points = []
+            else:
+                points.append((x, scale(value)))
+        if len(points) > 1:
+            draw.line(points, fill=color, width=width)
+
+    def render(self, df, title=""):
+        """OHLCV DataFrame (선행 캔들 포함) -> PNG bytes"""
+        df = self._indicators(df)
+        width, height = self.size
+        left, right, top = 8, 84, 20
+        price_bottom = int(height * 0.6)
+        rsi_top, rsi_bottom = price_bottom + 8, int(height * 0.78)
+        macd_top, macd_bottom = rsi_bottom + 8, height - 8
+        plot_width = width - left - right
+
+        # 사용하는 색상이 적으므로 팔레트 이미지에 직접 그림 (양자화 불필요, PNG 용량 축소)
+        image = Image.new("P", self.size, BACKGROUND)
+        draw = ImageDraw.Draw(image)
+
+        opens = df["open"].to_numpy(dtype=float)
+        highs = df["high"].to_numpy(dtype=float)
+        lows = df["low"].to_numpy(dtype=float)
+        closes = df["close"].to_numpy(dtype=float)
+
+        step = plot_width / max(len(df), 1)
+        xs = left + (np.arange(len(df)) + 0.5) * step
+        half_body = max(step * 0.35, 0.5)
+
+        # 가격 패널 (캔들 + 볼린저 밴드 + 이동평균)
+        band_values = np.concatenate([highs, lows, df["bb_high"].to_numpy(), df["bb_low"].to_numpy()])
+        low_price, high_price = np.nanmin(band_values), np.nanmax(band_values)
+        pad = (high_price - low_price) * 0.03 or high_price * 0.01
+
+        def price_y(value):
+            return top + (high_price + pad - value) / (high_price - low_price + 2 * pad) * (price_bottom - top)
+
+        for i in range(5):
+            value = low_price + (high_price - low_price) * i / 4
+            y = price_y(value)
+            draw.line([(left, y), (width - right, y)], fill=GRID)
+            draw.text((width - right + 4, y - 6), f"{value:,.0f}" if value >= 100 else f"{value:.4g}",
+                      fill=TEXT, font=self.font)
+
+        for column in ("bb_high", "bb_mid", "bb_low"):
+            self._line(draw, xs, df[column].to_numpy(), price_y, BB)
+        for window in self.ma_windows:
+            self._line(draw, xs, df[f"ma{window}"].to_numpy(), price_y, MA_COLORS.get(window, TEXT))
+
+        for x, o, h, l, c in zip(xs, opens, highs, lows, closes):
+            color = UP if c >= o else DOWN
+            draw.line([(x, price_y(h)), (x, price_y(l))], fill=color)
+            body_top, body_bottom = price_y(max(o, c)), price_y(min(o, c))
+            draw.rectangle([x - half_body, body_top, x + half_body, max(body_bottom, body_top + 1)], fill=color)
+
+        legend = "  ".join(["BB(20,2)"] + [f"MA{window}" for window in self.ma_windows])
+        draw.text((left, 4), f"{title}  close {closes[-1]:,.0f}  {legend}".strip(), fill=TEXT, font=self.font)
+
+        # RSI 패널 (30/70 기준선)
+        def rsi_y(value):
+            return rsi_top + (100 - value) / 100 * (rsi_bottom - rsi_top)
+
+        draw.rectangle([left, rsi_top, width - right, rsi_bottom], outline=GRID)
+        for level in (30, 70):
+            draw.line([(left, rsi_y(level)), (width - right, rsi_y(level))], fill=GRID)
+            draw.text((width - right + 4, rsi_y(level) - 6), str(level), fill=TEXT, font=self.font)
+        self._line(draw, xs, df["rsi"].to_numpy(), rsi_y, RSI_COLOR)
+        draw.text((left + 2, rsi_top + 2), "RSI(14)", fill=TEXT, font=self.font)
+
+        # MACD 패널 (히스토그램 + MACD/시그널)
+        macd_values = np.concatenate([df["macd"].to_numpy(), df["macd_signal"].to_numpy(), df["macd_diff"].to_numpy()])
+        extent = np.nanmax(np.abs(macd_values)) if np.isfinite(macd_values).any() else 1.0
+        extent = extent or 1.0
+
+        def macd_y(value):
+            return (macd_top + macd_bottom) / 2 - value / extent * (macd_bottom - macd_top) / 2 * 0.95
+
+        draw.rectangle([left, macd_top, width - right, macd_bottom], outline=GRID)
+        zero = macd_y(0)
+        draw.line([(left, zero), (width - right, zero)], fill=GRID)
+        for x, value in zip(xs, df["macd_diff"].to_numpy()):
+            if not math.isnan(value):
+                draw.rectangle([x - half_body, min(zero, macd_y(value)), x + half_body, max(zero, macd_y(value))],
+                               fill=UP if value >= 0 else DOWN)
+        self._line(draw, xs, df["macd"].to_numpy(), macd_y, MACD_COLOR)
+        self._line(draw, xs, df["macd_signal"].to_numpy(), macd_y, SIGNAL_COLOR)
+        draw.text((left + 2, macd_top + 2), "MACD(12,26,9)", fill=TEXT, font=self.font)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def render_ticker(self, store, ticker, interval="minute60"):
+        """캔들 저장소에서 읽어 렌더링 (저장소 갱신 없음, 마감된 캔들만 사용, 같은 캔들 마감 구간에서는 캐시 반환)"""
+        df = store.get(ticker, interval=interval, count=self.candles + WARMUP + 1).iloc[:-1]
+        key = (ticker, interval, df.index[-1], self.size)
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        png = self.render(df, title=f"{ticker} {interval}")
+
+        with self._lock:
+            self._cache[key] = png
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return png
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer():
+    """프로세스 전역 차트 렌더러"""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = ChartRenderer()
+        return _renderer
+
+
+def benchmark(ticker="KRW-BTC", runs=20, selenium=True):
+    """인메모리 렌더링과 Selenium 스크린샷의 소요시간/이미지 크기 비교"""
+    from candle_store import CandleStore
+
+    renderer = ChartRenderer()
+    df = CandleStore().get_ohlcv(ticker, interval="minute60", count=renderer.candles + WARMUP + 1).iloc[:-1]
+
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        png = renderer.render(df, title=f"{ticker} minute60")
+        timings.append(time.perf_counter() - started)
+    results = {"render": {"seconds": float(np.median(timings)), "bytes": len(png), "size": renderer.size}}
+
+    if selenium:
+        try:
+            from chart_capture import get_capture_service
+
+            started = time.perf_counter()
+            screenshot = get_capture_service().capture(f"https://upbit.com/exchange?code=CRIX.UPBIT.{ticker}")
+            results["selenium"] = {
+                "seconds": time.perf_counter() - started,
+                "bytes": len(screenshot),
+                "size": Image.open(io.BytesIO(screenshot)).size,
+            }
+        except Exception as e:
+            print(f"Error in selenium benchmark: {e}")
+    return results
+
+
+if __name__ == "__main__":
+    print("\n=== Chart Rendering Benchmark ===")
+    for name, result in benchmark().items():
+        print(f"{name}: {result['seconds'] * 1000:.1f}ms, {result['bytes'] / 1024:.1f}KB, {result['size']}")
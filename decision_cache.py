@@ -0,0 +1,133 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import get_metrics
+
+
+# 특징별 양자화 간격 (이 간격 안에서의 변화는 같은 시장 상태로 간주)
+DEFAULT_TOLERANCE = {
+    "rsi": 2.0,
+    "macd_pct": 0.1,           # MACD 히스토그램 (현재가 대비 %)
+    "bb_position": 0.05,
+    "orderbook_imbalance": 0.05,
+    "fear_greed": 5,
+    "exposure": 0.1,           # 총자산 중 코인 비중
+    "log_price": 0.005,        # 약 0.5% 가격 변화
+    "log_change": 0.005,       # 직전 캔들 대비 등락률
+    "news_sentiment": 0.1,     # 뉴스 감성 집계 점수 (-1 ~ 1)
+}
+
+
+def market_features(analysis_data):
+    """get_ai_analysis 입력에서 판단에 영향을 주는 핵심 특징 추출"""
+    status = analysis_data["current_status"]
+    orderbook = analysis_data["orderbook"]
+    indicators = analysis_data["ohlcv"]["latest_indicators"]
+    price = status["current_price"]
+
+    macd = indicators.get("macd")
+    macd_signal = indicators.get("macd_signal")
+    total_size = orderbook["total_bid_size"] + orderbook["total_ask_size"]
+    news = analysis_data.get("news")
+    news_sentiment = news["sentiment"]["score"] if isinstance(news, dict) and news.get("sentiment") else None
+
+    return {
+        "rsi": indicators.get("rsi"),
+        "macd_pct": (macd - macd_signal) / price * 100 if macd is not None and macd_signal is not None else None,
+        "bb_position": indicators.get("bb_position"),
+        "orderbook_imbalance": orderbook["total_bid_size"] / total_size if total_size else None,
+        "fear_greed": analysis_data["fear_greed"]["current"]["value"],
+        "exposure": status["crypto_balance"] * price / status["total_value"] if status["total_value"] else 0.0,
+        "log_price": math.log(price),
+        "news_sentiment": news_sentiment,
+    }
+
+
+class DecisionCache:
+    """양자화된 시장 상태 fingerprint 기반 LLM 결정 캐시"""
+
+    def __init__(self, ttl=1800, tolerance=None, max_entries=256):
+        self.ttl = ttl
+        self.tolerance = {**DEFAULT_TOLERANCE, **(tolerance or {})}
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # fingerprint -> (decision, created_at)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.model_calls = 0
+        self.model_seconds = 0.0
+
+    def fingerprint(self, features):
+        """특징값을 허용 오차 단위로 양자화한 키"""
+        key = []
+        for name in sorted(features):
+            value = features[name]
+            if value is None or (isinstance(value, float) and not math.isfinite(value)):
+                key.append((name, None))
+            else:
+                key.append((name, math.floor(value / self.tolerance.get(name, 1) + 0.5)))
+        return tuple(key)
+
+    def get(self, fingerprint):
+        """(결정, 경과 초) 또는 None"""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is not None:
+                age = time.time() - entry[1]
+                if age < self.ttl:
+                    self.hits += 1
+                    return entry[0], age
+                del self._entries[fingerprint]
+            self.misses += 1
+            return None
+
+    def put(self, fingerprint, decision, latency=None):
+        """모델 결정 저장 (latency: 모델 호출 소요시간, 절감 효과 추정용)"""
+        with self._lock:
+            self._entries[fingerprint] = (decision, time.time())
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if latency is not None:
+                self.model_calls += 1
+                self.model_seconds += latency
+
+    def stats(self):
+        """적중률 및 절감된 호출 수/시간 추정"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            avg_latency = self.model_seconds / self.model_calls if self.model_calls else 0.0
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_calls": self.hits,
+                "saved_seconds": self.hits * avg_latency,
+                "avg_model_latency": avg_latency,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_decision_cache():
+    """프로세스 전역 결정 캐시"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DecisionCache()
+            get_metrics().add_collector(_collect_cache)
+        return _cache
+
+
+def _collect_cache():
+    stats = _cache.stats()
+    return [
+        ("decision_cache_lookups_total", "counter", {"result": "hit"}, stats["hits"]),
+        ("decision_cache_lookups_total", "counter", {"result": "miss"}, stats["misses"]),
+        ("decision_cache_saved_seconds_total", "counter", {}, stats["saved_seconds"]),
+    ]
@@ -0,0 +1,171 @@
+import copy
+import itertools
+import json
+
+from backtest import UPBIT_FEE
+
+
+class SimulatedExchange:
+    """기록된 호가 스냅샷에 주문을 매칭하는 로컬 모의 거래소 (pyupbit.Upbit 주문/조회 인터페이스)
+
+    sleep(초)을 호출하면 다음 스냅샷으로 넘어가며, 소진된 호가는 새 스냅샷에서 다시 채워진다.
+    대기 중인 지정가 주문은 스냅샷이 바뀔 때마다 다시 매칭된다.
+    """
+
+    def __init__(self, orderbooks, balances=None, fee=UPBIT_FEE, step_seconds=1.0):
+        self.orderbooks = list(orderbooks)
+        self.fee = fee
+        self.step_seconds = step_seconds
+        self.position = 0
+        self.elapsed = 0.0
+        self.balances = dict(balances or {"KRW": 1_000_000})
+        self.avg_prices = {}
+        self.orders = {}
+        self._ids = itertools.count(1)
+        self._book = None
+        self._load_book()
+
+    @classmethod
+    def from_jsonl(cls, path, **kwargs):
+        """pyupbit.get_orderbook 형태의 스냅샷이 한 줄씩 저장된 파일에서 생성"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls([json.loads(line) for line in f if line.strip()], **kwargs)
+
+    def _load_book(self):
+        self._book = copy.deepcopy(self.orderbooks[self.position])
+
+    def sleep(self, seconds):
+        """시간 경과: step_seconds마다 다음 스냅샷으로 이동 후 대기 주문 매칭"""
+        self.elapsed += seconds
+        target = min(int(self.elapsed // self.step_seconds), len(self.orderbooks) - 1)
+        if target != self.position:
+            self.position = target
+            self._load_book()
+            for order in self.orders.values():
+                if order['state'] == 'wait':
+                    self._match(order)
+
+    # 시세 조회
+
+    def get_orderbook(self, ticker=None):
+        return copy.deepcopy(self._book)
+
+    # 잔고
+
+    def get_balances(self):
+        return [
+            {
+                "currency": currency,
+                "balance": str(balance),
+                "locked": "0",
+                "avg_buy_price": str(self.avg_prices.get(currency, 0)),
+            }
+            for currency, balance in self.balances.items()
+        ]
+
+    def _apply_fill(self, order, price, volume):
+        currency = order['market'].split('-')[1]
+        funds = price * volume
+        fee = funds * self.fee
+        held = self.balances.get(currency, 0.0)
+
+        if order['side'] == 'bid':
+            self.balances["KRW"] -= funds + fee
+            cost = self.avg_prices.get(currency, 0.0) * held + funds
+            self.balances[currency] = held + volume
+            self.avg_prices[currency] = cost / self.balances[currency]
+        else:
+            self.balances["KRW"] += funds - fee
+            self.balances[currency] = held - volume
+
+        order['trades'].append({"price": str(price), "volume": str(volume), "funds": str(funds)})
+        order['executed_volume'] = str(float(order['executed_volume']) + volume)
+        order['paid_fee'] = str(float(order['paid_fee']) + fee)
+
+    def _match(self, order):
+        """현재 스냅샷의 반대편 호가를 순서대로 소진하며 체결"""
+        bid = order['side'] == 'bid'
+        limit = float(order['price']) if order['ord_type'] == 'limit' else None
+        remaining_funds = float(order['price']) if order['ord_type'] == 'price' else None
+        remaining = float(order['remaining_volume']) if order['remaining_volume'] is not None else None
+
+        for unit in self._book['orderbook_units']:
+            price = unit['ask_price'] if bid else unit['bid_price']
+            size_key = 'ask_size' if bid else 'bid_size'
+            if limit is not None and (price > limit if bid else price < limit):
+                break
+            if unit[size_key] <= 0:
+                continue
+
+            if remaining_funds is not None:
+                volume = min(unit[size_key], remaining_funds / price)
+                remaining_funds -= volume * price
+            else:
+                volume = min(unit[size_key], remaining)
+                remaining -= volume
+            if volume <= 0:
+                break
+
+            unit[size_key] -= volume
+            self._apply_fill(order, price, volume)
+            if (remaining_funds is not None and remaining_funds <= 1e-9) or (remaining is not None and remaining <= 1e-12):
+                break
+
+        if remaining is not None:
+            order['remaining_volume'] = str(max(remaining, 0.0))
+
+        if remaining_funds is not None:
+            order['remaining_funds'] = str(max(remaining_funds, 0.0))
+            filled = remaining_funds <= 1e-9
+        else:
+            filled = remaining <= 1e-12
+
+        if filled:
+            order['state'] = 'done'
+        elif order['ord_type'] != 'limit':
+            # 시장가 주문은 호가를 넘어선 잔량을 취소 (업비트와 동일)
+            order['state'] = 'cancel'
+
+    def _place(self, ticker, side, ord_type, price=None, volume=None):
+        order = {
+            "uuid": f"sim-{next(self._ids):08d}-0000-0000-0000",
+            "market": ticker,
+            "side": side,
+            "ord_type": ord_type,
+            "price": None if price is None else str(price),
+            "volume": None if volume is None else str(volume),
+            "remaining_volume": None if volume is None else str(volume),
+            "executed_volume": "0",
+            "paid_fee": "0",
+            "state": "wait",
+            "trades": [],
+        }
+        self.orders[order['uuid']] = order
+        self._match(order)
+        return copy.deepcopy(order)
+
+    # 주문
+
+    def buy_market_order(self, ticker, price):
+        return self._place(ticker, "bid", "price", price=price)
+
+    def sell_market_order(self, ticker, volume):
+        return self._place(ticker, "ask", "market", volume=volume)
+
+    def buy_limit_order(self, ticker, price, volume):
+        return self._place(ticker, "bid", "limit", price=price, volume=volume)
+
+    def sell_limit_order(self, ticker, price, volume):
+        return self._place(ticker, "ask", "limit", price=price, volume=volume)
+
+    def get_order(self, uuid):
+        order = self.orders.get(uuid)
+        return copy.deepcopy(order) if order else None
+
+    def cancel_order(self, uuid):
+        order = self.orders.get(uuid)
+        if order is None:
+            return {"error": {"name": "order_not_found"}}
+        if order['state'] == 'wait':
+            order['state'] = 'cancel'
+        return copy.deepcopy(order)
@@ -0,0 +1,246 @@
+import math
+import time
+
+import pyupbit
+
+from account import FINAL_ORDER_STATES
+from orderbook import available_within
+from rate_limit import upbit_request
+
+
+def estimate_impact(orderbook, side, amount):
+    """호가를 순서대로 소진한다고 가정한 시장가 주문 체결 추정
+
+    side가 buy이면 amount는 KRW 금액(매도 호가 소진), sell이면 코인 수량(매수 호가 소진).
+    slippage는 최우선 호가 대비 평균 체결가의 불리한 차이 비율.
+    """
+    units = orderbook['orderbook_units']
+    if side == "buy":
+        prices = [unit['ask_price'] for unit in units]
+        sizes = [unit['ask_size'] for unit in units]
+    else:
+        prices = [unit['bid_price'] for unit in units]
+        sizes = [unit['bid_size'] for unit in units]
+
+    remaining = amount
+    volume = 0.0
+    funds = 0.0
+    levels = 0
+    for price, size in zip(prices, sizes):
+        if remaining <= 0:
+            break
+        if side == "buy":
+            take = min(size, remaining / price)
+            remaining -= take * price
+        else:
+            take = min(size, remaining)
+            remaining -= take
+        volume += take
+        funds += take * price
+        levels += 1
+
+    best = prices[0]
+    average = funds / volume if volume else best
+    mid = (units[0]['ask_price'] + units[0]['bid_price']) / 2
+    return {
+        "best_price": best,
+        "mid_price": mid,
+        "average_price": average,
+        "volume": volume,
+        "funds": funds,
+        "levels": levels,
+        "slippage": (average / best - 1) if side == "buy" else (1 - average / best),
+        # 호가 범위를 넘어선 미체결 분량 (buy: KRW, sell: 코인 수량)
+        "unfilled": max(remaining, 0.0),
+    }
+
+
+def rest_orderbook(ticker):
+    """REST 호가 조회 (시세 API 레이트 리미터 적용)"""
+    with upbit_request("quotation", "orderbook"):
+        return pyupbit.get_orderbook(ticker=ticker)
+
+
+def order_fills(order):
+    """주문 조회 결과에서 (체결 수량, 체결 금액, 수수료)"""
+    trades = order.get('trades') or []
+    volume = sum(float(trade['volume']) for trade in trades)
+    funds = sum(float(trade['funds']) for trade in trades)
+    if not trades:
+        volume = float(order.get('executed_volume') or 0)
+    return volume, funds, float(order.get('paid_fee') or 0)
+
+
+class ExecutionReport:
+    """주문 실행 결과 (요청량, 체결량, 실현 평균가, 도착 시점 대비 슬리피지)"""
+
+    def __init__(self, ticker, side, requested, impact):
+        self.ticker = ticker
+        self.side = side
+        self.requested = requested
+        self.impact = impact
+        self.strategy = None
+        self.orders = []
+        self.volume = 0.0
+        self.funds = 0.0
+        self.fee = 0.0
+        self.started = time.time()
+        self.finished = None
+
+    def add(self, order):
+        volume, funds, fee = order_fills(order)
+        self.orders.append(order.get('uuid'))
+        self.volume += volume
+        self.funds += funds
+        self.fee += fee
+
+    @property
+    def average_price(self):
+        return self.funds / self.volume if self.volume else None
+
+    @property
+    def filled(self):
+        """요청 단위 기준 체결량 (buy: 체결 금액 KRW, sell: 코인 수량)"""
+        return self.funds if self.side == "buy" else self.volume
+
+    def summary(self):
+        average = self.average_price
+        mid = self.impact["mid_price"]
+        slippage = None
+        if average is not None:
+            slippage = (average / mid - 1) if self.side == "buy" else (1 - average / mid)
+        return {
+            "ticker": self.ticker,
+            "side": self.side,
+            "strategy": self.strategy,
+            "requested": self.requested,
+            "filled": self.filled,
+            "volume": self.volume,
+            "funds": self.funds,
+            "fee": self.fee,
+            "average_price": average,
+            "expected_price": self.impact["average_price"],
+            "arrival_mid": mid,
+            "slippage": slippage,
+            "orders": len(self.orders),
+            "seconds": (self.finished or time.time()) - self.started,
+        }
+
+
+class ExecutionEngine:
+    """호가 기반 충격 추정 후 시장가 1회 또는 지정가 분할(TWAP) 주문 실행
+
+    최우선 호가 대비 max_slippage 안의 잔량으로 모두 체결 가능하면 시장가 1회,
+    아니면 그 잔량 단위로 나눈 지정가 주문(최우선 호가 + max_slippage)을 slice_interval 간격으로 실행하고,
+    각 주문은 체결 완료 또는 slice_timeout까지 조회 후 미체결 잔량을 취소한다.
+    """
+
+    def __init__(self, upbit, orderbook_source=None, account=None, max_slippage=0.001, max_slices=10,
+                 slice_interval=5, slice_timeout=10, poll_interval=0.5, min_order=5000, sleep=time.sleep):
+        self.upbit = upbit
+        self.orderbook_source = orderbook_source or rest_orderbook
+        self.account = account
+        self.max_slippage = max_slippage
+        self.max_slices = max_slices
+        self.slice_interval = slice_interval
+        self.slice_timeout = slice_timeout
+        self.poll_interval = poll_interval
+        self.min_order = min_order
+        self.sleep = sleep
+
+    def _get_order(self, uuid):
+        with upbit_request("exchange", "get_order"):
+            return self.upbit.get_order(uuid)
+
+    def _wait(self, order, timeout):
+        """체결 완료까지 조회, 타임아웃 시 잔량 취소 후 최종 주문 상태 반환"""
+        if not isinstance(order, dict) or 'uuid' not in order:
+            print(f"Order rejected: {order}")
+            return None
+
+        uuid = order['uuid']
+        waited = 0.0
+        while True:
+            current = self._get_order(uuid)
+            if isinstance(current, dict) and current.get('state') in FINAL_ORDER_STATES:
+                return current
+            if waited >= timeout:
+                break
+            self.sleep(self.poll_interval)
+            waited += self.poll_interval
+
+        with upbit_request("order", "cancel_order"):
+            self.upbit.cancel_order(uuid)
+        return self._get_order(uuid)
+
+    def _market(self, ticker, side, amount, report):
+        report.strategy = "market"
+        with upbit_request("order", f"{side}_market_order"):
+            if side == "buy":
+                order = self.upbit.buy_market_order(ticker, amount)
+            else:
+                order = self.upbit.sell_market_order(ticker, amount)
+        final = self._wait(order, self.slice_timeout)
+        if final is not None:
+            report.add(final)
+
+    def _twap(self, ticker, side, amount, report, slices):
+        report.strategy = f"twap x{slices}"
+        for i in range(slices):
+            remaining = amount - report.filled
+            orderbook = self.orderbook_source(ticker)
+            best = orderbook['orderbook_units'][0]['ask_price' if side == "buy" else 'bid_price']
+            notional = remaining if side == "buy" else remaining * best
+            if notional < self.min_order:
+                break
+
+            # 남은 분할 수로 균등 배분, 최우선 호가 대비 max_slippage까지만 체결되도록 지정가 설정
+            child = remaining / (slices - i)
+            if side == "buy":
+                price = pyupbit.get_tick_size(best * (1 + self.max_slippage), "floor")
+                volume = math.floor(child / price * 1e8) / 1e8
+            else:
+                price = pyupbit.get_tick_size(best * (1 - self.max_slippage), "ceil")
+                volume = math.floor(child * 1e8) / 1e8
+            with upbit_request("order", f"{side}_limit_order"):
+                if side == "buy":
+                    order = self.upbit.buy_limit_order(ticker, price, volume)
+                else:
+                    order = self.upbit.sell_limit_order(ticker, price, volume)
+
+            final = self._wait(order, self.slice_timeout)
+            if final is not None:
+                report.add(final)
+            if i < slices - 1:
+                self.sleep(self.slice_interval)
+
+    def execute(self, ticker, side, amount):
+        """side가 buy이면 amount는 KRW 금액(수수료 별도, buy_market_order와 동일), sell이면 코인 수량"""
+        orderbook = self.orderbook_source(ticker)
+        impact = estimate_impact(orderbook, side, amount)
+        report = ExecutionReport(ticker, side, amount, impact)
+
+        # 최우선 호가 대비 max_slippage 안의 잔량으로 한 번에 체결 가능한 양을 정하고 그 단위로 분할
+        available = available_within(orderbook, side, self.max_slippage)
+        notional = amount if side == "buy" else amount * impact["best_price"]
+
+        try:
+            # 최소 주문 금액 이상으로 2개 이상 나눌 수 없으면 시장가 1회 (분할 시 각 주문이 거부됨)
+            if amount <= available or notional // self.min_order < 2:
+                self._market(ticker, side, amount, report)
+            else:
+                slices = math.ceil(amount / available) if available > 0 else self.max_slices
+                slices = min(slices, self.max_slices, int(notional // self.min_order))
+                self._twap(ticker, side, amount, report, max(slices, 2))
+        finally:
+            report.finished = time.time()
+            if self.account is not None:
+                self.account.invalidate()
+
+        summary = report.summary()
+        print(f"\n=== Execution ({summary['strategy']}) ===")
+        print(f"Expected: {impact['average_price']:,.0f} ({impact['slippage']:.3%} impact, {impact['levels']} levels)")
+        if summary["average_price"] is not None:
+            print(f"Realized: {summary['average_price']:,.0f} over {summary['orders']} order(s), "
+                  f"slippage vs mid {summary['slippage']:.3%}, filled {summary['filled']:,.8g} / {amount:,.8g}")
+        return report
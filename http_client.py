@@ -0,0 +1,47 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# (연결, 응답) 제한시간 (초)
+DEFAULT_TIMEOUT = (5, 15)
+
+
+def create_session(pool_size=16):
+    """keep-alive 연결을 재사용하는 세션 (호스트별 최대 pool_size개 연결)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """프로세스 전역 HTTP 세션 (공포탐욕지수/SerpAPI/업비트 REST 공용)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def install_pyupbit_session(session=None):
+    """pyupbit의 REST 호출(모듈 수준 requests.get/post/delete)을 공유 세션으로 전환
+
+    pyupbit.request_api가 requests 모듈을 직접 호출하는 구조에 의존하므로,
+    구조가 다른 버전이면 전환하지 않고 False를 반환한다.
+    """
+    try:
+        import pyupbit.request_api as request_api
+    except ImportError:
+        return False
+    if getattr(request_api, "requests", None) is not requests:
+        return getattr(request_api, "requests", None) is (session or get_session())
+
+    request_api.requests = session or get_session()
+    return True
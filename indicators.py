@@ -0,0 +1,304 @@
+import math
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+
+NAN = float("nan")
+
+
+class _Rolling:
+    """이동 합계 기반 이동평균/표준편차 (ddof=0)"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.shift = None  # 큰 가격에서의 자릿수 손실 방지용 기준값
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.updates = 0
+
+    def _sums(self, x):
+        shift = x if self.shift is None else self.shift
+        x -= shift
+        if len(self.values) == self.window:
+            old = self.values[0]
+            return shift, x, self.total - old + x, self.total_sq - old * old + x * x, self.window
+        return shift, x, self.total + x, self.total_sq + x * x, len(self.values) + 1
+
+    def step(self, x, commit):
+        shift, x, total, total_sq, count = self._sums(x)
+
+        if commit:
+            self.shift = shift
+            self.values.append(x)
+            self.total, self.total_sq = total, total_sq
+            self.updates += 1
+            # 누적 오차 방지: window번마다 합계 재계산 (분할 상환 O(1))
+            if self.updates % self.window == 0:
+                self.total = math.fsum(self.values)
+                self.total_sq = math.fsum(v * v for v in self.values)
+
+        if count < self.window:
+            return NAN, NAN
+
+        mean = total / count
+        variance = max(total_sq / count - mean * mean, 0.0)
+        return mean + shift, math.sqrt(variance)
+
+
+class _EMA:
+    """adjust=False 지수이동평균 (pandas ewm과 동일, 선행 NaN은 건너뜀)"""
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = None
+        self.count = 0
+
+    def step(self, x, commit):
+        if math.isnan(x):
+            value, count = self.value, self.count
+        elif self.value is None:
+            value, count = x, 1
+        else:
+            value, count = (1 - self.alpha) * self.value + self.alpha * x, self.count + 1
+
+        if commit:
+            self.value, self.count = value, count
+
+        return value if count >= self.min_periods else NAN
+
+
+class _ATR:
+    """ta.volatility.AverageTrueRange와 동일한 Wilder 평활 ATR"""
+
+    def __init__(self, window):
+        self.window = window
+        self.prev_close = None
+        self.warmup = []
+        self.value = 0.0
+        self.count = 0
+
+    def step(self, high, low, close, commit):
+        true_range = high - low
+        if self.prev_close is not None:
+            true_range = max(true_range, abs(high - self.prev_close), abs(low - self.prev_close))
+
+        count = self.count + 1
+        if count < self.window:
+            value = 0.0
+        elif count == self.window:
+            value = (math.fsum(self.warmup) + true_range) / self.window
+        else:
+            value = (self.value * (self.window - 1) + true_range) / float(self.window)
+
+        if commit:
+            if count < self.window:
+                self.warmup.append(true_range)
+            else:
+                self.warmup = []
+            self.prev_close = close
+            self.value = value
+            self.count = count
+
+        return value
+
+
+class IndicatorEngine:
+    """캔들 1개당 O(1)로 갱신되는 기술적 지표 엔진 (ta 기본값과 동일한 결과)"""
+
+    def __init__(self, bb_window=20, bb_dev=2, rsi_window=14, macd_fast=12,
+                 macd_slow=26, macd_sign=9, ma_windows=(5, 20, 60, 120),
+                 atr_window=14, history=500, interval=None):
+        self.bb_window = bb_window
+        self.bb_dev = bb_dev
+        self.rsi_window = rsi_window
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_sign = macd_sign
+        self.ma_windows = tuple(ma_windows)
+        self.atr_window = atr_window
+        # 캔들 간격 (None이면 frame에 주어진 df의 최소 간격)
+        self.interval = pd.Timedelta(interval) if interval is not None else None
+        self.columns = [
+            "bb_high", "bb_mid", "bb_low", "bb_pband",
+            "rsi",
+            "macd", "macd_signal", "macd_diff",
+            *[f"ma{window}" for window in self.ma_windows],
+            "atr",
+        ]
+        self.max_history = history
+        self.resets = 0
+        self.reset()
+
+    def reset(self):
+        """모든 지표 상태 초기화 (다음 frame에서 주어진 df로 다시 계산)"""
+        self._bb = _Rolling(self.bb_window)
+        self._rsi_up = _EMA(1 / self.rsi_window, self.rsi_window)
+        self._rsi_down = _EMA(1 / self.rsi_window, self.rsi_window)
+        self._prev_close = None
+        self._macd_fast = _EMA(2 / (self.macd_fast + 1), self.macd_fast)
+        self._macd_slow = _EMA(2 / (self.macd_slow + 1), self.macd_slow)
+        self._macd_sign = _EMA(2 / (self.macd_sign + 1), self.macd_sign)
+        self._ma = [_Rolling(window) for window in self.ma_windows]
+        self._atr = _ATR(self.atr_window)
+
+        self.history = OrderedDict()
+        self.last_timestamp = None
+
+    def _step(self, high, low, close, commit):
+        # 볼린저 밴드
+        bb_mid, bb_std = self._bb.step(close, commit)
+        bb_high = bb_mid + self.bb_dev * bb_std
+        bb_low = bb_mid - self.bb_dev * bb_std
+        bb_pband = (close - bb_low) / (bb_high - bb_low) if bb_high != bb_low else NAN
+
+        # RSI
+        diff = 0.0 if self._prev_close is None else close - self._prev_close
+        up = self._rsi_up.step(max(diff, 0.0), commit)
+        down = self._rsi_down.step(max(-diff, 0.0), commit)
+        if down == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + up / down))
+        if commit:
+            self._prev_close = close
+
+        # MACD
+        macd = self._macd_fast.step(close, commit) - self._macd_slow.step(close, commit)
+        macd_signal = self._macd_sign.step(macd, commit)
+
+        # 이동평균선
+        moving_averages = [ma.step(close, commit)[0] for ma in self._ma]
+
+        # ATR
+        atr = self._atr.step(high, low, close, commit)
+
+        return (
+            bb_high, bb_mid, bb_low, bb_pband,
+            rsi,
+            macd, macd_signal, macd - macd_signal,
+            *moving_averages,
+            atr,
+        )
+
+    def update(self, timestamp, high, low, close):
+        """마감된 캔들 반영"""
+        values = self._step(float(high), float(low), float(close), commit=True)
+        self.last_timestamp = timestamp
+        self.history[timestamp] = values
+        if len(self.history) > self.max_history:
+            self.history.popitem(last=False)
+        return dict(zip(self.columns, values))
+
+    def peek(self, high, low, close):
+        """미완성 캔들에 대한 지표값 (상태 변경 없음)"""
+        values = self._step(float(high), float(low), float(close), commit=False)
+        return dict(zip(self.columns, values))
+
+    @staticmethod
+    def _min_interval(index):
+        if len(index) < 2:
+            return None
+        steps = index[1:] - index[:-1]
+        steps = steps[steps > pd.Timedelta(0)]
+        return steps.min() if len(steps) else None
+
+    def frame(self, df):
+        """df에 지표 컬럼 추가 (새 캔들만 반영, 마지막 캔들은 미완성으로 취급)"""
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+        closes = df['close'].to_numpy(dtype=float)
+        last = len(df) - 1
+
+        # 마지막으로 반영한 캔들 바로 다음 캔들부터 이어지지 않으면(df 범위 밖의 누락 구간)
+        # 누락 구간을 건너뛴 채 상태를 이어가지 않고 df 전체로 다시 계산
+        if self.last_timestamp is not None and len(df):
+            newer = df.index[df.index > self.last_timestamp]
+            interval = self.interval or self._min_interval(df.index)
+            if len(newer) and interval is not None and newer[0] - self.last_timestamp != interval:
+                self.reset()
+                self.resets += 1
+
+        pending = None
+        for i, timestamp in enumerate(df.index):
+            if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+                continue
+            if i == last:
+                pending = self._step(highs[i], lows[i], closes[i], commit=False)
+            else:
+                self.update(timestamp, highs[i], lows[i], closes[i])
+
+        empty = (NAN,) * len(self.columns)
+        rows = [self.history.get(timestamp, empty) for timestamp in df.index]
+        if pending is not None:
+            rows[last] = pending
+
+        values = np.array(rows, dtype=float).reshape(len(df), len(self.columns))
+        for j, column in enumerate(self.columns):
+            df[column] = values[:, j]
+        return df
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(key, **params):
+    """키(티커, 봉 단위)별로 유지되는 지표 엔진"""
+    with _engines_lock:
+        if key not in _engines:
+            _engines[key] = IndicatorEngine(**params)
+        return _engines[key]
+
+
+def compare_with_ta(df):
+    """ta 라이브러리 결과와의 최대 오차 (컬럼별 상대오차)"""
+    import ta
+
+    engine = IndicatorEngine()
+    for timestamp, row in zip(df.index, df[['high', 'low', 'close']].to_numpy(dtype=float)):
+        engine.update(timestamp, *row)
+    streamed = pd.DataFrame(list(engine.history.values()), columns=engine.columns).tail(len(df))
+
+    indicator_bb = ta.volatility.BollingerBands(close=df['close'])
+    macd = ta.trend.MACD(close=df['close'])
+    expected = {
+        "bb_high": indicator_bb.bollinger_hband(),
+        "bb_mid": indicator_bb.bollinger_mavg(),
+        "bb_low": indicator_bb.bollinger_lband(),
+        "bb_pband": indicator_bb.bollinger_pband(),
+        "rsi": ta.momentum.RSIIndicator(close=df['close']).rsi(),
+        "macd": macd.macd(),
+        "macd_signal": macd.macd_signal(),
+        "macd_diff": macd.macd_diff(),
+        "atr": ta.volatility.AverageTrueRange(
+            high=df['high'], low=df['low'], close=df['close']
+        ).average_true_range(),
+    }
+    for window in engine.ma_windows:
+        expected[f"ma{window}"] = ta.trend.SMAIndicator(close=df['close'], window=window).sma_indicator()
+
+    errors = {}
+    for column, series in expected.items():
+        want = series.to_numpy(dtype=float)[-len(streamed):]
+        got = streamed[column].to_numpy(dtype=float)
+        if not np.array_equal(np.isnan(want), np.isnan(got)):
+            errors[column] = float("inf")
+            continue
+        mask = ~np.isnan(want)
+        scale = np.maximum(np.abs(want[mask]), 1e-12)
+        errors[column] = float(np.max(np.abs(got[mask] - want[mask]) / scale, initial=0.0))
+    return errors
+
+
+if __name__ == "__main__":
+    import pyupbit
+
+    df = pyupbit.get_ohlcv("KRW-BTC", interval="day", count=400)
+    print("\n=== Streaming vs ta (max relative error) ===")
+    for column, error in compare_with_ta(df).items():
+        print(f"{column}: {error:.2e}")
@@ -0,0 +1,285 @@
+import glob
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from analysis import RISK_LEVELS
+
+
+# 사이클당 고정 크기 레코드 (문자열/가변 길이 값은 같은 이름의 .jsonl 상세 파일에 저장)
+STAGES = ("current_status", "orderbook", "ohlcv", "fear_greed", "news", "chart_analysis", "gather", "llm", "execution")
+JOURNAL_DTYPE = np.dtype([
+    ("timestamp", "<i8"),            # UTC ns
+    ("ticker", "S16"),
+    ("fingerprint", "<u8"),          # 양자화된 입력 상태 해시 (DecisionCache와 같은 기준)
+    ("price", "<f8"),
+    ("rsi", "<f4"),
+    ("macd", "<f8"),
+    ("macd_signal", "<f8"),
+    ("bb_position", "<f4"),
+    ("hourly_atr", "<f8"),
+    ("orderbook_imbalance", "<f4"),
+    ("fear_greed", "<f4"),
+    ("exposure", "<f4"),
+    ("analyzed", "?"),               # LLM 결정을 받았는지 (실패 시 False, decision=0)
+    ("decision", "i1"),              # 1=buy, -1=sell, 0=hold (Backtester.run과 같은 부호)
+    ("risk_level", "i1"),            # RISK_LEVELS 인덱스, 없으면 -1
+    ("confidence_score", "<f4"),
+    ("cached", "?"),
+    ("orders", "<u2"),
+    ("requested", "<f8"),
+    ("filled", "<f8"),
+    ("volume", "<f8"),
+    ("funds", "<f8"),
+    ("fee", "<f8"),
+    ("average_price", "<f8"),
+    ("slippage", "<f4"),
+] + [(f"t_{stage}", "<f4") for stage in STAGES] + [
+    ("detail_offset", "<i8"),
+    ("detail_length", "<u4"),
+])
+DECISION_CODES = {"buy": 1, "sell": -1, "hold": 0}
+DECISION_NAMES = {code: name for name, code in DECISION_CODES.items()}
+
+
+def fingerprint_hash(fingerprint):
+    """fingerprint 튜플 -> 64비트 정수"""
+    return int.from_bytes(hashlib.blake2b(repr(fingerprint).encode(), digest_size=8).digest(), "little")
+
+
+def _number(value):
+    try:
+        return math.nan if value is None else float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def journal_entry(ticker, analysis_data, ai_result=None, report=None, features=None, fingerprint=None,
+                  timings=None):
+    """한 사이클의 분석 입력/결정/체결/단계별 소요시간 -> append용 dict"""
+    indicators = ((analysis_data or {}).get("ohlcv") or {}).get("latest_indicators") or {}
+    status = (analysis_data or {}).get("current_status") or {}
+    features = features or {}
+    summary = report.summary() if report is not None else {}
+
+    entry = {
+        "ticker": ticker,
+        "fingerprint": fingerprint_hash(fingerprint) if fingerprint is not None else 0,
+        "price": status.get("current_price"),
+        "rsi": indicators.get("rsi"),
+        "macd": indicators.get("macd"),
+        "macd_signal": indicators.get("macd_signal"),
+        "bb_position": indicators.get("bb_position"),
+        "hourly_atr": indicators.get("hourly_atr"),
+        "orderbook_imbalance": features.get("orderbook_imbalance"),
+        "fear_greed": features.get("fear_greed"),
+        "exposure": features.get("exposure"),
+        "analyzed": bool(ai_result),
+        "decision": DECISION_CODES.get((ai_result or {}).get("decision"), 0),
+        "risk_level": RISK_LEVELS.index(ai_result["risk_level"]) if ai_result and ai_result.get("risk_level") in RISK_LEVELS else -1,
+        "confidence_score": (ai_result or {}).get("confidence_score"),
+        "cached": bool((ai_result or {}).get("cached")),
+        "orders": summary.get("orders", 0),
+        "detail": {
+            "reason": (ai_result or {}).get("reason"),
+            "order_ids": report.orders if report is not None else [],
+            "strategy": summary.get("strategy"),
+        },
+    }
+    for name in ("requested", "filled", "volume", "funds", "fee", "average_price", "slippage"):
+        entry[name] = summary.get(name)
+    for stage, seconds in (timings or {}).items():
+        entry[f"t_{stage}"] = seconds
+    return entry
+
+
+class DecisionJournal:
+    """매매 사이클 기록 (추가 전용, 월/크기 단위 파일 교체)
+
+    파일: {root}/decisions-YYYYMM-NNN.rec (JOURNAL_DTYPE 레코드) + 같은 이름의 .jsonl (사유/주문 ID).
+    상세 파일을 먼저 쓰고 레코드를 한 번에 추가하므로, 중간에 종료되어도 읽는 쪽은 완성된 레코드만 본다.
+    """
+
+    def __init__(self, root="journal", max_bytes=64 * 1024 * 1024, fsync=False):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+        self._segment = None
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _segment_path(self, now):
+        """이번 달의 마지막 파일 (max_bytes를 넘으면 다음 번호)"""
+        month = now.strftime("%Y%m")
+        if self._segment is None or not os.path.basename(self._segment).startswith(f"decisions-{month}-"):
+            existing = sorted(glob.glob(os.path.join(self.root, f"decisions-{month}-*.rec")))
+            self._segment = existing[-1] if existing else os.path.join(self.root, f"decisions-{month}-000.rec")
+
+        if os.path.exists(self._segment) and os.path.getsize(self._segment) >= self.max_bytes:
+            number = int(self._segment[-7:-4]) + 1
+            self._segment = os.path.join(self.root, f"decisions-{month}-{number:03d}.rec")
+        return self._segment
+
+    def append(self, entry):
+        """레코드 1건 추가 후 (파일 경로, 레코드 번호) 반환"""
+        record = np.zeros(1, dtype=JOURNAL_DTYPE)
+        for name in JOURNAL_DTYPE.names:
+            if JOURNAL_DTYPE[name].kind == "f":
+                record[name] = _number(entry.get(name))
+        record["timestamp"] = entry.get("timestamp") or time.time_ns()
+        record["ticker"] = entry["ticker"].encode()
+        for name in ("fingerprint", "analyzed", "decision", "risk_level", "cached", "orders"):
+            record[name] = entry.get(name, 0)
+
+        detail = (json.dumps(entry.get("detail") or {}, ensure_ascii=False) + "\n").encode("utf-8")
+        now = datetime.fromtimestamp(int(record["timestamp"][0]) / 1e9, tz=timezone.utc)
+
+        with self._lock:
+            path = self._segment_path(now)
+            detail_path = path[:-4] + ".jsonl"
+            with open(detail_path, "ab") as f:
+                record["detail_offset"] = f.tell()
+                record["detail_length"] = len(detail)
+                f.write(detail)
+                if self.fsync:
+                    os.fsync(f.fileno())
+            with open(path, "ab") as f:
+                index, partial = divmod(f.tell(), JOURNAL_DTYPE.itemsize)
+                if partial:
+                    # 이전에 쓰다 만 레코드는 버림
+                    f.truncate(index * JOURNAL_DTYPE.itemsize)
+                f.write(record.tobytes())
+                if self.fsync:
+                    os.fsync(f.fileno())
+        return path, index
+
+
+def segment_paths(root="journal", start=None, end=None):
+    """[start, end] 월에 해당하는 레코드 파일 (시간순)"""
+    paths = sorted(glob.glob(os.path.join(root, "decisions-*-*.rec")))
+    start = pd.Timestamp(start).strftime("%Y%m") if start is not None else None
+    end = pd.Timestamp(end).strftime("%Y%m") if end is not None else None
+    selected = []
+    for path in paths:
+        month = os.path.basename(path).split("-")[1]
+        if (start is None or month >= start) and (end is None or month <= end):
+            selected.append(path)
+    return selected
+
+
+def load_segment(path):
+    """레코드 파일 memmap (쓰다 만 마지막 레코드는 제외, 읽기 전용)"""
+    count = os.path.getsize(path) // JOURNAL_DTYPE.itemsize if os.path.exists(path) else 0
+    if count == 0:
+        return np.empty(0, dtype=JOURNAL_DTYPE)
+    return np.memmap(path, dtype=JOURNAL_DTYPE, mode="r", shape=(count,))
+
+
+def _in_range(records, start=None, end=None):
+    timestamps = records["timestamp"]
+    mask = np.ones(len(records), dtype=bool)
+    if start is not None:
+        mask &= timestamps >= pd.Timestamp(start).value
+    if end is not None:
+        mask &= timestamps <= pd.Timestamp(end).value
+    return records if mask.all() else records[mask]
+
+
+def load_records(root="journal", start=None, end=None):
+    """기간 내 레코드 배열 (파일이 하나면 memmap 그대로, 여러 개면 이어 붙인 복사본)"""
+    segments = [load_segment(path) for path in segment_paths(root, start, end)]
+    segments = [segment for segment in segments if len(segment)]
+    if not segments:
+        return np.empty(0, dtype=JOURNAL_DTYPE)
+    return _in_range(segments[0] if len(segments) == 1 else np.concatenate(segments), start, end)
+
+
+def read_details(path, records):
+    """레코드 파일 path에 속한 레코드들의 상세 정보(사유/주문 ID/주문 방식) 목록"""
+    details = []
+    with open(path[:-4] + ".jsonl", "rb") as f:
+        for offset, length in zip(records["detail_offset"], records["detail_length"]):
+            f.seek(int(offset))
+            details.append(json.loads(f.read(int(length))))
+    return details
+
+
+def load_frame(root="journal", start=None, end=None, ticker=None, details=False):
+    """기록 -> DataFrame (UTC 시각 인덱스, decision/risk_level 이름 컬럼 추가)
+
+    details=True이면 상세 파일에서 reason/order_ids/strategy 컬럼을 추가한다 (레코드 수만큼 파일 읽기).
+    """
+    columns = [name for name in JOURNAL_DTYPE.names if name != "ticker"]
+    frames = []
+    for path in segment_paths(root, start, end):
+        records = _in_range(load_segment(path), start, end)
+        if ticker is not None:
+            records = records[records["ticker"] == ticker.encode()]
+        if not len(records):
+            continue
+
+        frame = pd.DataFrame({name: records[name] for name in columns})
+        frame.insert(0, "ticker", records["ticker"].astype(str))
+        if details:
+            detail = pd.DataFrame(read_details(path, records), columns=["reason", "order_ids", "strategy"])
+            frame = pd.concat([frame, detail], axis=1)
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=["ticker"] + columns)
+
+    frame = pd.concat(frames, ignore_index=True)
+    frame.index = pd.to_datetime(frame.pop("timestamp"), unit="ns", utc=True)
+    frame["decision_name"] = frame["decision"].map(DECISION_NAMES).where(frame["analyzed"])
+    frame["risk_level_name"] = frame["risk_level"].map(dict(enumerate(RISK_LEVELS)))
+    return frame
+
+
+def replay(frame, policy=None, periods_per_year=None, **kwargs):
+    """기록된 LLM 결정을 Backtester로 재생 (기록 시점의 현재가 체결 가정, 티커 1개)
+
+    periods_per_year를 주지 않으면 기록 간격의 중앙값으로 계산 (스케줄러 주기/추가 실행과 무관하게 샤프 비율 연율화)
+    """
+    from backtest import Backtester
+
+    frame = frame[frame["analyzed"] & frame["price"].notna()]
+    if periods_per_year is None:
+        spacing = frame.index.to_series().diff().median().total_seconds() if len(frame) > 1 else float("nan")
+        # 간격을 알 수 없으면 10분 주기로 가정
+        periods_per_year = 365 * 86400 / spacing if spacing > 0 else 365 * 144
+    return Backtester(policy, **kwargs).run(
+        frame.index,
+        frame["price"].to_numpy(),
+        frame["decision"].to_numpy(),
+        frame["confidence_score"].to_numpy(dtype=float),
+        frame["fear_greed"].fillna(50).to_numpy(),
+        periods_per_year=periods_per_year,
+    )
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal():
+    """프로세스 전역 결정 기록 (DECISION_JOURNAL_DIR, 기본 journal/)"""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = DecisionJournal(os.getenv("DECISION_JOURNAL_DIR", "journal"))
+        return _journal
+
+
+if __name__ == "__main__":
+    frame = load_frame(details=True)
+    print(f"\n=== Decision Journal ({len(frame)} cycles) ===")
+    if len(frame):
+        print(frame[["ticker", "price", "decision_name", "confidence_score", "filled", "t_gather", "t_llm"]].tail(20))
+        print(frame["decision_name"].value_counts(dropna=False))
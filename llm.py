@@ -0,0 +1,262 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+
+from metrics import get_metrics
+
+
+class LLMError(Exception):
+    """모든 경로(모델)에서 응답을 받지 못함"""
+
+
+class LLMResponse:
+    """LLM 응답 (텍스트, 파싱된 JSON, 사용 모델, 소요시간, 토큰 사용량)"""
+
+    def __init__(self, text, provider, model, latency, attempts, usage=None, data=None):
+        self.text = text
+        self.provider = provider
+        self.model = model
+        self.latency = latency
+        self.attempts = attempts
+        self.usage = usage or {}
+        self.data = data
+
+
+class LLMProvider:
+    """OpenAI 호환 chat completions 엔드포인트 (비동기 SDK 클라이언트 래퍼)"""
+
+    def __init__(self, name, client):
+        self.name = name
+        self.client = client
+
+    async def complete(self, model, messages, json_mode=False, max_tokens=None):
+        kwargs = {"model": model, "messages": messages}
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+
+        response = await self.client.chat.completions.create(**kwargs)
+
+        usage = {}
+        if getattr(response, "usage", None) is not None:
+            usage = {
+                "prompt_tokens": getattr(response.usage, "prompt_tokens", None),
+                "completion_tokens": getattr(response.usage, "completion_tokens", None),
+            }
+        return response.choices[0].message.content, usage
+
+
+def cerebras_provider(api_key=None, base_url=None):
+    from cerebras.cloud.sdk import AsyncCerebras
+
+    client = AsyncCerebras(
+        api_key=api_key or os.environ.get("CEREBRAS_API_KEY"),
+        base_url=base_url or os.environ.get("CEREBRAS_BASE_URL"),
+        max_retries=0,  # 재시도는 LLMClient에서 처리
+    )
+    return LLMProvider("cerebras", client)
+
+
+def openai_provider(api_key=None, base_url=None):
+    from openai import AsyncOpenAI
+
+    client = AsyncOpenAI(
+        api_key=api_key or os.environ.get("OPENAI_API_KEY"),
+        base_url=base_url or os.environ.get("OPENAI_BASE_URL"),
+        max_retries=0,  # 재시도는 LLMClient에서 처리
+    )
+    return LLMProvider("openai", client)
+
+
+def retryable(error):
+    """같은 경로로 다시 보내면 성공할 수 있는 오류인지 (429/5xx/연결 오류)
+
+    요청 자체가 거부된 4xx(지원하지 않는 파라미터 등)와 JSON 파싱 실패는 재시도해도 같은 결과이므로
+    곧바로 다음 경로로 넘어간다. status_code는 OpenAI/Cerebras SDK의 APIStatusError 속성.
+    """
+    if isinstance(error, json.JSONDecodeError):
+        return False
+    status = getattr(error, "status_code", None)
+    return status is None or status == 429 or status >= 500
+
+
+class Route:
+    """호출 경로: 제공자 + 모델 + 시도당 제한시간"""
+
+    def __init__(self, provider, model, timeout=20):
+        self.provider = provider
+        self.model = model
+        self.timeout = timeout
+
+
+class LLMClient:
+    """제한시간/재시도(지터 백오프)/모델 대체를 지원하는 LLM 클라이언트
+
+    routes 순서대로 시도하며, 시도 제한시간을 넘기면(느린 응답) 곧바로 다음 경로로,
+    일시적 오류(retryable)는 같은 경로에서 retries번까지 재시도 후 다음 경로로 넘어간다.
+    4xx/JSON 파싱 실패는 재시도 없이 다음 경로로 넘어간다.
+    동기 메서드는 전용 이벤트 루프 스레드(get_loop)에서 비동기 메서드를 실행한다.
+    """
+
+    def __init__(self, routes, retries=2, backoff=0.5, max_backoff=4.0, deadline=60):
+        self.routes = list(routes)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+
+    async def acomplete(self, messages, json_mode=False, max_tokens=None, deadline=None, routes=None):
+        """비동기 호출 (json_mode이면 응답을 파싱하여 response.data에 저장)"""
+        started = time.perf_counter()
+        metrics = get_metrics()
+        deadline = self.deadline if deadline is None else deadline
+        attempts = 0
+        last_error = None
+
+        for route in routes or self.routes:
+            for attempt in range(self.retries + 1):
+                remaining = deadline - (time.perf_counter() - started)
+                if remaining <= 0:
+                    raise LLMError(f"deadline of {deadline}s exceeded after {attempts} attempts: {last_error}")
+
+                attempts += 1
+                call_started = time.perf_counter()
+                try:
+                    text, usage = await asyncio.wait_for(
+                        route.provider.complete(route.model, messages, json_mode, max_tokens),
+                        timeout=min(route.timeout, remaining),
+                    )
+                    data = json.loads(text) if json_mode else None
+                except asyncio.TimeoutError:
+                    self._record(metrics, route, call_started, "timeout")
+                    # 느린 모델은 재시도하지 않고 다음(더 빠른) 경로로 대체
+                    last_error = f"{route.provider.name}/{route.model} timed out after {time.perf_counter() - call_started:.1f}s"
+                    print(f"LLM timeout: {last_error}")
+                    break
+                except Exception as e:
+                    self._record(metrics, route, call_started, "error")
+                    last_error = f"{route.provider.name}/{route.model}: {e}"
+                    print(f"LLM error (attempt {attempt + 1}): {last_error}")
+                    if not retryable(e):
+                        break
+                    if attempt < self.retries:
+                        # full jitter 지수 백오프
+                        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                        await asyncio.sleep(min(delay, max(deadline - (time.perf_counter() - started), 0)))
+                    continue
+
+                self._record(metrics, route, call_started, "ok", usage)
+                return LLMResponse(
+                    text, route.provider.name, route.model,
+                    time.perf_counter() - started, attempts, usage, data,
+                )
+
+        raise LLMError(f"all routes failed after {attempts} attempts: {last_error}")
+
+    @staticmethod
+    def _record(metrics, route, call_started, status, usage=None):
+        """시도 1회의 지연시간/결과/토큰 사용량 기록"""
+        labels = {"provider": route.provider.name, "model": route.model}
+        metrics.observe("llm_request_seconds", time.perf_counter() - call_started, **labels)
+        metrics.inc("llm_requests_total", status=status, **labels)
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if usage and usage.get(kind):
+                metrics.inc("llm_tokens_total", usage[kind], type=kind.split("_")[0], **labels)
+
+    async def acomplete_json(self, messages, **kwargs):
+        return await self.acomplete(messages, json_mode=True, **kwargs)
+
+    def complete(self, messages, **kwargs):
+        return run(self.acomplete(messages, **kwargs))
+
+    def complete_json(self, messages, **kwargs):
+        return run(self.acomplete(messages, json_mode=True, **kwargs))
+
+
+class TokenRateLimiter:
+    """분당 토큰 한도 (토큰 버킷, LLM 이벤트 루프에서 사용)"""
+
+    def __init__(self, tokens_per_minute=30000, burst=None):
+        self.rate = tokens_per_minute / 60
+        self.capacity = burst or tokens_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self._lock = None
+
+    async def acquire(self, tokens):
+        """tokens 만큼 사용 가능해질 때까지 대기 (요청 순서대로), 대기 시간 반환"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        tokens = min(tokens, self.capacity)
+        started = time.monotonic()
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    break
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+        waited = time.monotonic() - started
+        self.waited += waited
+        get_metrics().inc("llm_rate_limit_wait_seconds_total", waited)
+        return waited
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_loop():
+    """LLM 호출 전용 이벤트 루프 (백그라운드 스레드, 프로세스당 1개)"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-loop", daemon=True).start()
+        return _loop
+
+
+def run(coroutine):
+    """전용 이벤트 루프에서 코루틴 실행 후 결과 반환 (동기 호출용)"""
+    return asyncio.run_coroutine_threadsafe(coroutine, get_loop()).result()
+
+
+def default_routes(kind="analysis"):
+    """환경변수에 설정된 API 키 기준 기본 경로
+
+    - analysis: OpenAI gpt-4o (JSON 모드 지원) -> Cerebras llama3.1-8b (빠른 모델로 대체)
+    - vision: OpenAI gpt-4o-mini
+    """
+    providers = {}
+    if os.environ.get("OPENAI_API_KEY"):
+        providers["openai"] = openai_provider()
+    if os.environ.get("CEREBRAS_API_KEY"):
+        providers["cerebras"] = cerebras_provider()
+
+    if kind == "vision":
+        candidates = [("openai", "gpt-4o-mini", 30)]
+    else:
+        candidates = [("openai", "gpt-4o", 30), ("cerebras", "llama3.1-8b", 15)]
+
+    return [Route(providers[name], model, timeout) for name, model, timeout in candidates if name in providers]
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm_client(kind="analysis"):
+    """프로세스 전역 LLM 클라이언트 (용도별)"""
+    with _clients_lock:
+        if kind not in _clients:
+            _clients[kind] = LLMClient(default_routes(kind))
+        return _clients[kind]
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+
+import websockets
+
+from orderbook import get_orderbook_history
+
+
+UPBIT_WS_URL = "wss://api.upbit.com/websocket/v1"
+
+
+class MarketDataFeed:
+    """업비트 WebSocket(ticker/trade/orderbook) 기반 실시간 시세 저장소
+
+    백그라운드 스레드에서 수신한 최신 상태를 메모리에 보관하며,
+    조회 시 네트워크 호출이 없다. max_age보다 오래된 값은 None을 반환하므로
+    호출하는 쪽에서 REST로 대체 조회하면 된다.
+    """
+
+    def __init__(self, tickers, url=None, channels=("ticker", "trade", "orderbook"),
+                 max_age=10, max_trades=200, max_reconnect_delay=30):
+        self.tickers = list(tickers)
+        self.url = url or os.getenv("UPBIT_WS_URL", UPBIT_WS_URL)
+        self.channels = channels
+        self.max_age = max_age
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self._tickers = {}
+        self._orderbooks = {}
+        self._trades = defaultdict(lambda: deque(maxlen=max_trades))
+        self._received_at = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._loop = None
+        self._task = None
+        self._thread = None
+        self.messages = 0
+        self.reconnects = 0
+
+    def _request(self):
+        """구독 요청 메시지"""
+        request = [{"ticket": str(uuid.uuid4())}]
+        for channel in self.channels:
+            request.append({"type": channel, "codes": self.tickers})
+        return json.dumps(request)
+
+    def _handle(self, message):
+        if isinstance(message, bytes):
+            message = message.decode("utf-8")
+        data = json.loads(message)
+
+        kind = data.get("type")
+        code = data.get("code")
+        if code is None:
+            return
+
+        with self._lock:
+            if kind == "ticker":
+                self._tickers[code] = data
+            elif kind == "orderbook":
+                self._orderbooks[code] = data
+            elif kind == "trade":
+                self._trades[code].append(data)
+            else:
+                return
+            self._received_at[(kind, code)] = time.time()
+            self.messages += 1
+
+        if kind == "orderbook":
+            get_orderbook_history(code).push(data)
+
+        if all((channel, ticker) in self._received_at
+               for channel in self.channels if channel != "trade"
+               for ticker in self.tickers):
+            self._ready.set()
+
+    async def _run(self):
+        delay = 1
+        while not self._stopped.is_set():
+            try:
+                async with websockets.connect(self.url, ping_interval=60) as ws:
+                    await ws.send(self._request())
+                    delay = 1
+                    async for message in ws:
+                        self._handle(message)
+                        if self._stopped.is_set():
+                            break
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                if self._stopped.is_set():
+                    break
+                print(f"Error in MarketDataFeed: {e}")
+
+            if self._stopped.is_set():
+                break
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._task = self._loop.create_task(self._run())
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    def start(self):
+        """백그라운드 수신 시작"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._thread_main, name="market-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait_ready(self, timeout=10):
+        """모든 티커의 시세/호가를 한 번 이상 수신할 때까지 대기"""
+        return self._ready.wait(timeout)
+
+    def status(self):
+        """헬스 체크용 상태 (ready: 모든 티커의 시세/호가가 max_age 이내)"""
+        with self._lock:
+            fresh = all(self._fresh(kind, ticker) for ticker in self.tickers for kind in ("ticker", "orderbook"))
+        return {
+            "ready": self._ready.is_set() and fresh,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "messages": self.messages,
+            "reconnects": self.reconnects,
+        }
+
+    def stop(self):
+        self._stopped.set()
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _fresh(self, kind, ticker):
+        received_at = self._received_at.get((kind, ticker))
+        return received_at is not None and time.time() - received_at <= self.max_age
+
+    def get_current_price(self, ticker):
+        """최신 체결가 (없거나 오래되었으면 None)"""
+        with self._lock:
+            if not self._fresh("ticker", ticker):
+                return None
+            return float(self._tickers[ticker]["trade_price"])
+
+    def get_orderbook(self, ticker):
+        """최신 호가 (pyupbit.get_orderbook과 같은 형태, 없거나 오래되었으면 None)"""
+        with self._lock:
+            if not self._fresh("orderbook", ticker):
+                return None
+            data = self._orderbooks[ticker]
+            return {
+                "market": ticker,
+                "timestamp": data["timestamp"],
+                "total_ask_size": data["total_ask_size"],
+                "total_bid_size": data["total_bid_size"],
+                "orderbook_units": data["orderbook_units"],
+            }
+
+    def get_trades(self, ticker, count=None):
+        """최근 체결 내역 (오래된 것부터)"""
+        with self._lock:
+            trades = list(self._trades.get(ticker, ()))
+        return trades[-count:] if count else trades
+
+
+_feed = None
+
+
+def start_market_feed(tickers, **kwargs):
+    """프로세스 전역 시세 피드 시작"""
+    global _feed
+    if _feed is None:
+        _feed = MarketDataFeed(tickers, **kwargs).start()
+    return _feed
+
+
+def get_market_feed():
+    """실행 중인 전역 시세 피드 (없으면 None)"""
+    return _feed
@@ -0,0 +1,314 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# 지연시간 히스토그램 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Histogram:
+    """고정 구간 히스토그램 (관측 1회당 이진 탐색 1회)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막은 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """구간 상한 기준 분위수 추정"""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound if bound != float("inf") else self.buckets[-1]
+        return self.buckets[-1]
+
+
+def _labels_text(labels, extra=None):
+    items = list(labels) + list(extra or [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{str(value)}"' for key, value in items) + "}"
+
+
+class MetricsRegistry:
+    """지연시간 히스토그램/카운터 저장소 (Prometheus 텍스트, JSON 스냅샷으로 내보내기)
+
+    collector는 내보낼 때만 호출되는 함수로 (이름, 타입, 라벨 dict, 값) 목록을 반환한다.
+    캐시 적중 수처럼 다른 모듈이 이미 세고 있는 값은 collector로 노출한다.
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def _record(self, histogram_key, counter_key, seconds):
+        """히스토그램 관측 + 카운터 증가 (락 1회)"""
+        with self._lock:
+            histogram = self._histograms.get(histogram_key)
+            if histogram is None:
+                histogram = self._histograms[histogram_key] = Histogram()
+            histogram.observe(seconds)
+            self._counters[counter_key] = self._counters.get(counter_key, 0) + 1
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def _timer_keys(self, base, labels):
+        histogram_key = self._key(f"{base}_seconds", labels)
+        counter_keys = {
+            status: self._key(f"{base}_calls_total", {**labels, "status": status})
+            for status in ("ok", "none", "error")
+        }
+        return histogram_key, counter_keys
+
+    @contextmanager
+    def timer(self, base, **labels):
+        """{base}_seconds 히스토그램과 {base}_calls_total{status} 카운터 기록"""
+        histogram_key, counter_keys = self._timer_keys(base, labels)
+        started = time.perf_counter()
+        status = "error"
+        try:
+            yield
+            status = "ok"
+        finally:
+            self._record(histogram_key, counter_keys[status], time.perf_counter() - started)
+
+    def timed(self, base, **labels):
+        """함수 데코레이터 (None 반환은 status=none으로 구분: 내부에서 예외를 삼키는 메서드용)"""
+        histogram_key, counter_keys = self._timer_keys(base, labels)
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                status = "error"
+                try:
+                    result = func(*args, **kwargs)
+                    status = "none" if result is None else "ok"
+                    return result
+                finally:
+                    self._record(histogram_key, counter_keys[status], time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def add_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def _collect(self):
+        samples = []
+        for collector in list(self._collectors):
+            try:
+                samples.extend(collector())
+            except Exception as e:
+                print(f"Error in metrics collector: {e}")
+        # 같은 이름의 샘플이 연속되도록 정렬 (Prometheus 텍스트 형식 요구사항)
+        return sorted(samples, key=lambda sample: sample[0])
+
+    def _copy(self):
+        with self._lock:
+            histograms = {
+                key: (histogram.buckets, list(histogram.counts), histogram.count, histogram.sum)
+                for key, histogram in self._histograms.items()
+            }
+            return histograms, dict(self._counters)
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 형식"""
+        histograms, counters = self._copy()
+        lines = []
+        typed = set()
+
+        for (name, labels), (buckets, counts, count, total) in sorted(histograms.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_labels_text(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_labels_text(labels)} {total}")
+            lines.append(f"{name}_count{_labels_text(labels)} {count}")
+
+        for (name, labels), value in sorted(counters.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_labels_text(labels)} {value}")
+
+        for name, kind, labels, value in self._collect():
+            if name not in typed:
+                lines.append(f"# TYPE {name} {kind}")
+                typed.add(name)
+            lines.append(f"{name}{_labels_text(sorted(labels.items()))} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """JSON 직렬화 가능한 현재 값 (히스토그램은 횟수/합계/분위수)"""
+        histograms, counters = self._copy()
+        result = {"time": datetime.now().isoformat(timespec="seconds"), "histograms": [], "counters": [], "gauges": []}
+
+        for (name, labels), (buckets, counts, count, total) in sorted(histograms.items()):
+            histogram = Histogram(buckets)
+            histogram.counts, histogram.count, histogram.sum = counts, count, total
+            result["histograms"].append({
+                "name": name, "labels": dict(labels), "count": count, "sum": total,
+                "p50": histogram.quantile(0.5), "p95": histogram.quantile(0.95), "p99": histogram.quantile(0.99),
+            })
+        for (name, labels), value in sorted(counters.items()):
+            result["counters"].append({"name": name, "labels": dict(labels), "value": value})
+        for name, kind, labels, value in self._collect():
+            result["counters" if kind == "counter" else "gauges"].append({"name": name, "labels": labels, "value": value})
+        return result
+
+
+def instrument_methods(cls, names, base, registry=None):
+    """클래스 메서드에 지연시간/호출 결과 계측 적용 (라벨 method=메서드 이름)"""
+    registry = registry or get_metrics()
+    for name in names:
+        setattr(cls, name, registry.timed(base, method=name)(getattr(cls, name)))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry = None
+    routes = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        route = self.routes.get(self.path.split("?")[0])
+        if route is not None:
+            # 추가 경로: (성공 여부, dict) -> 200 또는 503
+            ok, data = route()
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(200 if ok else 503)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if self.path.startswith("/metrics.json"):
+            body = json.dumps(self.registry.snapshot()).encode("utf-8")
+            content_type = "application/json"
+        elif self.path.startswith("/metrics"):
+            body = self.registry.render_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4"
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_http_server(port, host="127.0.0.1", registry=None, routes=None):
+    """/metrics (Prometheus), /metrics.json 엔드포인트를 백그라운드 스레드에서 제공
+
+    routes: {경로: 함수} 형태의 추가 엔드포인트 (함수는 (성공 여부, dict) 반환, 예: 헬스 체크)
+    """
+    handler = type("MetricsHandler", (_Handler,), {"registry": registry or get_metrics(), "routes": routes or {}})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"Metrics endpoint: http://{host}:{server.server_port}/metrics")
+    return server
+
+
+class JsonlExporter:
+    """interval초마다 스냅샷을 JSON Lines 파일에 추가"""
+
+    def __init__(self, path, interval=60, registry=None):
+        self.path = path
+        self.interval = interval
+        self.registry = registry or get_metrics()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def write(self):
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.registry.snapshot(), ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"Error in JsonlExporter.write: {e}")
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="metrics-jsonl", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self.write()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+_exporters = None
+
+
+def get_metrics():
+    """프로세스 전역 메트릭 저장소"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
+
+
+def start_exporters():
+    """METRICS_PORT / METRICS_JSONL 환경변수가 설정된 경우 내보내기 시작 (한 번만)"""
+    global _exporters
+    with _registry_lock:
+        if _exporters is not None:
+            return _exporters
+        _exporters = {}
+
+    port = os.getenv("METRICS_PORT")
+    if port:
+        _exporters["http"] = start_http_server(int(port), os.getenv("METRICS_HOST", "127.0.0.1"))
+    path = os.getenv("METRICS_JSONL")
+    if path:
+        _exporters["jsonl"] = JsonlExporter(path, int(os.getenv("METRICS_INTERVAL", "60"))).start()
+    return _exporters
@@ -1,40 +1,49 @@
 import os
 from dotenv import load_dotenv
-import json
 
 load_dotenv()
 
 
 def ai_trading():
     # 1. 업비트 차트 데이터 가져오기 (30일 데이터)
-    import pyupbit
+    from candle_store import CandleStore
 
-    df = pyupbit.get_ohlcv("KRW-BTC", count=30, interval="day")
+    # 로컬 캔들 저장소에서 새로 생긴 캔들만 조회
+    df = CandleStore().get_ohlcv("KRW-BTC", count=30, interval="day")
     print(df.to_json())
 
     # 2. OpenAI에게 데이터 제공하고 판단받기
-    from cerebras.cloud.sdk import Cerebras
-
-    client = Cerebras(
-        api_key=os.environ.get(
-            "CEREBRAS_API_KEY"
-        ),  # This is the default and can be omitted
-    )
-
-    response = client.chat.completions.create(
-        model="llama3.1-8b",
-        messages=[
-            {
-                "role": "system",
-                "content": "You are an expert in Bitcoin investing. Tell me whether to buy, sell, or hold at the moment based on the chart data provided. Response in Json format.\n\nResponse Example:\n{decision: 'buy', 'reason': 'some technical reason'}\n{decision: 'sell', 'reason': 'some technical reason'}\n{decision: 'hold', 'reason': 'some technical reason'}\n\n\n",
-            },
-            {"role": "user", "content": df.to_json()},
-        ],
-        response_format={"type": "json_object"},  # text 대신 json_object로 수정
-    )
-
-    result = response.choices[0].message.content
-    result = json.loads(result)
+    import math
+    from decision_cache import get_decision_cache
+    from llm import LLMClient, Route, cerebras_provider
+
+    # 최근 가격/변동이 이전 판단 때와 거의 같으면 이전 결정 재사용
+    decision_cache = get_decision_cache()
+    fingerprint = decision_cache.fingerprint({
+        "log_price": math.log(df["close"].iloc[-1]),
+        "log_change": math.log(df["close"].iloc[-1] / df["close"].iloc[-2]),
+    })
+    cached = decision_cache.get(fingerprint)
+
+    # 제한시간/재시도가 적용된 Cerebras 클라이언트
+    client = LLMClient([Route(cerebras_provider(), "llama3.1-8b", timeout=15)])
+
+    if cached is not None:
+        result, age = cached
+        print(f"### Cached AI Decision (age {age:.0f}s, hit rate {decision_cache.stats()['hit_rate']:.0%}) ###")
+    else:
+        response = client.complete_json(
+            [
+                {
+                    "role": "system",
+                    "content": "You are an expert in Bitcoin investing. Tell me whether to buy, sell, or hold at the moment based on the chart data provided. Response in Json format.\n\nResponse Example:\n{decision: 'buy', 'reason': 'some technical reason'}\n{decision: 'sell', 'reason': 'some technical reason'}\n{decision: 'hold', 'reason': 'some technical reason'}\n\n\n",
+                },
+                {"role": "user", "content": df.to_json()},
+            ],
+        )
+
+        result = response.data
+        decision_cache.put(fingerprint, result, response.latency)
 
     import pyupbit
 
@@ -70,10 +79,28 @@ def ai_trading():
         # 보유
         print("sell:", result["reason"])
 
+    # 스케줄러용 시장 상태 (현재가, ATR, LLM 호출 여부)
+    from indicators import IndicatorEngine
+
+    return {
+        "price": float(df["close"].iloc[-1]),
+        "atr": float(IndicatorEngine().frame(df.copy())["atr"].iloc[-1]),
+        "llm_called": cached is None,
+    }
 
-while True:
-    import time
 
-    # 10초마다 실행
-    time.sleep(10)
-    ai_trading()
+if __name__ == "__main__":
+    import pyupbit
+    from scheduler import TradingScheduler
+
+    # 1시간 단위로 실행하고, 그 사이에는 ATR 대비 급변동 시에만 추가 실행
+    scheduler = TradingScheduler(
+        ai_trading,
+        interval=3600,
+        price_source=lambda: pyupbit.get_current_price("KRW-BTC"),
+        max_calls_per_hour=4,
+    )
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        print("Trading bot stopped by user")
@@ -0,0 +1,293 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from http_client import DEFAULT_TIMEOUT, get_session
+from metrics import get_metrics
+
+
+NEWS_API = "https://serpapi.com/search.json"
+
+# 금융 뉴스용 감성 사전 (제목/요약문 단어 단위, 부정어 뒤 3단어 이내는 부호 반전)
+POSITIVE_WORDS = frozenset("""
+    adopt adopts adoption approval approve approved approves bull bullish boost boosts breakout climb climbs
+    climbed confidence gain gains gained growth high highs inflow inflows jump jumps jumped optimism optimistic
+    outperform rally rallies rallied rebound rebounds record recover recovers recovery rise rises rising rose
+    soar soars soared strong stronger support surge surges surged upgrade upside win wins
+""".split())
+NEGATIVE_WORDS = frozenset("""
+    ban bans banned bear bearish breach collapse collapses crash crashes crashed decline declines declined drop
+    drops dropped dump fall falls fell fear fears fraud hack hacked hacks lawsuit liquidation liquidations loss
+    losses low lows outflow outflows plunge plunges plunged probe reject rejected rejects risk risks selloff
+    slump slumps sue sued tumble tumbles tumbled warning weak weaker
+""".split())
+NEGATIONS = frozenset({"not", "no", "never", "without", "fails", "failed"})
+# URL 비교 시 제외하는 추적용 쿼리 파라미터
+TRACKING_PARAMS = ("utm_", "ref", "fbclid", "gclid", "ocid")
+
+
+def normalize_title(title):
+    return re.sub(r"\W+", " ", (title or "").lower()).strip()
+
+
+def title_hash(title):
+    """소문자/구두점 제거한 제목의 해시 (같은 기사가 다른 URL로 올라온 경우)"""
+    normalized = normalize_title(title)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest() if normalized else None
+
+
+def normalize_url(url):
+    """스킴/www/추적 파라미터/fragment/끝 슬래시 차이를 무시한 URL"""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    query = [(key, value) for key, value in parse_qsl(parts.query)
+             if not key.lower().startswith(TRACKING_PARAMS)]
+    return f"{host}{parts.path.rstrip('/')}" + (f"?{urlencode(sorted(query))}" if query else "")
+
+
+def score_text(text):
+    """사전 기반 감성 점수 (-1 ~ 1, 감성 단어가 없으면 0)"""
+    positive = negative = 0
+    negated = 0
+    for word in re.findall(r"[a-z]+", (text or "").lower()):
+        if word in NEGATIONS:
+            negated = 3
+            continue
+        sign = 1 if word in POSITIVE_WORDS else -1 if word in NEGATIVE_WORDS else 0
+        if negated:
+            negated -= 1
+            sign = -sign
+        if sign > 0:
+            positive += 1
+        elif sign < 0:
+            negative += 1
+    # +1: 감성 단어 하나만으로 극단값이 되지 않도록
+    return (positive - negative) / (positive + negative + 1)
+
+
+def score_article(article):
+    """제목은 요약문보다 2배 가중"""
+    title = article.get("title", "")
+    return score_text(f"{title} {title} {article.get('snippet', '')}")
+
+
+def sentiment_label(score):
+    if score >= 0.15:
+        return "positive"
+    if score <= -0.15:
+        return "negative"
+    return "neutral"
+
+
+class SeenSet:
+    """최근 max_size개 키만 기억하는 집합 (오래된 것부터 제거)"""
+
+    def __init__(self, max_size=5000):
+        self.max_size = max_size
+        self._keys = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key):
+        self._keys[key] = None
+        self._keys.move_to_end(key)
+        while len(self._keys) > self.max_size:
+            self._keys.popitem(last=False)
+
+
+class NewsFeed:
+    """뉴스 수집/중복 제거/감성 점수 (매매 주기와 별도의 폴링 주기)
+
+    - URL(정규화) 또는 제목 해시가 이미 본 기사면 버림 (SeenSet 크기 제한)
+    - 기사별 사전 기반 감성 점수를 반감기 half_life로 감쇠시킨 가중 평균을 집계 점수로 사용
+    - context(since)는 집계 점수와 since 이후 새로 들어온 기사 제목만 반환 (LLM 프롬프트용)
+    백그라운드 스레드 없이 쓰는 경우 poll_if_due()로 주기가 지났을 때만 조회한다.
+    """
+
+    def __init__(self, url=None, api_key=None, query="bitcoin crypto trading", http=None, interval=900,
+                 half_life=6 * 3600, max_seen=5000, max_articles=500, max_headlines=5):
+        self.url = url or os.getenv("NEWS_API_URL", NEWS_API)
+        self.api_key = os.getenv("SERPAPI_KEY") if api_key is None else api_key
+        self.query = query
+        self.http = http or get_session()
+        self.interval = interval
+        self.half_life = half_life
+        self.max_headlines = max_headlines
+
+        self._seen = SeenSet(max_seen)
+        # (순번, 게시 시각, 점수, 기사)
+        self._articles = deque(maxlen=max_articles)
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.last_poll = None
+        self.last_success = None
+        self.polls = 0
+        self.errors = 0
+        self.new_articles = 0
+        self.duplicates = 0
+
+    def fetch(self):
+        """SerpAPI Google News 결과 목록 (실패 시 None)"""
+        params = {"engine": "google_news", "q": self.query, "api_key": self.api_key, "gl": "us", "hl": "en"}
+        with get_metrics().timer("http_request", service="serpapi"):
+            response = self.http.get(self.url, params=params, timeout=DEFAULT_TIMEOUT)
+        if response.status_code != 200:
+            print(f"News API returned {response.status_code}")
+            return None
+        return response.json().get("news_results")
+
+    @staticmethod
+    def _published(item, now):
+        """iso_date가 있으면 게시 시각, 없으면 수집 시각"""
+        try:
+            return min(datetime.fromisoformat(item["iso_date"].replace("Z", "+00:00")).timestamp(), now)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return now
+
+    def ingest(self, results, now=None):
+        """새 기사만 추가하고 추가된 수 반환"""
+        now = time.time() if now is None else now
+        added = 0
+        with self._lock:
+            for item in results or []:
+                keys = [key for key in (normalize_url(item.get("link")), title_hash(item.get("title"))) if key]
+                if not keys or any(key in self._seen for key in keys):
+                    self.duplicates += 1
+                    continue
+                for key in keys:
+                    self._seen.add(key)
+
+                article = {
+                    "title": item.get("title", ""),
+                    "link": item.get("link", ""),
+                    "source": (item.get("source") or {}).get("name", ""),
+                    "date": item.get("date", ""),
+                    "snippet": item.get("snippet", ""),
+                }
+                article["sentiment"] = round(score_article(article), 2)
+                self._sequence += 1
+                self._articles.append((self._sequence, self._published(item, now), article["sentiment"], article))
+                added += 1
+            self.new_articles += added
+        return added
+
+    def poll(self):
+        """1회 조회 후 새 기사 수 반환 (실패 시 None)"""
+        self.last_poll = time.time()
+        self.polls += 1
+        try:
+            results = self.fetch()
+        except Exception as e:
+            print(f"Error in NewsFeed.poll: {e}")
+            results = None
+        if results is None:
+            self.errors += 1
+            return None
+        self.last_success = self.last_poll
+        return self.ingest(results)
+
+    def poll_if_due(self):
+        if self.last_poll is None or time.time() - self.last_poll >= self.interval:
+            return self.poll()
+        return 0
+
+    def sentiment(self, now=None):
+        """시간 감쇠 가중 평균 감성 점수 (weight: 유효 기사 수)"""
+        now = time.time() if now is None else now
+        total = weight = 0.0
+        with self._lock:
+            articles = list(self._articles)
+        for _, published, score, _ in articles:
+            w = 0.5 ** (max(now - published, 0) / self.half_life)
+            total += w * score
+            weight += w
+        score = total / weight if weight else 0.0
+        return {"score": round(score, 3), "label": sentiment_label(score), "weight": round(weight, 1)}
+
+    def context(self, since=0):
+        """(마지막 순번, {"sentiment": 집계, "headlines": since 이후 새 기사 중 최신순}) (성공한 조회가 없으면 None)"""
+        if self.last_success is None:
+            return since, None
+        with self._lock:
+            sequence = self._sequence
+            fresh = [(published, article) for number, published, _, article in self._articles if number > since]
+        # 한 번에 많이 들어온 경우 최신 기사부터 max_headlines개 (나머지는 집계 점수에만 반영)
+        fresh.sort(key=lambda item: item[0], reverse=True)
+        headlines = [
+            {key: article[key] for key in ("title", "source", "date", "snippet", "sentiment")}
+            for _, article in fresh[:self.max_headlines]
+        ]
+        return sequence, {"sentiment": {**self.sentiment(), "new": len(fresh)}, "headlines": headlines}
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.poll()
+            self._stopped.wait(self.interval)
+
+    def start(self):
+        """백그라운드 폴링 시작"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="news-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self):
+        return {
+            "running": self.running,
+            "last_poll": self.last_poll,
+            "last_success": self.last_success,
+            "articles": len(self._articles),
+            "seen": len(self._seen),
+        }
+
+
+_news_feed = None
+_news_feed_lock = threading.Lock()
+
+
+def get_news_feed():
+    """프로세스 전역 뉴스 피드 (start_news_feed 전에는 호출하는 쪽에서 poll_if_due로 조회)"""
+    global _news_feed
+    with _news_feed_lock:
+        if _news_feed is None:
+            _news_feed = NewsFeed(interval=int(os.getenv("NEWS_POLL_INTERVAL", "900")))
+            get_metrics().add_collector(_collect_news)
+        return _news_feed
+
+
+def start_news_feed():
+    """전역 뉴스 피드의 백그라운드 폴링 시작"""
+    return get_news_feed().start()
+
+
+def _collect_news():
+    feed = _news_feed
+    return [
+        ("news_articles_total", "counter", {"result": "new"}, feed.new_articles),
+        ("news_articles_total", "counter", {"result": "duplicate"}, feed.duplicates),
+        ("news_polls_total", "counter", {"result": "error"}, feed.errors),
+        ("news_polls_total", "counter", {"result": "ok"}, feed.polls - feed.errors),
+        ("news_sentiment", "gauge", {}, feed.sentiment()["score"]),
+    ]
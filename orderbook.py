@@ -0,0 +1,151 @@
+import threading
+
+import numpy as np
+
+
+LEVELS = 15                   # 업비트 KRW 마켓 호가 단계 수
+DEPTH_PCTS = (0.1, 0.5, 1.0)  # 누적 잔량을 계산할 중간가 대비 범위 (%)
+
+
+def book_arrays(orderbook, levels=LEVELS):
+    """pyupbit/WebSocket 호가 -> (매도호가, 매도잔량, 매수호가, 매수잔량) 배열 (부족한 단계는 NaN/0)"""
+    units = orderbook['orderbook_units'][:levels]
+    arrays = np.zeros((4, levels))
+    arrays[(0, 2), :] = np.nan
+    arrays[:, :len(units)] = [
+        [unit['ask_price'] for unit in units],
+        [unit['ask_size'] for unit in units],
+        [unit['bid_price'] for unit in units],
+        [unit['bid_size'] for unit in units],
+    ]
+    return arrays
+
+
+def depth_features(ask_price, ask_size, bid_price, bid_size, depth_pcts=DEPTH_PCTS):
+    """호가 배열에서 스프레드/마이크로프라이스/불균형/누적 잔량 계산
+
+    (levels,) 배열이면 스칼라, (n, levels) 배열이면 스냅샷별 배열을 반환한다.
+    불균형은 (매수 - 매도) / (매수 + 매도) 로 -1 ~ 1 (양수면 매수 우위).
+    """
+    best_ask, best_bid = ask_price[..., 0], bid_price[..., 0]
+    best_ask_size, best_bid_size = ask_size[..., 0], bid_size[..., 0]
+    mid = (best_ask + best_bid) / 2
+    # 최우선 잔량 가중 가격: 매수 잔량이 많을수록 매도호가 쪽으로 치우침
+    microprice = (best_ask * best_bid_size + best_bid * best_ask_size) / (best_ask_size + best_bid_size)
+
+    total_ask = ask_size.sum(axis=-1)
+    total_bid = bid_size.sum(axis=-1)
+
+    depth = {}
+    with np.errstate(invalid="ignore"):
+        for pct in depth_pcts:
+            ask_within = ask_price <= (mid * (1 + pct / 100))[..., None]
+            bid_within = bid_price >= (mid * (1 - pct / 100))[..., None]
+            ask_krw = np.where(ask_within, ask_price * ask_size, 0).sum(axis=-1)
+            bid_krw = np.where(bid_within, bid_price * bid_size, 0).sum(axis=-1)
+            depth[f"{pct}%"] = {
+                "ask_krw": ask_krw,
+                "bid_krw": bid_krw,
+                "imbalance": (bid_krw - ask_krw) / (bid_krw + ask_krw),
+            }
+
+    return {
+        "mid": mid,
+        "spread": best_ask - best_bid,
+        "spread_bps": (best_ask - best_bid) / mid * 1e4,
+        "microprice": microprice,
+        "microprice_offset_bps": (microprice - mid) / mid * 1e4,
+        "top_imbalance": (best_bid_size - best_ask_size) / (best_bid_size + best_ask_size),
+        "imbalance": (total_bid - total_ask) / (total_bid + total_ask),
+        "depth": depth,
+    }
+
+
+def available_within(orderbook, side, slippage):
+    """최우선 호가 대비 slippage 비율 안에서 체결 가능한 양 (buy: KRW, sell: 코인 수량)"""
+    ask_price, ask_size, bid_price, bid_size = book_arrays(orderbook)
+    with np.errstate(invalid="ignore"):
+        if side == "buy":
+            within = ask_price <= ask_price[0] * (1 + slippage)
+            return float(np.where(within, ask_price * ask_size, 0).sum())
+        within = bid_price >= bid_price[0] * (1 - slippage)
+        return float(np.where(within, bid_size, 0).sum())
+
+
+def _to_python(features):
+    if isinstance(features, dict):
+        return {key: _to_python(value) for key, value in features.items()}
+    if isinstance(features, (int, np.integer)):
+        return int(features)
+    value = float(features)
+    return value if np.isfinite(value) else None
+
+
+class OrderbookHistory:
+    """최근 호가 스냅샷 링버퍼 (미리 할당된 NumPy 배열, 스냅샷당 복사 1회)"""
+
+    def __init__(self, capacity=600, levels=LEVELS):
+        self.capacity = capacity
+        self.levels = levels
+        self.timestamps = np.zeros(capacity, dtype=np.int64)  # ms
+        self.books = np.zeros((capacity, 4, levels))          # 매도호가, 매도잔량, 매수호가, 매수잔량
+        self.head = 0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def push(self, orderbook):
+        """스냅샷 추가 (마지막 스냅샷보다 timestamp가 늦지 않으면 무시: 중복/순서가 뒤바뀐 메시지)"""
+        timestamp = int(orderbook['timestamp'])
+        arrays = book_arrays(orderbook, self.levels)
+        with self._lock:
+            if self.count and timestamp <= self.timestamps[(self.head - 1) % self.capacity]:
+                return
+            self.timestamps[self.head] = timestamp
+            self.books[self.head] = arrays
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def snapshots(self, count=None):
+        """오래된 것부터 (timestamps, books) 복사본"""
+        with self._lock:
+            count = self.count if count is None else min(count, self.count)
+            rows = (self.head - count + np.arange(count)) % self.capacity
+            return self.timestamps[rows], self.books[rows]
+
+    def latest_features(self, depth_pcts=DEPTH_PCTS):
+        timestamps, books = self.snapshots(1)
+        if not len(books):
+            return None
+        return _to_python(depth_features(*books[0], depth_pcts=depth_pcts))
+
+    def imbalance_trend(self, seconds=60):
+        """최근 seconds초 동안 불균형 추이 (전체 스냅샷에 대해 한 번에 계산)"""
+        timestamps, books = self.snapshots()
+        if not len(books):
+            return None
+        recent = timestamps >= timestamps[-1] - seconds * 1000
+        timestamps, books = timestamps[recent], books[recent]
+
+        features = depth_features(books[:, 0], books[:, 1], books[:, 2], books[:, 3], depth_pcts=())
+        imbalance = features["imbalance"]
+        minutes = (timestamps - timestamps[0]) / 60000
+        slope = np.polyfit(minutes, imbalance, 1)[0] if len(books) >= 3 and minutes[-1] > 0 else 0.0
+        return _to_python({
+            "samples": len(books),
+            "mean": imbalance.mean(),
+            "change": imbalance[-1] - imbalance[0],
+            "slope_per_min": slope,
+            "top_mean": features["top_imbalance"].mean(),
+        })
+
+
+_histories = {}
+_histories_lock = threading.Lock()
+
+
+def get_orderbook_history(ticker):
+    """티커별 호가 링버퍼 (실시간 피드와 REST 조회 결과가 함께 쌓임)"""
+    with _histories_lock:
+        if ticker not in _histories:
+            _histories[ticker] = OrderbookHistory()
+        return _histories[ticker]
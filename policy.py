@@ -0,0 +1,66 @@
+import numpy as np
+
+
+class TradePolicy:
+    """공포탐욕지수 기반 매매 비율/조건 (실거래와 백테스트에서 공통 사용)
+
+    - 매수: 지수 <= 25 -> 99.95%, <= 40 -> 70%, 그 외 50% (KRW 잔고 대비)
+    - 매도: 지수 >= 75 -> 100%, >= 60 -> 70%, 그 외 50% (보유 수량 대비)
+    - 신뢰도 > 70 이고 잔고(평가액) > 5,000 KRW일 때만 주문
+    """
+
+    def __init__(self, buy_breakpoints=(25, 40), buy_ratios=(0.9995, 0.7, 0.5),
+                 sell_breakpoints=(75, 60), sell_ratios=(1.0, 0.7, 0.5),
+                 min_confidence=70, min_order=5000):
+        self.buy_breakpoints = tuple(buy_breakpoints)
+        self.buy_ratios = tuple(buy_ratios)
+        self.sell_breakpoints = tuple(sell_breakpoints)
+        self.sell_ratios = tuple(sell_ratios)
+        self.min_confidence = min_confidence
+        self.min_order = min_order
+
+    def trade_ratio(self, decision, fear_greed_value):
+        """결정과 공포탐욕지수에 따른 매매 비율 (hold는 0)"""
+        if decision == "buy":
+            for breakpoint, ratio in zip(self.buy_breakpoints, self.buy_ratios):
+                if fear_greed_value <= breakpoint:
+                    return ratio
+            return self.buy_ratios[-1]
+
+        if decision == "sell":
+            for breakpoint, ratio in zip(self.sell_breakpoints, self.sell_ratios):
+                if fear_greed_value >= breakpoint:
+                    return ratio
+            return self.sell_ratios[-1]
+
+        return 0.0
+
+    def should_trade(self, confidence_score):
+        return confidence_score > self.min_confidence
+
+    def trade_ratios(self, decisions, fear_greed_values):
+        """trade_ratio의 벡터화 버전 (decisions: 1=buy, -1=sell, 0=hold)"""
+        decisions = np.asarray(decisions)
+        fear_greed_values = np.asarray(fear_greed_values, dtype=float)
+
+        buy = np.select(
+            [fear_greed_values <= breakpoint for breakpoint in self.buy_breakpoints],
+            self.buy_ratios[:-1],
+            self.buy_ratios[-1],
+        )
+        sell = np.select(
+            [fear_greed_values >= breakpoint for breakpoint in self.sell_breakpoints],
+            self.sell_ratios[:-1],
+            self.sell_ratios[-1],
+        )
+        return np.where(decisions > 0, buy, np.where(decisions < 0, sell, 0.0))
+
+    def params(self):
+        return {
+            "buy_breakpoints": self.buy_breakpoints,
+            "buy_ratios": self.buy_ratios,
+            "sell_breakpoints": self.sell_breakpoints,
+            "sell_ratios": self.sell_ratios,
+            "min_confidence": self.min_confidence,
+            "min_order": self.min_order,
+        }
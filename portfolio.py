@@ -0,0 +1,201 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pyupbit
+from dotenv import load_dotenv
+
+from autotrade import EnhancedCryptoTrader
+from candle_store import CandleStore
+from scheduler import TradingScheduler
+from market_feed import get_market_feed, start_market_feed
+from news_feed import start_news_feed
+from llm import get_llm_client
+from analysis import BatchAnalyzer
+from account import AccountState
+from rate_limit import upbit_request
+from metrics import instrument_methods, start_exporters
+
+
+load_dotenv()
+
+
+REQUIRED_SOURCES = ["current_status", "orderbook", "ohlcv", "fear_greed", "news"]
+
+
+class PortfolioTrader:
+    """하나의 프로세스에서 여러 KRW 마켓을 운용하는 트레이더"""
+
+    def __init__(self, tickers=None, max_concurrency=4, analysis_mode=None):
+        if tickers is None:
+            tickers = os.getenv("WATCHLIST", "KRW-BTC").split(",")
+        self.tickers = [ticker.strip() for ticker in tickers if ticker.strip()]
+        self.max_concurrency = max_concurrency
+        if analysis_mode is None:
+            analysis_mode = os.getenv("LLM_ANALYSIS_MODE", "packed")
+
+        # 업비트/LLM 클라이언트와 캔들 저장소는 모든 티커가 공유
+        self.upbit = pyupbit.Upbit(os.getenv('UPBIT_ACCESS_KEY'), os.getenv('UPBIT_SECRET_KEY'))
+        self.llm = get_llm_client("analysis")
+        self.vision_llm = get_llm_client("vision")
+        self.candle_store = CandleStore()
+        self.account = AccountState(self.upbit)
+        self.traders = {
+            ticker: EnhancedCryptoTrader(
+                ticker, upbit=self.upbit, llm=self.llm, vision_llm=self.vision_llm,
+                candle_store=self.candle_store, account=self.account
+            )
+            for ticker in self.tickers
+        }
+        # 티커별 LLM 호출 대신 여러 티커를 묶어서 분석 (packed/concurrent)
+        self.analyzer = BatchAnalyzer(self.llm, mode=analysis_mode)
+
+    def get_market_snapshot(self):
+        """잔고/현재가/호가를 일괄 조회 (티커 수와 무관하게 최대 3회 호출)"""
+        balances = self.account.snapshot()
+
+        # 실시간 피드에 있는 값은 그대로 쓰고, 나머지만 REST로 일괄 조회
+        feed = get_market_feed()
+        prices = {}
+        orderbooks = {}
+        if feed is not None:
+            for ticker in self.tickers:
+                price = feed.get_current_price(ticker)
+                if price is not None:
+                    prices[ticker] = price
+                orderbook = feed.get_orderbook(ticker)
+                if orderbook is not None:
+                    orderbooks[ticker] = orderbook
+
+        missing = [ticker for ticker in self.tickers if ticker not in prices]
+        if missing:
+            with upbit_request("quotation", "ticker"):
+                fetched = pyupbit.get_current_price(missing)
+            if not isinstance(fetched, dict):
+                fetched = {missing[0]: fetched}
+            prices.update(fetched)
+
+        missing = [ticker for ticker in self.tickers if ticker not in orderbooks]
+        if missing:
+            with upbit_request("quotation", "orderbook"):
+                fetched = pyupbit.get_orderbook(missing)
+            if isinstance(fetched, dict):
+                fetched = [fetched]
+            orderbooks.update({item['market']: item for item in fetched})
+
+        return balances, prices, orderbooks
+
+    def prepare_ticker(self, ticker, shared):
+        """티커 하나의 분석 데이터 수집 (필수 데이터가 없으면 None)"""
+        trader = self.traders[ticker]
+        balances, prices, orderbooks, fear_greed_data, news_data = shared
+
+        preset = {
+            "current_status": trader.get_current_status(balances, prices.get(ticker)),
+            "orderbook": trader.get_orderbook_data(orderbooks.get(ticker)),
+            "fear_greed": fear_greed_data,
+            "news": news_data,
+        }
+        analysis_data = trader.gather_analysis_data(preset=preset)
+
+        if not all(analysis_data[name] for name in REQUIRED_SOURCES):
+            return None
+        return analysis_data
+
+    def run_cycle(self):
+        """전체 워치리스트 1회 분석: 데이터 수집(동시 실행 수 제한) -> 일괄 LLM 분석 -> 매매"""
+        started = time.perf_counter()
+        balances, prices, orderbooks = self.get_market_snapshot()
+
+        # 시장 전체에 공통인 데이터는 한 번만 조회
+        first = self.traders[self.tickers[0]]
+        fear_greed_data = first.cached("fear_greed", first.get_fear_greed_index)
+        news_data = first.get_crypto_news()
+        shared = (
+            balances, prices, orderbooks,
+            fear_greed_data,
+            news_data,
+        )
+
+        prepared = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {
+                ticker: executor.submit(self.prepare_ticker, ticker, shared)
+                for ticker in self.tickers
+            }
+            for ticker, future in futures.items():
+                try:
+                    analysis_data = future.result()
+                except Exception as e:
+                    print(f"Error in prepare_ticker ({ticker}): {e}")
+                    analysis_data = None
+                if analysis_data is not None:
+                    prepared[ticker] = analysis_data
+
+        try:
+            decisions = self.analyzer.analyze(prepared) if prepared else {}
+        except Exception as e:
+            print(f"Error in batch analysis: {e}")
+            decisions = {}
+
+        # 공통 뉴스는 LLM이 새로 분석한 티커가 있을 때만 본 것으로 처리 (캐시 재사용/수집 실패 시 다음 사이클에 다시 전달)
+        if any(result and not result.get("cached") for result in decisions.values()):
+            first.commit_news(news_data)
+
+        results = {}
+        for ticker in self.tickers:
+            ai_result = decisions.get(ticker)
+            results[ticker] = ai_result
+            report = None
+
+            if ai_result:
+                print(f"\n=== AI Analysis Result ({ticker}) ===")
+                print(json.dumps(ai_result, indent=2))
+
+                # 주문은 KRW 잔고를 공유하므로 한 번에 하나씩 실행
+                report = self.traders[ticker].execute_trade(
+                    ai_result['decision'],
+                    ai_result['confidence_score'],
+                    fear_greed_data['current']['value']
+                )
+
+            if ticker in prepared:
+                self.traders[ticker].record_cycle(
+                    prepared[ticker], ai_result, report, self.analyzer.last_latencies.get(ticker)
+                )
+
+        print(f"\nPortfolio cycle: {len(self.tickers)} tickers in {time.perf_counter() - started:.2f}s")
+        return results
+
+
+# 단계별 지연시간/호출 결과 계측
+instrument_methods(PortfolioTrader, ["get_market_snapshot", "prepare_ticker", "run_cycle"], "portfolio_method")
+
+
+def portfolio_trading(tickers=None):
+    try:
+        return PortfolioTrader(tickers).run_cycle()
+    except Exception as e:
+        print(f"Error in portfolio_trading: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    print("Starting Portfolio Trading Bot...")
+    print("Press Ctrl+C to stop")
+
+    # METRICS_PORT / METRICS_JSONL 설정 시 메트릭 내보내기
+    start_exporters()
+
+    portfolio = PortfolioTrader()
+    start_market_feed(portfolio.tickers).wait_ready()
+    # 뉴스는 NEWS_POLL_INTERVAL(기본 15분)마다 백그라운드에서 수집
+    start_news_feed()
+
+    # 10분봉 마감에 맞춰 실행 (실행 시간만큼 밀리지 않음)
+    scheduler = TradingScheduler(portfolio.run_cycle, interval=600)
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        print("\nTrading bot stopped by user")
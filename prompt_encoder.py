@@ -0,0 +1,186 @@
+import hashlib
+import json
+import math
+import re
+
+
+def estimate_tokens(text):
+    """토큰 수 추정 (영문/숫자 JSON 기준 약 4자당 1토큰)"""
+    return math.ceil(len(text) / 4)
+
+
+def round_sig(value, digits=5):
+    """유효숫자 기준 반올림 (NaN/inf는 None)"""
+    if value is None or isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+    if not math.isfinite(value):
+        return None
+    if value == 0:
+        return 0
+    rounded = round(value, digits - 1 - int(math.floor(math.log10(abs(value)))))
+    return int(rounded) if float(rounded).is_integer() else rounded
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+# 컬럼별 유효숫자 (없으면 기본값)
+COLUMN_DIGITS = {
+    "volume": 4,
+    "value": 4,
+    "rsi": 3,
+    "bb_pband": 3,
+}
+
+# 모든 티커에 공통인 섹션 (배치 요청에서 1회만 포함)
+SHARED_SECTIONS = ("fear_greed", "news")
+
+
+class PromptEncoder:
+    """get_ai_analysis 입력을 압축된 JSON으로 변환하고 토큰 예산을 적용"""
+
+    def __init__(self, budget=2500, digits=6, snippet_chars=160, chart_chars=1200):
+        self.budget = budget
+        self.digits = digits
+        self.snippet_chars = snippet_chars
+        self.chart_chars = chart_chars
+
+    def _round(self, data):
+        if isinstance(data, dict):
+            return {key: self._round(value) for key, value in data.items()}
+        if isinstance(data, list):
+            return [self._round(value) for value in data]
+        return round_sig(data, self.digits)
+
+    def encode_table(self, records):
+        """[{컬럼: 값}, ...] -> {"columns": [...], "rows": [[...], ...]} (전부 null인 컬럼 제외)"""
+        if not records:
+            return {"columns": [], "rows": []}
+
+        columns = [column for column in records[0]
+                   if any(record.get(column) is not None for record in records)]
+        # 날짜를 맨 앞으로
+        if "date" in columns:
+            columns.remove("date")
+            columns.insert(0, "date")
+
+        rows = [
+            [round_sig(record.get(column), COLUMN_DIGITS.get(column, self.digits)) for column in columns]
+            for record in records
+        ]
+        return {"columns": columns, "rows": rows}
+
+    def encode_news(self, news, snippet_chars):
+        """제목 기준 중복 제거, 링크 제외, 요약문 길이 제한
+
+        NewsFeed 형식({"sentiment", "headlines"})이면 집계 점수는 그대로 두고 새 기사 목록만 줄인다.
+        """
+        if isinstance(news, dict):
+            return {"sentiment": news.get("sentiment"),
+                    "headlines": self.encode_news(news.get("headlines"), snippet_chars)}
+
+        seen = set()
+        encoded = []
+        for item in news or []:
+            normalized = re.sub(r"\W+", " ", item.get("title", "").lower()).strip()
+            digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+            if not normalized or digest in seen:
+                continue
+            seen.add(digest)
+
+            entry = {"title": item.get("title", ""), "source": item.get("source", "")}
+            snippet = item.get("snippet", "")
+            if snippet_chars and snippet:
+                entry["snippet"] = snippet[:snippet_chars]
+            if item.get("sentiment") is not None:
+                entry["sentiment"] = item["sentiment"]
+            encoded.append(entry)
+        return encoded
+
+    def _sections(self, data, snippet_chars, daily_rows, hourly_rows, chart_chars):
+        ohlcv = data["ohlcv"]
+        fear_greed = data["fear_greed"]
+        chart_analysis = data.get("chart_analysis")
+        if isinstance(chart_analysis, str) and chart_chars is not None:
+            chart_analysis = chart_analysis[:chart_chars]
+
+        return {
+            "current_status": self._round(data["current_status"]),
+            "orderbook": self._round(data["orderbook"]),
+            "ohlcv": {
+                "daily": self.encode_table(ohlcv["daily_data"][-daily_rows:] if daily_rows else []),
+                "hourly": self.encode_table(ohlcv["hourly_data"][-hourly_rows:] if hourly_rows else []),
+                "latest_indicators": self._round(ohlcv["latest_indicators"]),
+            },
+            "fear_greed": {
+                "current": fear_greed["current"],
+                "history": [item["value"] for item in fear_greed["history"]],
+                "trend": fear_greed["trend"],
+                "average": round_sig(fear_greed["average"], 3),
+            },
+            "news": self.encode_news(data["news"], snippet_chars),
+            "chart_analysis": self._round(chart_analysis),
+        }
+
+    def _fit(self, data):
+        """예산 안에 들어올 때까지 단계적으로 줄인 (섹션, payload)
+
+        뉴스 요약문 -> 시간봉 행 -> 일봉 행 -> 차트 분석 순으로 줄임
+        """
+        daily_rows = len(data["ohlcv"]["daily_data"])
+        hourly_rows = len(data["ohlcv"]["hourly_data"])
+        steps = [
+            (self.snippet_chars, daily_rows, hourly_rows, self.chart_chars),
+            (0, daily_rows, hourly_rows, self.chart_chars),
+            (0, daily_rows, min(hourly_rows, 3), self.chart_chars),
+            (0, min(daily_rows, 3), min(hourly_rows, 3), self.chart_chars),
+            (0, min(daily_rows, 3), min(hourly_rows, 3), self.chart_chars // 2),
+            (0, 1, 1, self.chart_chars // 4),
+        ]
+
+        for snippet_chars, daily, hourly, chart_chars in steps:
+            sections = self._sections(data, snippet_chars, daily, hourly, chart_chars)
+            payload = _dumps(sections)
+            if estimate_tokens(payload) <= self.budget:
+                break
+        return sections, payload
+
+    def encode(self, data):
+        """(압축된 payload 문자열, 리포트) 반환"""
+        sections, payload = self._fit(data)
+
+        baseline = json.dumps(data)
+        report = {
+            "sections": {name: estimate_tokens(_dumps(value)) for name, value in sections.items()},
+            "tokens": estimate_tokens(payload),
+            "budget": self.budget,
+            "over_budget": estimate_tokens(payload) > self.budget,
+            "bytes": len(payload.encode("utf-8")),
+            "baseline_bytes": len(baseline.encode("utf-8")),
+            "baseline_tokens": estimate_tokens(baseline),
+        }
+        report["reduction"] = 1 - report["bytes"] / report["baseline_bytes"] if report["baseline_bytes"] else 0.0
+        return payload, report
+
+    def encode_batch(self, data_by_ticker):
+        """여러 티커 입력을 하나의 payload로 (공통 데이터인 공포탐욕지수/뉴스는 1회만 포함)
+
+        티커별 섹션은 encode와 같은 예산 규칙으로 줄인다.
+        """
+        markets = {}
+        shared = None
+        for ticker, data in data_by_ticker.items():
+            sections, _ = self._fit(data)
+            if shared is None:
+                shared = {name: sections[name] for name in SHARED_SECTIONS}
+            markets[ticker] = {name: value for name, value in sections.items() if name not in SHARED_SECTIONS}
+
+        payload = _dumps({"shared": shared or {}, "markets": markets})
+        report = {
+            "tokens": estimate_tokens(payload),
+            "shared_tokens": estimate_tokens(_dumps(shared or {})),
+            "market_tokens": {ticker: estimate_tokens(_dumps(value)) for ticker, value in markets.items()},
+            "bytes": len(payload.encode("utf-8")),
+        }
+        return payload, report
@@ -0,0 +1,80 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import get_metrics
+
+
+# 업비트 API 초당 요청 한도 (그룹별)
+UPBIT_RATE_LIMITS = {
+    "quotation": 10,   # 시세 조회 (현재가/호가/캔들)
+    "exchange": 30,    # 주문 외 거래소 API (잔고/주문 조회)
+    "order": 8,        # 주문 생성/취소
+}
+
+
+class RateLimiter:
+    """초당 요청 수 제한 (토큰 버킷, 스레드 안전)"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """tokens개 요청이 허용될 때까지 대기 후 대기 시간 반환"""
+        tokens = min(tokens, self.capacity)
+        started = time.monotonic()
+
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    break
+                # 순서대로 처리되도록 락을 쥔 채 대기
+                time.sleep((tokens - self.tokens) / self.rate)
+
+            waited = time.monotonic() - started
+            self.waited += waited
+            self.requests += tokens
+        return waited
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(group):
+    """프로세스 전역 업비트 API 그룹별 레이트 리미터"""
+    with _limiters_lock:
+        if group not in _limiters:
+            _limiters[group] = RateLimiter(UPBIT_RATE_LIMITS[group])
+        return _limiters[group]
+
+
+@contextmanager
+def upbit_request(group, endpoint, tokens=1):
+    """레이트 리미터 대기 후 업비트 API 요청 지연시간/오류 기록"""
+    get_rate_limiter(group).acquire(tokens)
+    with get_metrics().timer("upbit_request", group=group, endpoint=endpoint):
+        yield
+
+
+def _collect_limiters():
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    samples = []
+    for group, limiter in limiters.items():
+        samples.append(("upbit_rate_limit_wait_seconds_total", "counter", {"group": group}, limiter.waited))
+        samples.append(("upbit_rate_limit_tokens_total", "counter", {"group": group}, limiter.requests))
+    return samples
+
+
+get_metrics().add_collector(_collect_limiters)
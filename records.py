@@ -0,0 +1,44 @@
+import math
+
+import numpy as np
+
+
+def json_safe(value):
+    """NaN/inf -> None, numpy 스칼라 -> 파이썬 기본형"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _column_values(series):
+    """컬럼 하나를 JSON 직렬화 가능한 파이썬 값 배열로 변환"""
+    values = series.to_numpy()
+    if values.dtype.kind in "fc":
+        result = values.astype(object)
+        result[~np.isfinite(values)] = None
+        return result
+    if values.dtype.kind in "iub":
+        return values.astype(object)
+    return np.array([json_safe(value) for value in values], dtype=object)
+
+
+def frame_to_records(df, date_format='%Y-%m-%d', last=None):
+    """DataFrame -> [{컬럼: 값, ..., 'date': 문자열}, ...] (먼저 자른 뒤 컬럼 단위로 변환)"""
+    if last is not None:
+        df = df.iloc[-last:]
+
+    keys = [*df.columns, 'date']
+    columns = [_column_values(df[column]) for column in df.columns]
+    columns.append(df.index.strftime(date_format))
+
+    return [dict(zip(keys, row)) for row in zip(*columns)]
+
+
+def frames_to_records(frames, date_format='%Y-%m-%d', last=None):
+    """{티커: DataFrame} -> {티커: records} (여러 티커 일괄 변환)"""
+    return {
+        key: frame_to_records(df, date_format=date_format, last=last)
+        for key, df in frames.items()
+    }
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import deque
+
+
+class TradingScheduler:
+    """캔들 마감에 맞춘 정기 실행 + ATR 기반 추가 실행 스케줄러
+
+    job()은 {"price": 현재가, "atr": ATR, "llm_called": LLM 호출 여부} 형태의 dict를 반환하며,
+    None(또는 예외)은 실패로 보고 error_backoff 후 다시 실행한다.
+    llm_called가 참인 실행만 시간당 LLM 호출 한도에 포함한다 (결정 캐시 재사용/수집 실패 제외).
+    """
+
+    def __init__(self, job, interval=600, offset=5, price_source=None,
+                 poll_interval=30, move_atr=1.0, range_atr=1.5,
+                 max_calls_per_hour=12, error_backoff=60):
+        self.job = job
+        self.interval = interval            # 정기 실행 간격 (캔들 마감 시각에 정렬)
+        self.offset = offset                # 캔들 마감 후 대기 시간 (초)
+        self.price_source = price_source    # 현재가 조회 함수 (추가 실행 판단용)
+        self.poll_interval = poll_interval
+        self.move_atr = move_atr            # 마지막 판단 이후 가격 변동 >= move_atr * ATR
+        self.range_atr = range_atr          # 마지막 판단 이후 고저폭 >= range_atr * ATR
+        self.max_calls_per_hour = max_calls_per_hour
+        self.error_backoff = error_backoff
+
+        self.calls = deque()
+        self.last_state = None
+        self.price_low = None
+        self.price_high = None
+        self._stop = threading.Event()
+
+    def next_boundary(self, now):
+        """now 이후의 다음 캔들 마감 시각 (+offset)"""
+        return (now - self.offset) // self.interval * self.interval + self.interval + self.offset
+
+    def _budget_left(self, now):
+        """최근 1시간 내 LLM 호출 여유분"""
+        while self.calls and now - self.calls[0] >= 3600:
+            self.calls.popleft()
+        return self.max_calls_per_hour - len(self.calls)
+
+    def _run(self, reason):
+        now = time.time()
+        if self._budget_left(now) <= 0:
+            print(f"Skipping {reason} run: LLM call cap reached ({self.max_calls_per_hour}/hour)")
+            return True
+
+        print(f"\n=== Trading run ({reason}) at {time.strftime('%Y-%m-%d %H:%M:%S')} ===")
+        started = time.perf_counter()
+        try:
+            state = self.job()
+        except Exception as e:
+            print(f"Error in scheduled job: {e}")
+            return False
+        finally:
+            print(f"Run took {time.perf_counter() - started:.2f}s")
+
+        if not state:
+            print("Scheduled job returned no state")
+            return False
+        if state.get("llm_called"):
+            self.calls.append(now)
+        if state.get("price") is not None:
+            self.last_state = state
+            self.price_low = self.price_high = state["price"]
+        return True
+
+    def _check_triggers(self):
+        """ATR 대비 가격 변동/변동폭이 임계값을 넘으면 추가 실행 사유 반환"""
+        if self.price_source is None or not self.last_state or not self.last_state.get("atr"):
+            return None
+        if self._budget_left(time.time()) <= 0:
+            return None
+
+        try:
+            price = self.price_source()
+        except Exception as e:
+            print(f"Error in price_source: {e}")
+            return None
+        if price is None:
+            return None
+
+        self.price_low = min(self.price_low, price)
+        self.price_high = max(self.price_high, price)
+        atr = self.last_state["atr"]
+
+        move = abs(price - self.last_state["price"])
+        if move >= self.move_atr * atr:
+            return f"price move {move:,.0f} >= {self.move_atr} ATR"
+
+        price_range = self.price_high - self.price_low
+        if price_range >= self.range_atr * atr:
+            return f"volatility {price_range:,.0f} >= {self.range_atr} ATR"
+        return None
+
+    def run(self, run_immediately=True):
+        """stop()이 호출될 때까지 실행"""
+        if run_immediately:
+            self._run("startup")
+
+        next_run = self.next_boundary(time.time())
+        next_poll = time.time() + self.poll_interval
+
+        while not self._stop.is_set():
+            now = time.time()
+
+            if now >= next_run:
+                succeeded = self._run("scheduled")
+                now = time.time()
+                # 실행 시간만큼 밀리지 않도록 절대 시각 기준으로 다음 실행 계산
+                next_run = self.next_boundary(now)
+                if not succeeded:
+                    next_run = min(next_run, now + self.error_backoff)
+                continue
+
+            if now >= next_poll:
+                next_poll = now + self.poll_interval
+                reason = self._check_triggers()
+                if reason:
+                    self._run(reason)
+                continue
+
+            self._stop.wait(max(min(next_run, next_poll) - now, 0))
+
+    def stop(self):
+        self._stop.set()
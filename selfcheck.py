@@ -0,0 +1,424 @@
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# 네트워크 없이 로컬 대체 서버로 장애 처리 경로(제한시간/재시도/대체/재연결)를 확인하는 점검 스크립트
+
+# LLM: 모델 이름으로 대체 서버의 응답 방식을 고름
+LLM_BEHAVIORS = {
+    "ok": "정상 JSON 응답",
+    "slow": "제한시간보다 늦게 응답",
+    "flaky": "첫 요청만 503, 이후 정상",
+    "server_error": "항상 500",
+    "bad_request": "항상 400 (예: JSON 모드를 지원하지 않는 모델)",
+    "invalid_json": "200이지만 JSON이 아닌 본문",
+}
+SLOW_SECONDS = 1.0
+
+
+class _FakeLLMHandler(BaseHTTPRequestHandler):
+    requests = None
+    lock = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # 제한시간으로 클라이언트가 먼저 끊은 경우
+            pass
+
+    def _completion(self, model, content):
+        self._send_json(200, {
+            "id": "chatcmpl-selfcheck",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        })
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        model = request.get("model")
+        with self.lock:
+            self.requests[model] += 1
+            count = self.requests[model]
+
+        if model == "slow":
+            time.sleep(SLOW_SECONDS)
+        if model == "bad_request":
+            self._send_json(400, {"error": {"message": "response_format is not supported with this model",
+                                            "type": "invalid_request_error"}})
+        elif model == "server_error" or (model == "flaky" and count == 1):
+            self._send_json(500 if model == "server_error" else 503, {"error": {"message": "unavailable"}})
+        elif model == "invalid_json":
+            self._completion(model, "Sure! Here is my analysis: buy")
+        elif model in LLM_BEHAVIORS:
+            self._completion(model, json.dumps({"decision": "hold", "model": model}))
+        else:
+            self._send_json(404, {"error": {"message": f"unknown model {model}"}})
+
+
+class FakeLLMServer:
+    """OpenAI 호환 chat completions 대체 서버 (모델별 요청 수 기록)"""
+
+    def __init__(self):
+        self.requests = Counter()
+        handler = type("FakeLLMHandler", (_FakeLLMHandler,), {"requests": self.requests, "lock": threading.Lock()})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def client(self, *models, timeout=5, retries=2):
+        """models 순서대로 시도하는 LLMClient (실제 openai SDK 경로)"""
+        from llm import LLMClient, Route, openai_provider
+
+        provider = openai_provider(api_key="selfcheck", base_url=self.url)
+        routes = [Route(provider, model, SLOW_SECONDS / 5 if model == "slow" else timeout) for model in models]
+        return LLMClient(routes, retries=retries, backoff=0.01, max_backoff=0.05)
+
+
+def _expect(results, name, ok, detail=""):
+    results.append((name, ok, detail))
+    print(f"{'PASS' if ok else 'FAIL'} {name}" + (f": {detail}" if detail else ""))
+
+
+def check_llm():
+    """LLMClient 제한시간/재시도/대체 경로 점검, (이름, 성공 여부, 설명) 목록 반환"""
+    from llm import LLMError
+
+    results = []
+    messages = [{"role": "user", "content": "selfcheck"}]
+
+    def attempt(*models, **kwargs):
+        with FakeLLMServer() as server:
+            try:
+                response = server.client(*models, **kwargs).complete_json(messages)
+            except LLMError as e:
+                response = e
+            return response, dict(server.requests)
+
+    # 느린 모델은 재시도 없이 다음 경로로
+    response, requests = attempt("slow", "ok")
+    _expect(results, "timeout falls back without retry",
+            getattr(response, "model", None) == "ok" and requests.get("slow") == 1, f"requests {requests}")
+
+    # 일시적 5xx는 같은 경로에서 재시도
+    response, requests = attempt("flaky", "ok")
+    _expect(results, "transient error is retried on the same route",
+            getattr(response, "model", None) == "flaky" and requests.get("flaky") == 2 and "ok" not in requests,
+            f"requests {requests}")
+
+    # 계속 실패하는 5xx는 retries번 재시도 후 대체
+    response, requests = attempt("server_error", "ok", retries=2)
+    _expect(results, "persistent 5xx falls back after retries",
+            getattr(response, "model", None) == "ok" and requests.get("server_error") == 3, f"requests {requests}")
+
+    # 4xx/JSON 파싱 실패는 재시도 없이 곧바로 대체
+    response, requests = attempt("bad_request", "ok")
+    _expect(results, "4xx falls back without retry",
+            getattr(response, "model", None) == "ok" and requests.get("bad_request") == 1, f"requests {requests}")
+    response, requests = attempt("invalid_json", "ok")
+    _expect(results, "invalid JSON falls back without retry",
+            getattr(response, "model", None) == "ok" and requests.get("invalid_json") == 1, f"requests {requests}")
+
+    # 모든 경로 실패 시 LLMError
+    response, requests = attempt("bad_request", "invalid_json")
+    _expect(results, "all routes failing raises LLMError", isinstance(response, LLMError), str(response))
+    return results
+
+
+class FakeUpbitSocket:
+    """업비트 WebSocket 대체 서버 (구독 요청마다 ticker/orderbook 메시지를 interval초 간격으로 전송)
+
+    첫 연결은 drop_after회 전송 후 끊어 재연결/재구독을 확인하고,
+    silent=True이면 연결은 유지한 채 전송만 멈춰 오래된 시세 판정을 확인한다.
+    """
+
+    def __init__(self, price=100_000_000, interval=0.05, drop_after=5):
+        self.price = price
+        self.interval = interval
+        self.drop_after = drop_after
+        self.silent = False
+        self.subscriptions = []
+        self.url = None
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._started = threading.Event()
+
+    def _messages(self, code, sequence):
+        from benchmark import synthetic_orderbook
+
+        price = self.price + sequence * 1000
+        orderbook = synthetic_orderbook(code, price, seed=sequence)
+        units = orderbook["orderbook_units"]
+        timestamp = int(time.time() * 1000)
+        return [
+            {"type": "ticker", "code": code, "trade_price": price, "timestamp": timestamp},
+            {**orderbook, "type": "orderbook", "code": code, "timestamp": timestamp,
+             "total_ask_size": sum(unit["ask_size"] for unit in units),
+             "total_bid_size": sum(unit["bid_size"] for unit in units)},
+        ]
+
+    async def _handler(self, ws, *args):
+        import websockets
+
+        request = json.loads(await ws.recv())
+        codes = sorted({code for item in request if "codes" in item for code in item["codes"]})
+        self.subscriptions.append(codes)
+        connection = len(self.subscriptions)
+        sequence = 0
+        try:
+            while True:
+                if not self.silent:
+                    for code in codes:
+                        for message in self._messages(code, sequence):
+                            # 업비트와 같이 바이너리 프레임으로 전송
+                            await ws.send(json.dumps(message).encode("utf-8"))
+                    sequence += 1
+                    if connection == 1 and sequence >= self.drop_after:
+                        await ws.close()
+                        return
+                await asyncio.sleep(self.interval)
+        except websockets.ConnectionClosed:
+            pass
+
+    def _run(self):
+        import websockets
+
+        self._loop = asyncio.new_event_loop()
+
+        async def serve():
+            self._server = await websockets.serve(self._handler, "127.0.0.1", 0)
+            port = self._server.sockets[0].getsockname()[1]
+            self.url = f"ws://127.0.0.1:{port}"
+            self._started.set()
+
+        self._loop.run_until_complete(serve())
+        self._loop.run_forever()
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name="fake-upbit-ws", daemon=True)
+        self._thread.start()
+        self._started.wait(5)
+        return self
+
+    def __exit__(self, *exc):
+        async def close():
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+def _wait_until(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+def check_market_feed():
+    """MarketDataFeed 수신/재연결/재구독/오래된 시세 판정 점검"""
+    from market_feed import MarketDataFeed
+
+    results = []
+    tickers = ["KRW-BTC", "KRW-ETH"]
+    with FakeUpbitSocket() as server:
+        feed = MarketDataFeed(tickers, url=server.url, max_age=1, max_reconnect_delay=1).start()
+        try:
+            ready = feed.wait_ready(5)
+            price = feed.get_current_price("KRW-BTC")
+            orderbook = feed.get_orderbook("KRW-ETH")
+            _expect(results, "feed becomes ready from ticker/orderbook messages",
+                    ready and price is not None and orderbook is not None and feed.status()["ready"],
+                    f"price {price}, status {feed.status()}")
+
+            # 첫 연결이 끊기면 백오프 후 재연결하여 같은 티커를 다시 구독
+            reconnected = _wait_until(lambda: len(server.subscriptions) >= 2 and feed.status()["ready"], 5)
+            _expect(results, "reconnects and resubscribes after the server drops the connection",
+                    reconnected and feed.reconnects >= 1 and server.subscriptions[1] == sorted(tickers),
+                    f"reconnects {feed.reconnects}, subscriptions {server.subscriptions}")
+
+            messages = feed.messages
+            _wait_until(lambda: feed.messages > messages, 2)
+            _expect(results, "keeps receiving after reconnect", feed.messages > messages,
+                    f"messages {messages} -> {feed.messages}")
+
+            # 연결은 유지된 채 메시지가 끊기면 max_age 후 오래된 값으로 판정
+            server.silent = True
+            stale = _wait_until(lambda: not feed.status()["ready"], 3)
+            _expect(results, "marks prices stale when messages stop",
+                    stale and feed.get_current_price("KRW-BTC") is None and feed.get_orderbook("KRW-ETH") is None,
+                    f"status {feed.status()}")
+
+            server.silent = False
+            _expect(results, "recovers when messages resume", _wait_until(lambda: feed.status()["ready"], 3),
+                    f"status {feed.status()}")
+        finally:
+            feed.stop()
+        _expect(results, "stop() ends the receiver thread", not feed.status()["running"], f"status {feed.status()}")
+    return results
+
+
+class _FakeNewsHandler(BaseHTTPRequestHandler):
+    pages = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        # 요청마다 다음 응답 (마지막 응답은 반복)
+        news = self.pages[0] if len(self.pages) == 1 else self.pages.pop(0)
+        body = json.dumps({"search_metadata": {"status": "Success"}, "news_results": news}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeNewsServer:
+    """SerpAPI Google News 대체 서버 (pages의 news_results를 요청 순서대로 응답)"""
+
+    def __init__(self, *pages):
+        handler = type("FakeNewsHandler", (_FakeNewsHandler,), {"pages": [list(page) for page in pages] or [[]]})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/search.json"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def feed(self, **kwargs):
+        from news_feed import NewsFeed
+
+        return NewsFeed(url=self.url, api_key="selfcheck", **kwargs)
+
+
+def _article(title, link, age=0, snippet=""):
+    published = datetime.fromtimestamp(time.time() - age, timezone.utc)
+    return {"title": title, "link": link, "snippet": snippet, "source": {"name": "Selfcheck"},
+            "iso_date": published.strftime("%Y-%m-%dT%H:%M:%SZ")}
+
+
+def check_news():
+    """NewsFeed 중복 제거/SeenSet 크기 제한/최신순 제목/새 기사만 반환/시간 감쇠 집계 점검"""
+    from news_feed import score_article
+
+    results = []
+
+    # URL은 추적 파라미터/호스트 대소문자/끝 슬래시, 제목은 대소문자/구두점 차이를 무시
+    first = [_article("Bitcoin rallies as ETF inflows surge", "https://www.example.com/news/1?utm_source=x&id=7"),
+             _article("Miners expand capacity", "https://example.com/news/2")]
+    second = [_article("Another headline for the same story", "http://EXAMPLE.com/news/1/?id=7&fbclid=abc"),
+              _article("BITCOIN RALLIES as ETF inflows surge!", "https://other.example.org/story"),
+              _article("Regulators approve new exchange", "https://example.com/news/3?ref=home")]
+    with FakeNewsServer(first, second) as server:
+        feed = server.feed()
+        counts = [feed.poll(), feed.poll()]
+        _expect(results, "drops URL and title duplicates (tracking params, case variants)",
+                counts == [2, 1] and feed.duplicates == 2, f"new {counts}, duplicates {feed.duplicates}")
+
+        # context(since)는 since 이후 새 기사만 반환
+        sequence, context = feed.context(0)
+        sequence, again = feed.context(sequence)
+        _expect(results, "context() returns only unseen headlines",
+                len(context["headlines"]) == 3 and again["headlines"] == [] and again["sentiment"]["new"] == 0,
+                f"first {len(context['headlines'])}, again {len(again['headlines'])}")
+
+    # 제목 해시 + URL 키 2개씩이므로 max_seen=6이면 최근 3개 기사만 기억
+    page = [_article(f"Story number {number}", f"https://example.com/story/{number}") for number in range(5)]
+    with FakeNewsServer(page, page[:1]) as server:
+        feed = server.feed(max_seen=6)
+        feed.poll()
+        readded = feed.poll()
+        _expect(results, "SeenSet stays within max_seen and forgets the oldest keys",
+                len(feed._seen) <= 6 and readded == 1, f"seen {len(feed._seen)}, re-added {readded}")
+
+    # 한 번에 많이 들어오면 게시 시각 최신순으로 max_headlines개
+    page = [_article(f"Headline aged {age} minutes", f"https://example.com/aged/{age}", age=age * 60)
+            for age in (30, 5, 50, 10, 20)]
+    with FakeNewsServer(page) as server:
+        feed = server.feed(max_headlines=3)
+        feed.poll()
+        _, context = feed.context(0)
+        titles = [headline["title"] for headline in context["headlines"]]
+        _expect(results, "keeps the newest headlines first when truncating",
+                titles == [f"Headline aged {age} minutes" for age in (5, 10, 20)] and context["sentiment"]["new"] == 5,
+                f"titles {titles}, new {context['sentiment']['new']}")
+
+    # 반감기만큼 지난 기사는 가중치 1/2
+    half_life = 3600
+    page = [_article("Bitcoin surges to record high", "https://example.com/bull"),
+            _article("Exchange hacked, bitcoin plunges", "https://example.com/bear", age=half_life)]
+    with FakeNewsServer(page) as server:
+        feed = server.feed(half_life=half_life)
+        feed.poll()
+        bull, bear = (score_article(item) for item in page)
+        expected = (bull + 0.5 * bear) / 1.5
+        sentiment = feed.sentiment()
+        _expect(results, "aggregates sentiment with time decay",
+                abs(sentiment["score"] - expected) < 0.01 and abs(sentiment["weight"] - 1.5) < 0.1,
+                f"sentiment {sentiment}, expected {expected:.3f}")
+    return results
+
+
+CHECKS = {
+    "llm": check_llm,
+    "market_feed": check_market_feed,
+    "news": check_news,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 대체 서버로 장애 처리 경로 점검")
+    parser.add_argument("checks", nargs="*", help=f"실행할 점검 {list(CHECKS)} (기본: 전체)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.checks if name not in CHECKS]
+    if unknown:
+        parser.error(f"unknown checks: {', '.join(unknown)}")
+
+    results = []
+    for name in args.checks or CHECKS:
+        print(f"\n=== {name} ===")
+        results.extend(CHECKS[name]())
+
+    failed = [name for name, ok, _ in results if not ok]
+    print(f"\n{len(results) - len(failed)}/{len(results)} checks passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import os
+import signal
+import threading
+import time
+
+import pyupbit
+from dotenv import load_dotenv
+
+from autotrade import EnhancedCryptoTrader, ai_trading
+from http_client import install_pyupbit_session
+from market_feed import start_market_feed
+from metrics import start_exporters, start_http_server
+from news_feed import start_news_feed
+from portfolio import PortfolioTrader
+from scheduler import TradingScheduler
+
+
+load_dotenv()
+
+
+class TradingService:
+    """장기 실행 트레이딩 서비스
+
+    - 업비트/LLM 클라이언트, HTTP 세션(keep-alive), 시세 피드, 트레이더를 한 번만 만들고 매 사이클 재사용
+    - SIGTERM/SIGINT: 새 주문을 막고 진행 중인 사이클(주문 포함)이 끝나면 종료, 두 번째 신호는 즉시 종료
+    - /healthz (살아 있고 사이클이 멈추지 않았는지), /readyz (시세 피드 수신 중), /metrics
+    """
+
+    def __init__(self, tickers=None, interval=600, port=None, host=None, stale_after=None):
+        if tickers is None:
+            tickers = os.getenv("WATCHLIST", "KRW-BTC").split(",")
+        self.tickers = [ticker.strip() for ticker in tickers if ticker.strip()]
+        self.interval = interval
+        self.port = int(os.getenv("SERVICE_PORT", "8080")) if port is None else port
+        self.host = host or os.getenv("SERVICE_HOST", "127.0.0.1")
+        # 마지막 사이클 이후 이 시간(초)이 지나도록 다음 사이클이 끝나지 않으면 비정상
+        self.stale_after = stale_after or interval * 3
+
+        self.state = "starting"
+        self.started_at = time.time()
+        self.cycles = 0
+        self.failures = 0
+        self.cycle_started = None
+        self.last_cycle = None
+        self.signals = 0
+
+        self.feed = None
+        self.news = None
+        self.trader = None
+        self.portfolio = None
+        self.traders = []
+        self.scheduler = None
+        self.server = None
+        self.exporters = {}
+        self._worker = None
+
+    def build(self):
+        """공유 클라이언트/피드/트레이더 생성 (시세 피드를 먼저 시작해야 트레이더가 피드를 사용)"""
+        if not install_pyupbit_session():
+            print("pyupbit REST calls are not using the shared session")
+        self.feed = start_market_feed(self.tickers)
+        if not self.feed.wait_ready():
+            print("Market feed not ready yet, falling back to REST until it is")
+        self.news = start_news_feed()
+
+        if len(self.tickers) == 1:
+            self.trader = EnhancedCryptoTrader(self.tickers[0])
+            self.traders = [self.trader]
+            ticker = self.tickers[0]
+            price_source = lambda: self.feed.get_current_price(ticker) or pyupbit.get_current_price(ticker)
+        else:
+            self.portfolio = PortfolioTrader(self.tickers)
+            self.traders = list(self.portfolio.traders.values())
+            price_source = None
+
+        self.scheduler = TradingScheduler(self.run_cycle, interval=self.interval, price_source=price_source)
+
+    def run_cycle(self):
+        """스케줄러 작업: 사이클 1회 (단일 티커는 ai_trading, 여러 티커는 PortfolioTrader)"""
+        self.cycle_started = time.time()
+        state = None
+        try:
+            if self.trader is not None:
+                state = ai_trading(self.trader)
+            else:
+                state = self.portfolio.run_cycle()
+            return state
+        finally:
+            finished = time.time()
+            self.cycles += 1
+            if state is None:
+                self.failures += 1
+            self.last_cycle = {
+                "started": self.cycle_started,
+                "finished": finished,
+                "seconds": finished - self.cycle_started,
+                "ok": state is not None,
+            }
+            self.cycle_started = None
+
+    def health(self):
+        """살아 있음: 작업 스레드가 돌고 있고 사이클이 stale_after 이상 멈추지 않음"""
+        now = time.time()
+        alive = self._worker is not None and self._worker.is_alive()
+        if self.cycle_started is not None:
+            stuck = now - self.cycle_started > self.stale_after
+        else:
+            last = self.last_cycle["finished"] if self.last_cycle else self.started_at
+            stuck = now - last > self.stale_after
+        ok = self.state in ("starting", "running", "stopping") and alive and not stuck
+        return ok, self.status()
+
+    def ready(self):
+        """준비됨: 실행 중이며 시세 피드가 최신 상태"""
+        feed = self.feed.status() if self.feed is not None else {"ready": False}
+        return self.state == "running" and feed["ready"], self.status()
+
+    def status(self):
+        return {
+            "state": self.state,
+            "tickers": self.tickers,
+            "uptime": time.time() - self.started_at,
+            "cycles": self.cycles,
+            "failures": self.failures,
+            "in_cycle": self.cycle_started is not None,
+            "last_cycle": self.last_cycle,
+            "feed": self.feed.status() if self.feed is not None else None,
+            "news": self.news.status() if self.news is not None else None,
+        }
+
+    def _handle_signal(self, signum, frame):
+        self.signals += 1
+        if self.signals > 1:
+            print("Second signal received, exiting immediately")
+            raise KeyboardInterrupt
+
+        print(f"\nReceived {signal.Signals(signum).name}, finishing the current cycle before exit")
+        self.state = "stopping"
+        # 진행 중인 주문은 끝까지 실행하되 새 주문은 내지 않음
+        for trader in self.traders:
+            trader.trading_enabled = False
+        if self.scheduler is not None:
+            self.scheduler.stop()
+
+    def _run_scheduler(self):
+        try:
+            self.scheduler.run()
+        except Exception as e:
+            print(f"Error in scheduler: {e}")
+
+    def shutdown(self):
+        """시세 피드/메트릭 내보내기/HTTP 서버 정리"""
+        self.state = "stopping"
+        if self.feed is not None:
+            self.feed.stop()
+        if self.news is not None:
+            self.news.stop()
+        if "jsonl" in self.exporters:
+            self.exporters["jsonl"].stop()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        self.state = "stopped"
+        print("Trading service stopped")
+
+    def run(self):
+        """신호를 받을 때까지 실행 (메인 스레드에서 호출)"""
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+
+        self.server = start_http_server(self.port, self.host, routes={
+            "/healthz": self.health,
+            "/readyz": self.ready,
+        })
+        self.exporters = start_exporters()
+
+        try:
+            self.build()
+            if self.state == "starting":
+                self.state = "running"
+                # 신호 처리는 메인 스레드에서, 매매 사이클은 작업 스레드에서
+                self._worker = threading.Thread(target=self._run_scheduler, name="trading-scheduler", daemon=True)
+                self._worker.start()
+                while self._worker.is_alive():
+                    self._worker.join(timeout=1)
+        except KeyboardInterrupt:
+            print("Trading service interrupted")
+        finally:
+            self.shutdown()
+
+
+if __name__ == "__main__":
+    print("Starting Trading Service...")
+    TradingService().run()
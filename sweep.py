@@ -0,0 +1,201 @@
+import hashlib
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import Backtester, align_fear_greed, indicator_signals, load_fear_greed_history
+from candle_store import CandleStore, INTERVAL_SECONDS
+from indicators import IndicatorEngine
+from policy import TradePolicy
+
+
+# 지표 관련 파라미터 (나머지는 TradePolicy 파라미터)
+INDICATOR_PARAMS = ("bb_window", "bb_dev", "rsi_window", "rsi_low", "rsi_high")
+
+DEFAULT_SPACE = {
+    "bb_window": [20],
+    "bb_dev": [2],
+    "rsi_window": [14],
+    "rsi_low": [25, 30, 35],
+    "rsi_high": [65, 70, 75],
+    "buy_breakpoints": [(25, 40), (20, 35), (30, 45)],
+    "sell_breakpoints": [(75, 60), (80, 65), (70, 55)],
+    "buy_ratios": [(0.9995, 0.7, 0.5), (0.7, 0.5, 0.3)],
+    "sell_ratios": [(1.0, 0.7, 0.5), (0.7, 0.5, 0.3)],
+    "min_confidence": [60, 70, 80],
+}
+
+ARRAY_FIELDS = ("index", "high", "low", "close", "fear_greed")
+
+# 워커 프로세스에서 공유 메모리로 연결된 배열
+_arrays = {}
+_segments = []
+_signal_cache = {}
+
+
+def grid_configs(space):
+    """파라미터 공간의 모든 조합"""
+    names = list(space)
+    for values in itertools.product(*(space[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def random_configs(space, count, seed=0):
+    """파라미터 공간에서 무작위 추출"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield {name: rng.choice(values) for name, values in space.items()}
+
+
+def config_key(config):
+    return json.dumps(config, sort_keys=True)
+
+
+def dataset_key(arrays, fee, periods_per_year):
+    """입력 데이터(캔들/공포탐욕지수)와 평가 설정의 해시 (다른 데이터셋의 체크포인트 결과를 섞지 않도록)"""
+    digest = hashlib.sha1()
+    for name in ARRAY_FIELDS:
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(name.encode())
+        digest.update(array.dtype.str.encode())
+        digest.update(array.tobytes())
+    digest.update(json.dumps({"fee": fee, "periods_per_year": periods_per_year}).encode())
+    return digest.hexdigest()[:16]
+
+
+def _attach(specs):
+    """워커 초기화: 공유 메모리 배열에 연결 (복사 없음)"""
+    for name, (segment_name, dtype, length) in specs.items():
+        segment = shared_memory.SharedMemory(name=segment_name)
+        _segments.append(segment)
+        _arrays[name] = np.ndarray((length,), dtype=dtype, buffer=segment.buf)
+
+
+def _signals(params):
+    """지표 파라미터별 신호 (워커 내 캐시)"""
+    key = tuple(params[name] for name in INDICATOR_PARAMS)
+    if key not in _signal_cache:
+        df = pd.DataFrame({
+            "high": _arrays["high"],
+            "low": _arrays["low"],
+            "close": _arrays["close"],
+        }, index=pd.DatetimeIndex(_arrays["index"].view("datetime64[ns]")))
+        engine = IndicatorEngine(bb_window=params["bb_window"], bb_dev=params["bb_dev"],
+                                 rsi_window=params["rsi_window"], ma_windows=())
+        _signal_cache[key] = indicator_signals(df, params["rsi_low"], params["rsi_high"], engine)
+    return _signal_cache[key]
+
+
+def _evaluate(configs, fee, periods_per_year):
+    """설정 묶음 평가 (워커에서 실행)"""
+    index = _arrays["index"].view("datetime64[ns]")
+    results = []
+    for config in configs:
+        decisions, confidences = _signals(config)
+        policy = TradePolicy(**{name: value for name, value in config.items() if name not in INDICATOR_PARAMS})
+        result = Backtester(policy, fee=fee).run(
+            index, _arrays["close"], decisions, confidences, _arrays["fear_greed"], periods_per_year
+        )
+        results.append({"config": config, **result.stats()})
+    return results
+
+
+def _share(arrays):
+    """배열을 공유 메모리에 복사하고 (세그먼트 목록, 연결 정보) 반환"""
+    segments = []
+    specs = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+        segments.append(segment)
+        specs[name] = (segment.name, array.dtype.str, len(array))
+    return segments, specs
+
+
+def load_checkpoint(path, dataset=None):
+    """이미 평가된 결과 (재시작 시 건너뜀, dataset이 주어지면 같은 데이터셋/설정의 결과만)"""
+    results = {}
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    if dataset is not None and item.get("dataset") != dataset:
+                        continue
+                    results[config_key(item["config"])] = item
+    return results
+
+
+def run_sweep(df, fear_greed_values, configs, checkpoint="sweep_results.jsonl",
+              workers=None, chunk_size=32, fee=0.0005, periods_per_year=365, rank_by="sharpe"):
+    """프로세스 풀에서 파라미터 탐색 후 configs의 결과를 rank_by 기준 내림차순으로 반환
+
+    체크포인트에는 데이터셋 해시(dataset_key)를 함께 기록하며, 다른 티커/봉 단위/기간/fee/periods_per_year로
+    평가된 결과는 재사용하지 않는다.
+    """
+    arrays = {
+        "index": df.index.values.astype("datetime64[ns]").view("<i8"),
+        "high": df["high"].to_numpy(dtype=float),
+        "low": df["low"].to_numpy(dtype=float),
+        "close": df["close"].to_numpy(dtype=float),
+        "fear_greed": np.asarray(fear_greed_values, dtype=float),
+    }
+    dataset = dataset_key(arrays, fee, periods_per_year)
+
+    configs = list(configs)
+    done = load_checkpoint(checkpoint, dataset)
+    pending = [config for config in configs if config_key(config) not in done]
+    # 같은 지표 파라미터끼리 묶어 워커별 신호 캐시 재사용
+    pending.sort(key=lambda config: tuple(config[name] for name in INDICATOR_PARAMS))
+    print(f"Sweep: {len(pending)} configs to evaluate ({len(configs) - len(pending)} from checkpoint)")
+
+    segments, specs = _share(arrays)
+
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(specs,)) as executor, \
+                open(checkpoint, "a", encoding="utf-8") as f:
+            futures = [
+                executor.submit(_evaluate, pending[i:i + chunk_size], fee, periods_per_year)
+                for i in range(0, len(pending), chunk_size)
+            ]
+            for future in as_completed(futures):
+                for item in future.result():
+                    item["dataset"] = dataset
+                    done[config_key(item["config"])] = item
+                    f.write(json.dumps(item) + "\n")
+                f.flush()
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+    elapsed = time.perf_counter() - started
+    if pending:
+        print(f"Sweep: {len(pending)} configs in {elapsed:.1f}s ({len(pending) / elapsed:.0f}/s)")
+
+    results = {config_key(config): done[config_key(config)] for config in configs if config_key(config) in done}
+    return sorted(results.values(), key=lambda item: item[rank_by], reverse=True)
+
+
+if __name__ == "__main__":
+    interval = "day"
+    df = CandleStore().get_ohlcv("KRW-BTC", interval=interval, count=2000)
+    fear_greed_values = align_fear_greed(df.index, load_fear_greed_history())
+
+    ranked = run_sweep(
+        df, fear_greed_values, list(grid_configs(DEFAULT_SPACE)),
+        periods_per_year=365 * 86400 / INTERVAL_SECONDS[interval],
+    )
+    print("\n=== Top 10 by Sharpe ===")
+    for item in ranked[:10]:
+        print(f"sharpe={item['sharpe']:.2f} return={item['total_return']:.2%} "
+              f"mdd={item['max_drawdown']:.2%} trades={item['trades']} {item['config']}")
@@ -3,8 +3,10 @@ from dotenv import load_dotenv
 import json
 import pyupbit
 import pandas as pd
-import ta
 from datetime import datetime, timedelta
+from candle_store import CandleStore
+from indicators import IndicatorEngine, get_engine
+from records import frame_to_records
 
 
 load_dotenv()
@@ -16,39 +18,21 @@ class EnhancedCryptoDataCollector:
         self.access = os.getenv('UPBIT_ACCESS_KEY')
         self.secret = os.getenv('UPBIT_SECRET_KEY')
         self.upbit = pyupbit.Upbit(self.access, self.secret)
+        self.candle_store = CandleStore()
 
 
-    def add_technical_indicators(self, df):
-        """기술적 분석 지표 추가"""
-        # 볼린저 밴드
-        indicator_bb = ta.volatility.BollingerBands(close=df['close'])
-        df['bb_high'] = indicator_bb.bollinger_hband()
-        df['bb_mid'] = indicator_bb.bollinger_mavg()
-        df['bb_low'] = indicator_bb.bollinger_lband()
+    def add_technical_indicators(self, df, interval=None):
+        """기술적 분석 지표 추가 (봉 단위별 스트리밍 엔진으로 새 캔들만 계산)"""
+        if interval is None:
+            engine = IndicatorEngine()
+        else:
+            engine = get_engine((self.ticker, interval))
 
-        # RSI
-        df['rsi'] = ta.momentum.RSIIndicator(close=df['close']).rsi()
+        # 볼린저 밴드, RSI, MACD, 이동평균선, ATR
+        df = engine.frame(df).drop(columns=['bb_pband'])
 
-        # MACD
-        macd = ta.trend.MACD(close=df['close'])
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_diff'] = macd.macd_diff()
-
-        # 이동평균선
-        df['sma_5'] = ta.trend.SMAIndicator(close=df['close'], window=5).sma_indicator()
-        df['sma_20'] = ta.trend.SMAIndicator(close=df['close'], window=20).sma_indicator()
-        df['sma_60'] = ta.trend.SMAIndicator(close=df['close'], window=60).sma_indicator()
-        df['sma_120'] = ta.trend.SMAIndicator(close=df['close'], window=120).sma_indicator()
-
-        # ATR
-        df['atr'] = ta.volatility.AverageTrueRange(
-            high=df['high'],
-            low=df['low'],
-            close=df['close']
-        ).average_true_range()
-
-        return df
+        # 이동평균선 컬럼명 (sma_5, sma_20, ...)
+        return df.rename(columns={f"ma{window}": f"sma_{window}" for window in engine.ma_windows})
 
 
     def get_current_status(self):
@@ -83,25 +67,16 @@ class EnhancedCryptoDataCollector:
         """차트 데이터 수집 및 기술적 분석"""
         try:
             # 일봉 데이터 (최근 30일)
-            daily_data = pyupbit.get_ohlcv(self.ticker, interval="day", count=30)
-            daily_data = self.add_technical_indicators(daily_data)
+            daily_data = self.candle_store.get_ohlcv(self.ticker, interval="day", count=30)
+            daily_data = self.add_technical_indicators(daily_data, "day")
 
             # 시간봉 데이터 (최근 24시간)
-            hourly_data = pyupbit.get_ohlcv(self.ticker, interval="minute60", count=24)
-            hourly_data = self.add_technical_indicators(hourly_data)
-
-            # DataFrame을 dict로 변환 (datetime index 처리)
-            daily_data_dict = []
-            for index, row in daily_data.iterrows():
-                day_data = row.to_dict()
-                day_data['date'] = index.strftime('%Y-%m-%d')
-                daily_data_dict.append(day_data)
-
-            hourly_data_dict = []
-            for index, row in hourly_data.iterrows():
-                hour_data = row.to_dict()
-                hour_data['date'] = index.strftime('%Y-%m-%d %H:%M:%S')
-                hourly_data_dict.append(hour_data)
+            hourly_data = self.candle_store.get_ohlcv(self.ticker, interval="minute60", count=24)
+            hourly_data = self.add_technical_indicators(hourly_data, "minute60")
+
+            # DataFrame을 dict로 변환 (datetime index 처리, NaN -> null)
+            daily_data_dict = frame_to_records(daily_data, '%Y-%m-%d')
+            hourly_data_dict = frame_to_records(hourly_data, '%Y-%m-%d %H:%M:%S')
 
             return {
                 "daily_data": daily_data_dict,